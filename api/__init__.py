@@ -1,13 +1,36 @@
-from config import DATA_PROVIDER
+from config import DATA_PROVIDER, DATA_PROVIDER_ASYNC
 
 
 def get_data_provider():
+    if DATA_PROVIDER_ASYNC:
+        # 异步提供者经同步适配器包装后供 MatchService 使用
+        from api.base import SyncProviderAdapter
+        return SyncProviderAdapter(get_async_data_provider())
+
     if DATA_PROVIDER == 'sporttery':
         from api.sporttery_provider import SportteryProvider
         return SportteryProvider()
+    elif DATA_PROVIDER == 'replay':
+        from api.replay_provider import ReplayProvider
+        return ReplayProvider()
     elif DATA_PROVIDER == 'jisuapi':
         from api.jisuapi_provider import JisuAPIProvider
         return JisuAPIProvider()
     else:
         from api.mock_provider import MockProvider
         return MockProvider()
+
+
+def get_async_data_provider():
+    if DATA_PROVIDER == 'sporttery':
+        from api.sporttery_provider import AsyncSportteryProvider
+        return AsyncSportteryProvider()
+    elif DATA_PROVIDER == 'replay':
+        from api.replay_provider import AsyncReplayProvider
+        return AsyncReplayProvider()
+    elif DATA_PROVIDER == 'jisuapi':
+        from api.jisuapi_provider import AsyncJisuAPIProvider
+        return AsyncJisuAPIProvider()
+    else:
+        from api.mock_provider import AsyncMockProvider
+        return AsyncMockProvider()
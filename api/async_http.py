@@ -0,0 +1,105 @@
+"""
+异步HTTP客户端（基于 aiohttp 连接池）
+"""
+import asyncio
+import aiohttp
+from api import json_backend
+from api.resilience import UpstreamError, retryable_status
+from api.transport import async_stats
+import config
+
+
+class AsyncHTTPClient:
+    """共享连接池的异步HTTP客户端
+
+    会话在首次请求时于当前事件循环中创建，同一事件循环内的所有请求复用连接。
+    aiohttp 自动声明并解压 gzip/deflate（安装 Brotli 时包括 br）；连接超时与读取超时分开设置，
+    请求数及连接新建/复用次数记入 api.transport.async_stats。
+    """
+
+    def __init__(self, headers=None, pool_size=None, connect_timeout=None, read_timeout=None):
+        self._headers = headers or {}
+        self._pool_size = pool_size or config.ASYNC_HTTP_POOL_SIZE
+        self._timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=connect_timeout if connect_timeout is not None else config.HTTP_CONNECT_TIMEOUT,
+            sock_read=read_timeout if read_timeout is not None else config.HTTP_READ_TIMEOUT,
+        )
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_size,
+                limit_per_host=self._pool_size,
+                ttl_dns_cache=300,
+                keepalive_timeout=30,
+            )
+            self._session = aiohttp.ClientSession(
+                headers=self._headers,
+                connector=connector,
+                timeout=self._timeout,
+                trace_configs=[_trace_config()],
+            )
+        return self._session
+
+    async def get_json(self, url, params=None):
+        """发送GET请求并解析JSON"""
+        async def read(resp):
+            return json_backend.loads(await resp.read())
+        return await self._get(url, params, None, read)
+
+    async def get_bytes(self, url, params=None):
+        """发送GET请求并返回原始响应体"""
+        return await self._get(url, params, None, lambda resp: resp.read())
+
+    async def get(self, url, params=None, headers=None):
+        """发送GET请求，返回包含状态码、响应头和原始响应体的 HTTPResponse"""
+        async def read(resp):
+            return HTTPResponse(resp.status, resp.headers, await resp.read())
+        return await self._get(url, params, headers, read)
+
+    async def _get(self, url, params, headers, read):
+        try:
+            async with self._get_session().get(url, params=params, headers=headers) as resp:
+                resp.raise_for_status()
+                if resp.headers.get("Content-Encoding"):
+                    async_stats.add("compressed")
+                return await read(resp)
+        except aiohttp.ClientResponseError as e:
+            raise UpstreamError(f"网络请求失败: {e}", retryable=retryable_status(e.status))
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise UpstreamError(f"网络请求失败: {e}")
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class HTTPResponse:
+    """已读取完毕的响应，属性与 requests.Response 对应"""
+
+    __slots__ = ("status_code", "headers", "content")
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+
+def _trace_config():
+    """记录请求数及新建/复用连接数的请求追踪回调"""
+    async def on_request_start(session, context, params):
+        async_stats.add("requests")
+
+    async def on_connection_create_end(session, context, params):
+        async_stats.add("connections")
+
+    async def on_connection_reuseconn(session, context, params):
+        async_stats.add("reused")
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(on_request_start)
+    trace.on_connection_create_end.append(on_connection_create_end)
+    trace.on_connection_reuseconn.append(on_connection_reuseconn)
+    return trace
@@ -1,3 +1,5 @@
+import asyncio
+import threading
 from abc import ABC, abstractmethod
 
 
@@ -38,3 +40,81 @@ class BaseDataProvider(ABC):
                 - hafu_odds: 半全场赔率 {"win_win": x, ...}
         """
         pass
+
+    def get_odds_history(self, match_id, as_series=False):
+        """获取比赛赔率历史变化数据，默认无历史数据
+
+        Args:
+            match_id: 比赛ID
+            as_series: 为True时历史以 OddsSeries 列式序列返回
+
+        Returns:
+            dict: {"had_history": [...], "hhad_history": [...]}
+        """
+        history = {"had_history": [], "hhad_history": []}
+        if as_series:
+            from api.odds_series import history_to_series
+            return history_to_series(history)
+        return history
+
+
+class AsyncBaseDataProvider(ABC):
+    """竞彩足球异步数据提供者抽象基类
+
+    方法语义及返回值与 BaseDataProvider 一致，均为协程。
+    """
+
+    @abstractmethod
+    async def get_today_matches(self, date=None):
+        """获取竞彩比赛列表，参见 BaseDataProvider.get_today_matches"""
+        pass
+
+    @abstractmethod
+    async def get_match_odds(self, match_id):
+        """获取单场比赛的完整赔率信息，参见 BaseDataProvider.get_match_odds"""
+        pass
+
+    async def get_odds_history(self, match_id, as_series=False):
+        """获取比赛赔率历史变化数据，默认无历史数据"""
+        history = {"had_history": [], "hhad_history": []}
+        if as_series:
+            from api.odds_series import history_to_series
+            return history_to_series(history)
+        return history
+
+    async def aclose(self):
+        """释放连接池等资源"""
+        pass
+
+
+class SyncProviderAdapter(BaseDataProvider):
+    """将异步数据提供者包装为同步接口，供 MatchService 和 app.py 使用
+
+    内部在独立线程中运行一个事件循环，多个调用线程可同时提交协程，
+    所有上游请求共享异步提供者的连接池。
+    """
+
+    def __init__(self, async_provider):
+        self.async_provider = async_provider
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def run(self, coro):
+        """在内部事件循环中执行协程并等待结果"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def get_today_matches(self, date=None):
+        return self.run(self.async_provider.get_today_matches(date=date))
+
+    def get_match_odds(self, match_id):
+        return self.run(self.async_provider.get_match_odds(match_id))
+
+    def get_odds_history(self, match_id, as_series=False):
+        return self.run(self.async_provider.get_odds_history(match_id, as_series=as_series))
+
+    def close(self):
+        """关闭异步提供者并停止事件循环"""
+        self.run(self.async_provider.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
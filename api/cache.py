@@ -0,0 +1,160 @@
+"""
+数据提供者缓存工具
+"""
+import asyncio
+import threading
+import time
+import metrics
+
+
+class SnapshotCache:
+    """单值快照缓存
+
+    - ttl 秒内直接返回缓存值
+    - 过期后 stale_ttl 秒内仍返回旧值，同时在后台刷新 (stale-while-revalidate)
+    - 同一时刻只有一个刷新请求在进行，并发调用方共享同一次加载结果 (single-flight)
+
+    指定 name 时命中、旧值命中及未命中次数记入 metrics.CACHE_REQUESTS。
+    """
+
+    def __init__(self, loader, ttl, stale_ttl=0, name=None):
+        self._loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded_at = None
+        self._error = None
+        self._inflight = None  # 正在进行的刷新，threading.Event
+
+    def get(self):
+        """获取缓存值，必要时触发加载；无可用值且加载失败时抛出加载异常"""
+        with self._lock:
+            age = self._age()
+            if age is not None and age < self.ttl:
+                _record(self.name, "hit")
+                return self._value
+            if age is not None and age < self.ttl + self.stale_ttl:
+                # 旧值仍可用：后台刷新，立即返回旧值
+                if self._inflight is None:
+                    self._inflight = threading.Event()
+                    threading.Thread(target=self._refresh, daemon=True).start()
+                _record(self.name, "stale")
+                return self._value
+            _record(self.name, "miss")
+            # 无可用值：发起或加入正在进行的刷新
+            event = self._inflight
+            is_leader = event is None
+            if is_leader:
+                event = self._inflight = threading.Event()
+
+        if is_leader:
+            self._refresh()
+        else:
+            event.wait()
+
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            return self._value
+
+    def invalidate(self):
+        """使缓存立即失效，下次 get() 将同步加载"""
+        with self._lock:
+            self._loaded_at = None
+
+    def _age(self):
+        if self._loaded_at is None:
+            return None
+        return time.monotonic() - self._loaded_at
+
+    def _refresh(self):
+        try:
+            value = self._loader()
+        except Exception as e:
+            with self._lock:
+                self._error = e
+                event, self._inflight = self._inflight, None
+        else:
+            with self._lock:
+                self._value = value
+                self._loaded_at = time.monotonic()
+                self._error = None
+                event, self._inflight = self._inflight, None
+        event.set()
+
+
+class AsyncSnapshotCache:
+    """协程版单值快照缓存，规则同 SnapshotCache
+
+    - ttl 秒内直接返回缓存值
+    - 过期后 stale_ttl 秒内仍返回旧值，同时在后台任务中刷新 (stale-while-revalidate)
+    - 同一时刻只有一个协程执行加载，其余协程等待并共享结果 (single-flight)
+
+    指定 name 时命中、旧值命中及未命中次数记入 metrics.CACHE_REQUESTS。
+    """
+
+    def __init__(self, loader, ttl, stale_ttl=0, name=None):
+        self._loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self._value = None
+        self._loaded_at = None
+        self._lock = None
+        self._refresh_task = None  # 正在进行的后台刷新
+
+    async def get(self):
+        """获取缓存值，必要时触发加载；无可用值且加载失败时抛出加载异常"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        age = self._age()
+        if age is not None and age < self.ttl:
+            _record(self.name, "hit")
+            return self._value
+        if age is not None and age < self.ttl + self.stale_ttl:
+            # 旧值仍可用：后台刷新，立即返回旧值
+            if self._refresh_task is None and not self._lock.locked():
+                self._refresh_task = asyncio.ensure_future(self._refresh())
+            _record(self.name, "stale")
+            return self._value
+        _record(self.name, "miss")
+        async with self._lock:
+            if self._is_fresh():
+                return self._value
+            return await self._load()
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def _age(self):
+        if self._loaded_at is None:
+            return None
+        return time.monotonic() - self._loaded_at
+
+    def _is_fresh(self):
+        age = self._age()
+        return age is not None and age < self.ttl
+
+    async def _load(self):
+        value = await self._loader()
+        self._value = value
+        self._loaded_at = time.monotonic()
+        return value
+
+    async def _refresh(self):
+        """后台刷新，失败时保留旧值，下次返回旧值时再次尝试"""
+        try:
+            async with self._lock:
+                if not self._is_fresh():
+                    await self._load()
+        except Exception:
+            pass
+        finally:
+            self._refresh_task = None
+
+
+def _record(name, result):
+    if name is not None:
+        metrics.CACHE_REQUESTS.inc(cache=name, result=result)
@@ -0,0 +1,111 @@
+"""
+上游响应指纹
+
+轮询的接口（可售比赛列表、赔率历史）大多数时候返回与上次完全相同的内容。按请求（接口 + 参数）
+记录上次响应体的摘要、ETag/Last-Modified 及解析结果：
+- 有 ETag/Last-Modified 时带上 If-None-Match/If-Modified-Since，网关返回 304 即复用上次结果
+- 否则响应体摘要与上次相同时复用上次结果，不再解码 JSON、不再解析
+
+复用的解析结果在多次调用之间共享，调用方应视为只读。
+记录可能在发出条件请求后被淘汰，此时 304 响应无法使用，parse 抛出 FingerprintMissing，
+调用方应不带条件请求头重新请求。
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+import metrics
+
+
+class FingerprintMissing(LookupError):
+    """收到 304 但已没有该请求的记录"""
+
+
+class _Entry:
+    __slots__ = ("digest", "etag", "last_modified", "parsed")
+
+    def __init__(self, digest, etag, last_modified, parsed):
+        self.digest = digest
+        self.etag = etag
+        self.last_modified = last_modified
+        self.parsed = parsed
+
+
+class ResponseFingerprints:
+    """按请求保存上次响应的指纹及解析结果，最多保留 max_entries 个请求（LRU），线程安全
+
+    指定 name 时复用次数（304 或响应体未变化）记为缓存命中，实际解析记为未命中，记入 metrics.CACHE_REQUESTS。
+    """
+
+    def __init__(self, max_entries=512, name=None):
+        self.max_entries = max_entries
+        self.name = name
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"not_modified": 0, "unchanged": 0, "parsed": 0}
+
+    def conditional_headers(self, endpoint, params=None):
+        """上次响应带有 ETag/Last-Modified 时的条件请求头"""
+        with self._lock:
+            entry = self._entries.get(self._key(endpoint, params))
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def parse(self, endpoint, params, resp, parse):
+        """返回响应的解析结果
+
+        Args:
+            resp: 具有 status_code、headers、content 属性的响应
+            parse: parse(resp) 解析响应，仅在响应与上次不同时调用；抛出异常时不记录
+
+        Raises:
+            FingerprintMissing: 响应为 304 但该请求的记录已被淘汰
+        """
+        key = self._key(endpoint, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if resp.status_code == 304:
+                if entry is None:
+                    raise FingerprintMissing(f"没有 {endpoint} 的响应记录，无法使用 304 响应")
+                self._entries.move_to_end(key)
+                self._stats["not_modified"] += 1
+                self._record("hit")
+                return entry.parsed
+
+        digest = hashlib.blake2b(resp.content, digest_size=16).digest()
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if entry is not None and entry.digest == digest:
+            with self._lock:
+                entry.etag, entry.last_modified = etag, last_modified
+                self._entries.move_to_end(key)
+                self._stats["unchanged"] += 1
+            self._record("hit")
+            return entry.parsed
+
+        parsed = parse(resp)
+        with self._lock:
+            self._entries[key] = _Entry(digest, etag, last_modified, parsed)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._stats["parsed"] += 1
+        self._record("miss")
+        return parsed
+
+    def stats(self):
+        """304 命中数、响应体未变化命中数及实际解析次数"""
+        with self._lock:
+            return dict(self._stats)
+
+    def _record(self, result):
+        if self.name is not None:
+            metrics.CACHE_REQUESTS.inc(cache=self.name, result=result)
+
+    @staticmethod
+    def _key(endpoint, params):
+        return endpoint, tuple(sorted((params or {}).items()))
@@ -1,60 +1,112 @@
-import requests
-from api.base import BaseDataProvider
+import asyncio
+from datetime import datetime
+from api import json_backend
+from api.base import BaseDataProvider, AsyncBaseDataProvider
+from api.cache import SnapshotCache, AsyncSnapshotCache
+from api.resilience import UpstreamError, get_guard
+from api.transport import get_transport
 import config
 
 
-class JisuAPIProvider(BaseDataProvider):
-    """极速数据API提供者 - 需要有效的API Key才能使用"""
+class JisuAPIParser:
+    """极速数据接口数据解析，同步与异步提供者共用"""
 
     BASE_URL = "https://api.jisuapi.com"
 
+    # 查询的主流联赛
+    LEAGUES = ["英超", "西甲", "德甲", "意甲", "法甲"]
+
+    def _parse_league_matches(self, result, league):
+        """解析 /football/query 返回的单个联赛比赛列表"""
+        match_list = result if isinstance(result, list) else result.get("list", [])
+        return [
+            {
+                "match_id": str(item.get("matchid", "")),
+                "match_time": item.get("matchtime", ""),
+                "league": league,
+                "home_team": item.get("hometeam", ""),
+                "away_team": item.get("awayteam", ""),
+            }
+            for item in match_list
+        ]
+
+    @staticmethod
+    def _with_empty_odds(match):
+        """返回补充了空赔率数据的比赛副本"""
+        return {
+            **match,
+            "had_odds": {"win": 0, "draw": 0, "lose": 0},
+            "hhad_odds": {"handicap": 0, "win": 0, "draw": 0, "lose": 0},
+            "crs_odds": {},
+            "ttg_odds": {},
+            "hafu_odds": {},
+        }
+
+
+class JisuAPIProvider(JisuAPIParser, BaseDataProvider):
+    """极速数据API提供者 - 需要有效的API Key才能使用"""
+
     def __init__(self):
         self.appkey = config.JISUAPI_KEY
         if not self.appkey:
             raise ValueError("JISUAPI_KEY 未配置，请在 .env 文件中设置")
+        # 今日比赛列表缓存及 match_id -> match 索引，随列表刷新整体替换
+        self._matches_cache = SnapshotCache(
+            self._fetch_today_matches, ttl=config.JISUAPI_CACHE_TTL, name="jisuapi_matches"
+        )
+        self._match_index = {}
+        # 共享的连接池，见 api.transport
+        self._transport = get_transport()
+        # 极速数据请求的限速、重试与熔断，同步/异步提供者共用
+        self._guard = get_guard("jisuapi")
 
     def _request(self, endpoint, params=None):
-        url = f"{self.BASE_URL}{endpoint}"
-        if params is None:
-            params = {}
+        """发送API请求（限速、失败重试、熔断）"""
+        return self._guard.call(self._send, endpoint, params)
+
+    def _send(self, endpoint, params):
+        """发送单次请求"""
+        params = dict(params or {})
         params["appkey"] = self.appkey
-        resp = requests.get(url, params=params, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
+        resp = self._transport.get(f"{self.BASE_URL}{endpoint}", params=params)
+        try:
+            data = json_backend.loads(resp.content)
+        except ValueError as e:
+            raise UpstreamError(f"响应解析失败: {e}")
         if data.get("status") != "0":
             raise RuntimeError(f"API错误: {data.get('msg', '未知错误')}")
         return data.get("result", {})
 
     def get_today_matches(self):
+        """获取今日比赛（带缓存），全部联赛查询失败时抛出异常"""
+        matches = self._matches_cache.get()
+        return [dict(m) for m in matches]
+
+    def _fetch_today_matches(self):
         """调用极速数据足球赛事接口获取今日比赛
 
         接口: /football/query
         注意: 极速数据可能不直接提供竞彩场次，此处获取主流联赛赛程作为参考。
         实际竞彩场次需根据API返回数据进一步适配。
+        单个联赛查询失败时跳过该联赛；全部失败时抛出最后一个异常，不缓存空列表。
         """
-        from datetime import datetime
         today = datetime.now().strftime('%Y-%m-%d')
-        leagues = ["英超", "西甲", "德甲", "意甲", "法甲"]
         all_matches = []
+        errors = []
 
-        for league in leagues:
+        for league in self.LEAGUES:
             try:
                 result = self._request("/football/query", {
                     "matchname": league,
                     "date": today,
                 })
-                match_list = result if isinstance(result, list) else result.get("list", [])
-                for item in match_list:
-                    all_matches.append({
-                        "match_id": str(item.get("matchid", "")),
-                        "match_time": item.get("matchtime", ""),
-                        "league": league,
-                        "home_team": item.get("hometeam", ""),
-                        "away_team": item.get("awayteam", ""),
-                    })
-            except Exception:
-                continue
+                all_matches.extend(self._parse_league_matches(result, league))
+            except Exception as e:
+                errors.append(e)
 
+        if errors and len(errors) == len(self.LEAGUES):
+            raise errors[-1]
+        self._match_index = {m["match_id"]: m for m in all_matches}
         return all_matches
 
     def get_match_odds(self, match_id):
@@ -64,21 +116,80 @@ class JisuAPIProvider(BaseDataProvider):
         此方法预留接口，当确认API支持赔率数据后再完善实现。
         当前返回基本比赛信息，赔率部分返回空数据。
         """
-        matches = self.get_today_matches()
-        match = None
-        for m in matches:
-            if m["match_id"] == match_id:
-                match = m
-                break
+        try:
+            self._matches_cache.get()
+        except Exception:
+            pass
+        match = self._match_index.get(match_id)
+        if not match:
+            return None
+
+        return self._with_empty_odds(match)
+
+
+class AsyncJisuAPIProvider(JisuAPIParser, AsyncBaseDataProvider):
+    """极速数据API异步提供者，各联赛查询并发执行"""
+
+    def __init__(self, pool_size=None):
+        from api.async_http import AsyncHTTPClient
+        self.appkey = config.JISUAPI_KEY
+        if not self.appkey:
+            raise ValueError("JISUAPI_KEY 未配置，请在 .env 文件中设置")
+        self._client = AsyncHTTPClient(pool_size=pool_size)
+        self._matches_cache = AsyncSnapshotCache(
+            self._fetch_today_matches, ttl=config.JISUAPI_CACHE_TTL, name="jisuapi_matches"
+        )
+        self._match_index = {}
+        self._guard = get_guard("jisuapi")
 
+    async def _request(self, endpoint, params=None):
+        """发送API请求（限速、失败重试、熔断）"""
+        return await self._guard.call_async(self._send, endpoint, params)
+
+    async def _send(self, endpoint, params):
+        """发送单次请求"""
+        params = dict(params or {})
+        params["appkey"] = self.appkey
+        data = await self._client.get_json(f"{self.BASE_URL}{endpoint}", params=params)
+        if data.get("status") != "0":
+            raise RuntimeError(f"API错误: {data.get('msg', '未知错误')}")
+        return data.get("result", {})
+
+    async def get_today_matches(self, date=None):
+        """获取今日比赛（带缓存），全部联赛查询失败时抛出异常"""
+        matches = await self._matches_cache.get()
+        return [dict(m) for m in matches]
+
+    async def _fetch_today_matches(self):
+        """规则同 JisuAPIProvider._fetch_today_matches"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        results = await asyncio.gather(
+            *(self._request("/football/query", {"matchname": league, "date": today})
+              for league in self.LEAGUES),
+            return_exceptions=True,
+        )
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors and len(errors) == len(self.LEAGUES):
+            raise errors[-1]
+        all_matches = []
+        for league, result in zip(self.LEAGUES, results):
+            if isinstance(result, Exception):
+                continue
+            all_matches.extend(self._parse_league_matches(result, league))
+
+        self._match_index = {m["match_id"]: m for m in all_matches}
+        return all_matches
+
+    async def get_match_odds(self, match_id):
+        """获取比赛赔率信息，赔率部分返回空数据，参见 JisuAPIProvider.get_match_odds"""
+        try:
+            await self._matches_cache.get()
+        except Exception:
+            pass
+        match = self._match_index.get(match_id)
         if not match:
             return None
+        return self._with_empty_odds(match)
 
-        match.update({
-            "had_odds": {"win": 0, "draw": 0, "lose": 0},
-            "hhad_odds": {"handicap": 0, "win": 0, "draw": 0, "lose": 0},
-            "crs_odds": {},
-            "ttg_odds": {},
-            "hafu_odds": {},
-        })
-        return match
+    async def aclose(self):
+        await self._client.close()
@@ -0,0 +1,42 @@
+"""
+JSON 编解码后端
+
+上游响应解码和 API 响应编码共用。JSON_BACKEND 为 auto（默认）时，安装了 orjson 即使用 orjson，
+否则使用标准库 json；也可指定 orjson 或 json。
+
+两种后端的输出均为紧凑的 UTF-8 JSON（不转义中文）；orjson 会将 NaN/Infinity 输出为 null。
+"""
+import json
+import config
+
+
+def _json_dumps(obj, default=None):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default).encode("utf-8")
+
+
+def get_backend(name="auto"):
+    """按名称获取后端
+
+    Args:
+        name: "auto" / "orjson" / "json"
+
+    Returns:
+        tuple: (名称, loads, dumps)。loads(bytes 或 str) 格式错误时抛出 ValueError；
+            dumps(obj, default=None) 返回 UTF-8 bytes，default 为无法直接编码对象的转换函数
+    """
+    if name not in ("auto", "orjson", "json"):
+        raise ValueError(f"不支持的 JSON_BACKEND: {name}")
+    if name != "json":
+        try:
+            import orjson
+        except ImportError:
+            if name == "orjson":
+                raise RuntimeError("JSON_BACKEND=orjson 需要安装 orjson")
+        else:
+            def orjson_dumps(obj, default=None):
+                return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+            return "orjson", orjson.loads, orjson_dumps
+    return "json", json.loads, _json_dumps
+
+
+BACKEND, loads, dumps = get_backend(config.JSON_BACKEND)
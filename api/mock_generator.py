@@ -0,0 +1,262 @@
+"""
+模拟比赛数据生成器
+
+按随机种子生成可复现的比赛列表和赔率变化历史，用于离线开发和压测。
+
+- 主客队进球数服从泊松分布，胜平负/让球胜平负/比分/总进球/半全场赔率均由同一组
+  期望进球数按固定返奖率换算，彼此一致
+- 期望进球数随时间做对数随机游走，形成赔率漂移；让球数在指定次数的时间点调整
+- 更新时间按指数分布间隔生成，并混入同一分钟内的连续更新和少量时间乱序的记录，
+  与竞彩网实际返回的数据特征一致
+"""
+import math
+import zlib
+from datetime import datetime, timedelta
+import numpy as np
+from api.odds_series import format_timestamps
+
+# 返奖率：赔率 = 返奖率 / 概率
+RETURN_RATE = 0.89
+# 泊松分布计算的最大进球数
+MAX_GOALS = 10
+# 期望进球数每次更新的对数波动
+DRIFT_SIGMA = 0.03
+# 同一分钟内连续更新、相邻记录时间乱序的比例
+SAME_MINUTE_RATIO = 0.15
+OUT_OF_ORDER_RATIO = 0.03
+# 让球胜平负更新时间相对胜平负的最大偏移(秒)
+HHAD_JITTER = 120
+
+DEFAULT_LEAGUES = ("英超", "西甲", "德甲", "意甲", "法甲")
+
+LEAGUE_TEAMS = {
+    "英超": ["曼城", "利物浦", "阿森纳", "切尔西", "曼联", "热刺", "纽卡斯尔", "阿斯顿维拉"],
+    "西甲": ["皇家马德里", "巴塞罗那", "马德里竞技", "塞维利亚", "皇家社会", "比利亚雷亚尔"],
+    "德甲": ["拜仁慕尼黑", "多特蒙德", "勒沃库森", "莱比锡红牛", "法兰克福", "斯图加特"],
+    "意甲": ["国际米兰", "AC米兰", "尤文图斯", "那不勒斯", "罗马", "拉齐奥", "亚特兰大"],
+    "法甲": ["巴黎圣日耳曼", "马赛", "摩纳哥", "里尔", "里昂", "朗斯"],
+}
+
+HAFU_KEYS = [f"{a}_{b}" for a in ("win", "draw", "lose") for b in ("win", "draw", "lose")]
+
+_GOALS = np.arange(MAX_GOALS + 1)
+_FACTORIALS = np.array([math.factorial(k) for k in _GOALS], dtype=np.float64)
+# 主队进球 - 客队进球
+_GOAL_DIFF = np.subtract.outer(_GOALS, _GOALS)
+_TOTAL_GOALS = np.add.outer(_GOALS, _GOALS)
+
+
+class MockDataGenerator:
+    """可复现的模拟比赛与赔率历史生成器
+
+    Args:
+        seed: 随机种子，相同参数和种子生成完全相同的数据
+        leagues: 联赛列表
+        history_length: 每场比赛胜平负/让球胜平负各自的赔率变化记录条数
+        tick_interval: 相邻两次赔率更新的平均间隔(秒)
+        handicap_changes: 每场比赛让球数调整的次数
+    """
+
+    def __init__(self, seed=42, leagues=DEFAULT_LEAGUES, history_length=30,
+                 tick_interval=1800, handicap_changes=1):
+        self.seed = seed
+        self.leagues = list(leagues) or list(DEFAULT_LEAGUES)
+        self.history_length = history_length
+        self.tick_interval = tick_interval
+        self.handicap_changes = handicap_changes
+
+    def generate_matches(self, date, count):
+        """生成指定日期的 count 场比赛（含当前赔率，不含历史）"""
+        day = datetime.strptime(date, "%Y-%m-%d")
+        rng = np.random.default_rng([self.seed, int(day.strftime("%Y%m%d"))])
+        matches = []
+        for i in range(count):
+            league = self.leagues[i % len(self.leagues)]
+            teams = LEAGUE_TEAMS.get(league) or [f"{league}{k}队" for k in range(1, 11)]
+            home, away = rng.choice(len(teams), size=2, replace=False)
+            # 开赛时间在 12:00-23:30 之间，每半小时一档
+            kickoff = day + timedelta(hours=12, minutes=30 * int(rng.integers(0, 24)))
+            match = {
+                "match_id": f"{day.strftime('%Y%m%d')}{i + 1:03d}",
+                "match_time": kickoff.strftime("%Y-%m-%d %H:%M"),
+                "league": league,
+                "home_team": teams[home],
+                "away_team": teams[away],
+            }
+            match.update(self._current_odds(match))
+            matches.append(match)
+        matches.sort(key=lambda m: m["match_time"])
+        return matches
+
+    def generate_history(self, match):
+        """生成单场比赛的赔率变化历史，格式与 get_odds_history 返回值一致"""
+        n = self.history_length
+        if n <= 0:
+            return {"had_history": [], "hhad_history": []}
+        rng = self._match_rng(match["match_id"])
+        home_xg, away_xg = self._expected_goals(rng, n)
+        handicap = self._handicap_path(rng, home_xg, away_xg)
+
+        had = _outcome_odds(home_xg, away_xg, np.zeros(n))
+        hhad = _outcome_odds(home_xg, away_xg, handicap)
+
+        kickoff = int(np.datetime64(match["match_time"].replace(" ", "T"), "s").astype(np.int64))
+        had_ts = self._timestamps(rng, n, kickoff)
+        jitter = rng.integers(-HHAD_JITTER, HHAD_JITTER + 1, size=n)
+        jitter[rng.random(n) < 0.6] = 0
+        hhad_ts = np.minimum(had_ts + jitter, kickoff - 60)
+
+        return {
+            "had_history": _records(had_ts, had),
+            "hhad_history": _records(hhad_ts, hhad, handicap),
+        }
+
+    def _current_odds(self, match):
+        """当前赔率，与赔率历史最后一条一致；比分/总进球/半全场由最终期望进球数换算
+
+        只计算最终状态，不生成完整历史。
+        """
+        rng = self._match_rng(match["match_id"])
+        n = max(self.history_length, 1)
+        home_xg, away_xg = self._expected_goals(rng, n)
+        handicap = self._handicap_path(rng, home_xg, away_xg)[-1:]
+        home, away = float(home_xg[-1]), float(away_xg[-1])
+
+        had = [float(o[0]) for o in _outcome_odds(home_xg[-1:], away_xg[-1:], np.zeros(1))]
+        hhad = [float(o[0]) for o in _outcome_odds(home_xg[-1:], away_xg[-1:], handicap)]
+        return {
+            "had_odds": {"win": had[0], "draw": had[1], "lose": had[2]},
+            "hhad_odds": {
+                "handicap": float(handicap[0]),
+                "win": hhad[0], "draw": hhad[1], "lose": hhad[2],
+            },
+            "crs_odds": _score_odds(home, away),
+            "ttg_odds": _total_goal_odds(home, away),
+            "hafu_odds": _half_full_odds(home, away),
+        }
+
+    def _match_rng(self, match_id):
+        return np.random.default_rng([self.seed, zlib.crc32(str(match_id).encode("utf-8"))])
+
+    def _expected_goals(self, rng, n):
+        """主客队期望进球数的随机游走，长度 n"""
+        start = np.exp(rng.normal([math.log(1.45), math.log(1.15)], 0.3))
+        steps = rng.normal(0.0, DRIFT_SIGMA, size=(n, 2))
+        steps[0] = 0.0
+        path = np.clip(start * np.exp(np.cumsum(steps, axis=0)), 0.2, 4.0)
+        return path[:, 0], path[:, 1]
+
+    def _handicap_path(self, rng, home_xg, away_xg):
+        """让球数序列：初始按实力差设定，在 handicap_changes 个时间点各调整一次"""
+        n = len(home_xg)
+        handicap = np.empty(n, dtype=np.int64)
+        current = _initial_handicap(home_xg[0] - away_xg[0])
+        changes = min(self.handicap_changes, n - 1)
+        change_at = np.sort(rng.choice(np.arange(1, n), size=changes, replace=False)) if changes > 0 else []
+        start = 0
+        for i in change_at:
+            handicap[start:i] = current
+            target = _initial_handicap(home_xg[i] - away_xg[i])
+            step = 1 if target > current else -1 if target < current else int(rng.choice([-1, 1]))
+            current += step
+            # 竞彩让球数不为 0
+            if current == 0:
+                current += step
+            start = i
+        handicap[start:] = current
+        return handicap
+
+    def _timestamps(self, rng, n, kickoff):
+        """n 个更新时间（秒级时间戳），最后一条在开赛前，含同分钟更新和少量乱序"""
+        gaps = rng.exponential(self.tick_interval, size=n).astype(np.int64) + 1
+        same_minute = rng.random(n) < SAME_MINUTE_RATIO
+        gaps[same_minute] = rng.integers(1, 20, size=int(same_minute.sum()))
+        end = kickoff - 600
+        ts = end - np.cumsum(gaps[::-1])[::-1] + gaps[-1]
+        # 相邻记录时间乱序
+        for i in np.flatnonzero(rng.random(n - 1) < OUT_OF_ORDER_RATIO):
+            ts[i], ts[i + 1] = ts[i + 1], ts[i]
+        return ts
+
+
+def _initial_handicap(goal_diff):
+    value = -int(round(goal_diff))
+    if value == 0:
+        value = -1 if goal_diff >= 0 else 1
+    return max(-3, min(3, value))
+
+
+def _poisson(lam):
+    """lam 形状 (n,)，返回 (n, MAX_GOALS+1) 的泊松概率"""
+    lam = np.asarray(lam, dtype=np.float64)[:, None]
+    return lam ** _GOALS * np.exp(-lam) / _FACTORIALS
+
+
+def _to_odds(prob):
+    with np.errstate(divide="ignore"):
+        odds = RETURN_RATE / np.maximum(prob, 1e-6)
+    return np.maximum(np.round(odds, 2), 1.01)
+
+
+def _outcome_odds(home_xg, away_xg, handicap):
+    """胜/平/负赔率数组，handicap 为主队让球数（负数表示主让）"""
+    joint = _poisson(home_xg)[:, :, None] * _poisson(away_xg)[:, None, :]
+    diff = _GOAL_DIFF[None, :, :] + np.asarray(handicap)[:, None, None]
+    win = (joint * (diff > 0)).sum(axis=(1, 2))
+    draw = (joint * (diff == 0)).sum(axis=(1, 2))
+    lose = (joint * (diff < 0)).sum(axis=(1, 2))
+    return _to_odds(win), _to_odds(draw), _to_odds(lose)
+
+
+def _records(timestamps, odds, handicap=None):
+    dates, times = format_timestamps(np.asarray(timestamps, dtype=np.int64))
+    win, draw, lose = (o.tolist() for o in odds)
+    records = []
+    for i in range(len(dates)):
+        item = {"update_date": dates[i], "update_time": times[i]}
+        if handicap is not None:
+            h = int(handicap[i])
+            item["handicap"] = f"+{h}" if h > 0 else str(h)
+        item["win"] = win[i]
+        item["draw"] = draw[i]
+        item["lose"] = lose[i]
+        records.append(item)
+    return records
+
+
+def _score_odds(home, away):
+    joint = _poisson([home])[0][:, None] * _poisson([away])[0][None, :]
+    return {f"{h}:{a}": float(_to_odds(joint[h, a])) for h in range(6) for a in range(6)
+            if h + a <= 6 and abs(h - a) <= 3}
+
+
+def _total_goal_odds(home, away):
+    joint = _poisson([home])[0][:, None] * _poisson([away])[0][None, :]
+    odds = {str(g): float(_to_odds(joint[_TOTAL_GOALS == g].sum())) for g in range(7)}
+    odds["7+"] = float(_to_odds(joint[_TOTAL_GOALS >= 7].sum()))
+    return odds
+
+
+def _half_full_odds(home, away):
+    """半场按全场期望进球数的 45% 计算，下半场为剩余部分"""
+    first = _goal_diff_distribution(home * 0.45, away * 0.45)
+    second = _goal_diff_distribution(home * 0.55, away * 0.55)
+    diffs = np.arange(-MAX_GOALS, MAX_GOALS + 1)
+    joint = first[:, None] * second[None, :]
+    half = np.sign(diffs)[:, None].repeat(len(diffs), axis=1)
+    full = np.sign(np.add.outer(diffs, diffs))
+
+    signs = {"win": 1, "draw": 0, "lose": -1}
+    odds = {}
+    for key in HAFU_KEYS:
+        half_result, full_result = key.split("_")
+        mask = (half == signs[half_result]) & (full == signs[full_result])
+        odds[key] = float(_to_odds(joint[mask].sum()))
+    return odds
+
+
+def _goal_diff_distribution(home, away):
+    """净胜球(-MAX_GOALS..MAX_GOALS)的概率分布"""
+    joint = _poisson([home])[0][:, None] * _poisson([away])[0][None, :]
+    return np.bincount((_GOAL_DIFF + MAX_GOALS).ravel(), weights=joint.ravel(),
+                       minlength=2 * MAX_GOALS + 1)
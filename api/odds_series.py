@@ -0,0 +1,154 @@
+"""
+列式赔率历史序列
+
+将 had_history / hhad_history 的字典列表转换为并列的 NumPy 数组：
+时间戳为 int64 秒（按更新日期+时间解析一次），赔率为 float32，让球数为 float32。
+"""
+import re
+import numpy as np
+
+# 无法解析的时间戳
+INVALID_TS = np.iinfo(np.int64).min
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_TIME_RE = re.compile(r"\d{2}:\d{2}:\d{2}")
+
+
+class OddsSeries:
+    """单个玩法（胜平负/让球胜平负）的赔率变化序列"""
+
+    __slots__ = ("timestamps", "win", "draw", "lose", "handicap", "_handicap_text", "_raw_times")
+
+    def __init__(self, timestamps, win, draw, lose, handicap=None, handicap_text=None, raw_times=None):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.win = np.asarray(win, dtype=np.float32)
+        self.draw = np.asarray(draw, dtype=np.float32)
+        self.lose = np.asarray(lose, dtype=np.float32)
+        # 胜平负序列无让球数，handicap 为 None
+        self.handicap = None if handicap is None else np.asarray(handicap, dtype=np.float32)
+        # 让球数原始文本（如 "+1"），转换回字典时保持原样
+        self._handicap_text = handicap_text or {}
+        # 无法解析的时间保留原始文本：{下标: (更新日期, 更新时间)}
+        self._raw_times = raw_times or {}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @classmethod
+    def from_records(cls, records, with_handicap=False):
+        """由 get_odds_history 返回的字典列表构建序列"""
+        win = np.array([r.get("win") or 0 for r in records], dtype=np.float32)
+        draw = np.array([r.get("draw") or 0 for r in records], dtype=np.float32)
+        lose = np.array([r.get("lose") or 0 for r in records], dtype=np.float32)
+        dates = [r.get("update_date", "") for r in records]
+        times = [r.get("update_time", "") for r in records]
+        timestamps = parse_timestamps(dates, times)
+        raw_times = {i: (dates[i], times[i]) for i in np.flatnonzero(timestamps == INVALID_TS).tolist()}
+
+        if not with_handicap:
+            return cls(timestamps, win, draw, lose, raw_times=raw_times)
+
+        handicap = np.empty(len(records), dtype=np.float32)
+        handicap_text = {}
+        for i, r in enumerate(records):
+            text = r.get("handicap", "")
+            value = _handicap_value(text)
+            handicap[i] = value
+            handicap_text.setdefault(float(handicap[i]), text)
+        return cls(timestamps, win, draw, lose, handicap, handicap_text, raw_times)
+
+    def update_times(self):
+        """(更新日期列表, 更新时间列表)，与构建序列时的原始文本一致"""
+        dates, times = format_timestamps(self.timestamps)
+        for i, (date_str, time_str) in self._raw_times.items():
+            dates[i] = date_str
+            times[i] = time_str
+        return dates, times
+
+    def to_records(self):
+        """转换回 get_odds_history 的字典列表格式"""
+        dates, times = self.update_times()
+        win = self.win.tolist()
+        draw = self.draw.tolist()
+        lose = self.lose.tolist()
+        handicap = None if self.handicap is None else self.handicap.tolist()
+
+        records = []
+        for i in range(len(self)):
+            item = {"update_date": dates[i], "update_time": times[i]}
+            if handicap is not None:
+                item["handicap"] = self._handicap_text.get(handicap[i], "")
+            item["win"] = round(win[i], 2)
+            item["draw"] = round(draw[i], 2)
+            item["lose"] = round(lose[i], 2)
+            records.append(item)
+        return records
+
+
+def parse_timestamps(dates, times):
+    """将日期、时间字符串列表解析为 int64 秒级时间戳数组
+
+    仅解析 YYYY-MM-DD 和 HH:MM:SS 格式（保证能原样转换回文本），其余记为 INVALID_TS。
+    """
+    result = np.full(len(dates), INVALID_TS, dtype=np.int64)
+    standard = [
+        i for i, (d, t) in enumerate(zip(dates, times))
+        if isinstance(d, str) and isinstance(t, str) and _DATE_RE.fullmatch(d) and _TIME_RE.fullmatch(t)
+    ]
+    if not standard:
+        return result
+    values = [f"{dates[i]}T{times[i]}" for i in standard]
+    try:
+        result[standard] = np.array(values, dtype="datetime64[s]").astype(np.int64)
+        return result
+    except ValueError:
+        pass
+
+    for i, v in zip(standard, values):
+        try:
+            result[i] = np.datetime64(v, "s").astype(np.int64)
+        except ValueError:
+            continue
+    return result
+
+
+def format_timestamps(timestamps):
+    """将时间戳数组转换回 (日期列表, 时间列表)，无效时间戳为空字符串"""
+    valid = timestamps != INVALID_TS
+    text = np.datetime_as_string(np.where(valid, timestamps, 0).astype("datetime64[s]"))
+    dates = []
+    times = []
+    for ok, value in zip(valid.tolist(), text.tolist()):
+        if ok:
+            date_part, time_part = value.split("T")
+            dates.append(date_part)
+            times.append(time_part)
+        else:
+            dates.append("")
+            times.append("")
+    return dates, times
+
+
+def history_to_series(history):
+    """将 {"had_history": [...], "hhad_history": [...]} 转换为 OddsSeries"""
+    return {
+        "had_history": OddsSeries.from_records(history.get("had_history", [])),
+        "hhad_history": OddsSeries.from_records(history.get("hhad_history", []), with_handicap=True),
+    }
+
+
+def series_to_history(history):
+    """history_to_series 的逆转换，得到可直接 JSON 序列化的字典"""
+    return {
+        key: value.to_records() if isinstance(value, OddsSeries) else value
+        for key, value in history.items()
+    }
+
+
+def _handicap_value(text):
+    if text is None or text == "":
+        return 0.0
+    try:
+        return float(str(text).replace("+", ""))
+    except (ValueError, TypeError):
+        return 0.0
@@ -0,0 +1,163 @@
+"""
+赔率历史本地存储（SQLite）
+
+按比赛ID保存胜平负(HAD)/让球胜平负(HHAD)赔率变化记录，每条记录以 (比赛ID, 玩法, 更新日期,
+更新时间) 为键。同步时与已存储的记录逐条比较，只写入新增或内容有变化（含位置变化）的记录，
+上游列表重排或更正某条记录时存储随之更新；已结束比赛的历史不再变化，读取时无需访问网络。
+"""
+import os
+import sqlite3
+import threading
+import config
+
+
+# 表结构版本，记录在 PRAGMA user_version
+SCHEMA_VERSION = 2
+
+
+class OddsHistoryStore:
+    """赔率历史本地存储"""
+
+    POOLS = ("had", "hhad")
+
+    def __init__(self, path):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+
+    def _migrate(self):
+        """建表；版本 1 的记录以 (比赛ID, 玩法, 序号) 为主键，迁移为以更新时间为键"""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS odds_ticks_v2 (
+                    match_id TEXT NOT NULL,
+                    pool TEXT NOT NULL,
+                    update_date TEXT NOT NULL,
+                    update_time TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    handicap TEXT,
+                    win REAL,
+                    draw REAL,
+                    lose REAL,
+                    PRIMARY KEY (match_id, pool, update_date, update_time)
+                );
+                CREATE TABLE IF NOT EXISTS odds_matches (
+                    match_id TEXT PRIMARY KEY,
+                    finished INTEGER NOT NULL DEFAULT 0
+                );
+            """)
+            if version < SCHEMA_VERSION:
+                has_v1 = self._conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'odds_ticks'"
+                ).fetchone()
+                if has_v1:
+                    # 同一时间有多条记录时保留序号最大的一条
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO odds_ticks_v2 SELECT match_id, pool, update_date, "
+                        "update_time, seq, handicap, win, draw, lose FROM odds_ticks ORDER BY seq"
+                    )
+                    self._conn.execute("DROP TABLE odds_ticks")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def is_finished(self, match_id):
+        """比赛是否已结束且历史已完整存储"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT finished FROM odds_matches WHERE match_id = ?", (match_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def sync(self, match_id, history, finished=False, replace=False):
+        """将上游返回的完整历史写入存储
+
+        以 (更新日期, 更新时间) 与已存储记录比较，只写入新增或有变化的记录。
+
+        Args:
+            match_id: 比赛ID
+            history: {"had_history": [...], "hhad_history": [...]}
+            finished: 比赛是否已结束，结束后读取不再访问网络
+            replace: 同时删除上游列表中已不存在的记录（重新获取完整历史时使用）；
+                上游列表为空时不删除，避免异常的空响应清空已存储的历史
+
+        Returns:
+            int: 新增或更新的记录数
+        """
+        written = 0
+        with self._lock, self._conn:
+            for pool in self.POOLS:
+                stored = {
+                    (row[0], row[1]): row[2:]
+                    for row in self._conn.execute(
+                        "SELECT update_date, update_time, seq, handicap, win, draw, lose "
+                        "FROM odds_ticks_v2 WHERE match_id = ? AND pool = ?",
+                        (match_id, pool),
+                    )
+                }
+                latest = {}
+                for seq, item in enumerate(history.get(f"{pool}_history", [])):
+                    key = (item.get("update_date", ""), item.get("update_time", ""))
+                    latest[key] = (
+                        seq, item.get("handicap"), item.get("win"), item.get("draw"), item.get("lose"),
+                    )
+                changed = [
+                    (match_id, pool, key[0], key[1], *values)
+                    for key, values in latest.items()
+                    if stored.get(key) != values
+                ]
+                self._conn.executemany(
+                    "INSERT INTO odds_ticks_v2 (match_id, pool, update_date, update_time, seq, "
+                    "handicap, win, draw, lose) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(match_id, pool, update_date, update_time) DO UPDATE SET "
+                    "seq = excluded.seq, handicap = excluded.handicap, win = excluded.win, "
+                    "draw = excluded.draw, lose = excluded.lose",
+                    changed,
+                )
+                written += len(changed)
+                if replace and latest:
+                    self._conn.executemany(
+                        "DELETE FROM odds_ticks_v2 WHERE match_id = ? AND pool = ? "
+                        "AND update_date = ? AND update_time = ?",
+                        [(match_id, pool, *key) for key in stored.keys() - latest.keys()],
+                    )
+            self._conn.execute(
+                "INSERT INTO odds_matches (match_id, finished) VALUES (?, ?) "
+                "ON CONFLICT(match_id) DO UPDATE SET finished = MAX(finished, excluded.finished)",
+                (match_id, int(bool(finished))),
+            )
+        return written
+
+    def load(self, match_id):
+        """读取已存储的历史，格式与 get_odds_history 返回值一致"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT pool, update_date, update_time, handicap, win, draw, lose "
+                "FROM odds_ticks_v2 WHERE match_id = ? ORDER BY pool, seq",
+                (match_id,),
+            ).fetchall()
+
+        history = {"had_history": [], "hhad_history": []}
+        for pool, update_date, update_time, handicap, win, draw, lose in rows:
+            item = {"update_date": update_date, "update_time": update_time}
+            if pool == "hhad":
+                item["handicap"] = handicap
+            item.update({"win": win, "draw": draw, "lose": lose})
+            history[f"{pool}_history"].append(item)
+        return history
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_odds_store(path=None):
+    """打开赔率历史存储，path 默认为 ODDS_STORE_PATH，为空时返回 None（不启用）"""
+    if path is None:
+        path = config.ODDS_STORE_PATH
+    if not path:
+        return None
+    return OddsHistoryStore(path)
@@ -0,0 +1,83 @@
+"""
+上游原始响应的录制与回放
+
+录制时每个请求（接口 + 参数）对应 RECORDINGS_DIR 下的一个 gzip 文件，内容为上游返回的原始
+响应体，同一请求再次录制时覆盖旧文件。文件名为 <接口名>_<参数摘要>.json.gz，例如
+getFixedBonusV1_3f2a9c0d1e4b5a67.json.gz，回放时按同样的规则查找。
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import uuid
+import config
+
+
+def recording_name(endpoint, params=None):
+    """请求对应的录制文件名，参数顺序不影响结果"""
+    name = endpoint.rstrip("/").rsplit("/", 1)[-1].split(".", 1)[0]
+    key = json.dumps(sorted((str(k), str(v)) for k, v in (params or {}).items()), ensure_ascii=False)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return f"{name}_{digest}.json.gz"
+
+
+class ResponseRecorder:
+    """录制文件的读写，线程安全
+
+    Args:
+        directory: 录制目录，默认 config.RECORDINGS_DIR
+        cache: 回放时是否在内存中缓存已解压的响应体
+    """
+
+    def __init__(self, directory=None, cache=False):
+        self.directory = directory or config.RECORDINGS_DIR
+        self._cache = {} if cache else None
+        self._lock = threading.Lock()
+
+    def save(self, endpoint, params, body):
+        """写入一次原始响应（bytes），先写临时文件再重命名，读取方不会读到半个文件"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, recording_name(endpoint, params))
+        tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            with gzip.open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"录制响应失败: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def load(self, endpoint, params=None):
+        """读取录制的原始响应体，没有对应录制时抛出 RuntimeError"""
+        name = recording_name(endpoint, params)
+        if self._cache is not None:
+            body = self._cache.get(name)
+            if body is not None:
+                return body
+        try:
+            with gzip.open(os.path.join(self.directory, name), "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            raise RuntimeError(f"没有该请求的录制数据: {endpoint} {params or {}}")
+        if self._cache is not None:
+            with self._lock:
+                self._cache[name] = body
+        return body
+
+    def iter_bodies(self, endpoint):
+        """按文件名顺序产出某个接口的全部录制响应体"""
+        prefix = recording_name(endpoint).rsplit("_", 1)[0] + "_"
+        try:
+            names = sorted(
+                n for n in os.listdir(self.directory)
+                if n.startswith(prefix) and n.endswith(".json.gz")
+            )
+        except FileNotFoundError:
+            return
+        for name in names:
+            with gzip.open(os.path.join(self.directory, name), "rb") as f:
+                yield f.read()
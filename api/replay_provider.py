@@ -0,0 +1,61 @@
+"""
+竞彩网录制数据回放提供者（DATA_PROVIDER=replay）
+
+从 RECORDINGS_DIR 读取 SPORTTERY_RECORD=True 时录制的原始响应，解析、缓存和索引逻辑与
+SportteryProvider 完全相同，只是不访问网络，可用真实数据规模离线测量解析与导出的耗时。
+没有录制的请求按网络请求失败处理。
+"""
+import asyncio
+import random
+import time
+from api.recording import ResponseRecorder
+from api.sporttery_provider import SportteryProvider, AsyncSportteryProvider
+import config
+
+
+class ReplayProvider(SportteryProvider):
+    """回放录制的竞彩网响应
+
+    Args:
+        directory: 录制目录，默认 config.RECORDINGS_DIR
+        latency_ms / jitter_ms: 每个请求模拟的固定延迟及随机抖动上限(毫秒)，默认取 config
+    """
+
+    def __init__(self, directory=None, latency_ms=None, jitter_ms=None):
+        # 回放不写入录制，也不读写本地赔率存储，赔率历史每次都从录制数据解析
+        super().__init__(odds_store_path="", record=False)
+        self._replay = ResponseRecorder(directory, cache=True)
+        self._latency_ms = latency_ms if latency_ms is not None else config.REPLAY_LATENCY_MS
+        self._jitter_ms = jitter_ms if jitter_ms is not None else config.REPLAY_JITTER_MS
+
+    def _delay(self):
+        """本次请求的模拟延迟(秒)"""
+        return (self._latency_ms + random.uniform(0, self._jitter_ms)) / 1000
+
+    def _request(self, endpoint, params=None, parse=None):
+        """读取录制的响应；每次都重新解析，不使用响应指纹"""
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+        value = self._decode_response(self._replay.load(endpoint, params))
+        return parse(value) if parse is not None else value
+
+
+class AsyncReplayProvider(AsyncSportteryProvider):
+    """ReplayProvider 的异步版本，参数同 ReplayProvider"""
+
+    def __init__(self, directory=None, latency_ms=None, jitter_ms=None):
+        super().__init__(odds_store_path="", record=False)
+        self._replay = ResponseRecorder(directory, cache=True)
+        self._latency_ms = latency_ms if latency_ms is not None else config.REPLAY_LATENCY_MS
+        self._jitter_ms = jitter_ms if jitter_ms is not None else config.REPLAY_JITTER_MS
+
+    _delay = ReplayProvider._delay
+
+    async def _request(self, endpoint, params=None, parse=None):
+        """读取录制的响应，规则同 ReplayProvider._request"""
+        delay = self._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        value = self._decode_response(self._replay.load(endpoint, params))
+        return parse(value) if parse is not None else value
@@ -0,0 +1,307 @@
+"""
+上游请求保护：限速、失败重试与熔断
+
+同一上游（如竞彩网、极速数据）的所有提供者实例（同步/异步）及回填脚本共用一个 UpstreamGuard：
+- 令牌桶限速：平均每秒 rate 个请求，允许 burst 个突发
+- 重试：仅对可重试的 UpstreamError（网络错误、超时、429/5xx）重试，等待时间为带随机抖动的
+  指数退避，即 [0, min(backoff_max, backoff_base * 2^n)] 内的随机值
+- 熔断：连续 breaker_threshold 次调用失败（每次调用重试用尽后计一次）后熔断，breaker_reset 秒内
+  直接失败，之后放行一个试探请求，成功则恢复，失败则立即重新熔断
+- 请求最终失败或熔断时，若同一请求（接口 + 参数）之前成功过，返回最近一次成功的结果
+
+接口返回的业务错误（如 success=false）说明网关可用，不重试也不计入熔断。
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import OrderedDict
+import config
+import metrics
+
+
+class UpstreamError(RuntimeError):
+    """上游请求失败（网络错误、超时、HTTP 错误状态），retryable 表示是否值得重试"""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class CircuitOpenError(UpstreamError):
+    """熔断期间拒绝请求"""
+
+    def __init__(self, message):
+        super().__init__(message, retryable=False)
+
+
+def retryable_status(status):
+    """HTTP 状态是否值得重试；status 为 None 表示未收到响应（连接失败、超时等）"""
+    return status is None or status == 429 or status >= 500
+
+
+class TokenBucket:
+    """令牌桶，线程安全；rate 为 0 时不限速"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """取走一个令牌，返回调用方需要等待的秒数（令牌不足时预支，等待结束即可发送）"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class CircuitBreaker:
+    """熔断器，状态为 closed（正常）/ open（熔断）/ half_open（试探中），线程安全"""
+
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.trips = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """是否放行本次请求；熔断到期后只放行一个试探请求"""
+        if self.threshold <= 0:
+            return True
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self.state = "closed"
+
+    def record_failure(self):
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self._failures >= self.threshold):
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self.trips += 1
+
+
+class UpstreamGuard:
+    """单个上游的限速、重试、熔断及最近成功结果，参数默认取 config 中的 UPSTREAM_* 配置"""
+
+    # 保留最近成功结果的请求数
+    LAST_GOOD_SIZE = 128
+
+    def __init__(self, name, rate=None, burst=None, retries=None, backoff_base=None,
+                 backoff_max=None, breaker_threshold=None, breaker_reset=None):
+        self.name = name
+        self.retries = retries if retries is not None else config.UPSTREAM_RETRIES
+        self.backoff_base = backoff_base if backoff_base is not None else config.UPSTREAM_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else config.UPSTREAM_BACKOFF_MAX
+        self._bucket = TokenBucket(
+            rate if rate is not None else config.UPSTREAM_RATE,
+            burst if burst is not None else config.UPSTREAM_BURST,
+        )
+        self._breaker = CircuitBreaker(
+            breaker_threshold if breaker_threshold is not None else config.UPSTREAM_BREAKER_THRESHOLD,
+            breaker_reset if breaker_reset is not None else config.UPSTREAM_BREAKER_RESET,
+        )
+        self._last_good = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "failures": 0,
+            "retries": 0,
+            "throttle_waits": 0,
+            "throttle_wait_seconds": 0.0,
+            "short_circuits": 0,
+            "stale_served": 0,
+        }
+
+    def call(self, send, endpoint, params=None):
+        """调用 send(endpoint, params) 发送请求，失败时按规则重试或返回最近成功结果"""
+        attempt = 0
+        while True:
+            start = None
+            try:
+                wait = self._acquire()
+                if wait:
+                    time.sleep(wait)
+                start = time.perf_counter()
+                value = send(endpoint, params)
+            except UpstreamError as e:
+                self._observe(endpoint, start, e)
+                delay = self._on_failure(e, attempt)
+                if delay is None:
+                    return self._fallback(endpoint, params, e)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except Exception as e:
+                self._observe(endpoint, start, e)
+                self._breaker.record_success()
+                raise
+            self._observe(endpoint, start)
+            return self._on_success(endpoint, params, value)
+
+    async def call_async(self, send, endpoint, params=None):
+        """call 的异步版本，send 为协程函数"""
+        attempt = 0
+        while True:
+            start = None
+            try:
+                wait = self._acquire()
+                if wait:
+                    await asyncio.sleep(wait)
+                start = time.perf_counter()
+                value = await send(endpoint, params)
+            except UpstreamError as e:
+                self._observe(endpoint, start, e)
+                delay = self._on_failure(e, attempt)
+                if delay is None:
+                    return self._fallback(endpoint, params, e)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except Exception as e:
+                self._observe(endpoint, start, e)
+                self._breaker.record_success()
+                raise
+            self._observe(endpoint, start)
+            return self._on_success(endpoint, params, value)
+
+    def stats(self):
+        """累计请求、失败、重试、限速等待、熔断及返回旧结果的次数"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({"breaker_state": self._breaker.state, "trips": self._breaker.trips})
+        return stats
+
+    def _acquire(self):
+        """检查熔断并取令牌，返回需要等待的秒数"""
+        if not self._breaker.allow():
+            self._count("short_circuits")
+            raise CircuitOpenError(f"{self.name} 上游熔断中，暂停请求")
+        wait = self._bucket.reserve()
+        with self._lock:
+            self._stats["requests"] += 1
+            if wait:
+                self._stats["throttle_waits"] += 1
+                self._stats["throttle_wait_seconds"] += wait
+        return wait
+
+    def _observe(self, endpoint, start, error=None):
+        """记录单次请求的耗时（已发出时）及失败类型"""
+        if start is not None:
+            metrics.UPSTREAM_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, upstream=self.name, endpoint=endpoint
+            )
+        if error is not None:
+            if isinstance(error, CircuitOpenError):
+                kind = "circuit_open"
+            elif isinstance(error, UpstreamError):
+                kind = "retryable" if error.retryable else "non_retryable"
+            else:
+                kind = "other"
+            metrics.UPSTREAM_ERRORS.inc(upstream=self.name, endpoint=endpoint, kind=kind)
+
+    def _on_failure(self, error, attempt):
+        """记录失败，返回重试前的等待秒数，不再重试时返回 None"""
+        if isinstance(error, CircuitOpenError):
+            return None
+        self._count("failures")
+        if not error.retryable:
+            # 4xx 等说明网关可用，不计入熔断
+            self._breaker.record_success()
+            return None
+        if attempt >= self.retries or self._breaker.state == "half_open":
+            # 一次调用重试用尽后才计入熔断；试探请求失败时不再重试，立即重新熔断
+            self._breaker.record_failure()
+            return None
+        self._count("retries")
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _on_success(self, endpoint, params, value):
+        self._breaker.record_success()
+        key = self._key(endpoint, params)
+        with self._lock:
+            self._last_good[key] = value
+            self._last_good.move_to_end(key)
+            while len(self._last_good) > self.LAST_GOOD_SIZE:
+                self._last_good.popitem(last=False)
+        return value
+
+    def _fallback(self, endpoint, params, error):
+        """返回同一请求最近一次成功的结果，没有时抛出原异常"""
+        with self._lock:
+            value = self._last_good.get(self._key(endpoint, params))
+            if value is None:
+                raise error
+            self._stats["stale_served"] += 1
+        return value
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    @staticmethod
+    def _key(endpoint, params):
+        return endpoint, tuple(sorted((params or {}).items()))
+
+
+_guards = {}
+_guards_lock = threading.Lock()
+
+
+def get_guard(name):
+    """按上游名称获取共享的 UpstreamGuard，首次调用时按当前配置创建"""
+    with _guards_lock:
+        guard = _guards.get(name)
+        if guard is None:
+            guard = _guards[name] = UpstreamGuard(name)
+        return guard
+
+
+def guard_stats():
+    """全部上游的统计，{上游名称: stats}"""
+    with _guards_lock:
+        guards = list(_guards.values())
+    return {guard.name: guard.stats() for guard in guards}
+
+
+@metrics.register_collector
+def _guard_metrics():
+    """各上游的重试、限速等待、熔断及返回旧结果次数"""
+    stats = guard_stats()
+
+    def family(name, metric_type, documentation, key):
+        return name, metric_type, documentation, [({"upstream": n}, s[key]) for n, s in sorted(stats.items())]
+
+    states = [
+        ({"upstream": name, "state": state}, int(s["breaker_state"] == state))
+        for name, s in sorted(stats.items())
+        for state in ("closed", "open", "half_open")
+    ]
+    return [
+        family("upstream_retries_total", "counter", "上游请求重试次数", "retries"),
+        family("upstream_throttle_wait_seconds_total", "counter", "限速累计等待秒数", "throttle_wait_seconds"),
+        family("upstream_stale_served_total", "counter", "请求失败后返回最近成功结果的次数", "stale_served"),
+        family("upstream_breaker_trips_total", "counter", "熔断次数", "trips"),
+        ("upstream_breaker_state", "gauge", "熔断器当前状态", states),
+    ]
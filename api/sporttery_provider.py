@@ -2,13 +2,27 @@
 竞彩网官方数据提供者
 数据来源：https://www.sporttery.cn/
 """
-import requests
+import asyncio
+import math
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from api.base import BaseDataProvider
+from api import json_backend
+from api.base import BaseDataProvider, AsyncBaseDataProvider
+from api.cache import SnapshotCache, AsyncSnapshotCache
+from api.fingerprint import ResponseFingerprints, FingerprintMissing
+from api.odds_store import open_odds_store
+from api.odds_series import history_to_series
+from api.recording import ResponseRecorder
+from api.resilience import UpstreamError, UpstreamGuard, get_guard
+from api.transport import HTTPTransport, get_transport
+import config
+import metrics
 
 
-class SportteryProvider(BaseDataProvider):
-    """竞彩网官方API数据提供者"""
+class SportteryParser:
+    """竞彩网接口数据解析，同步与异步提供者共用"""
 
     BASE_URL = "https://webapi.sporttery.cn/gateway"
     
@@ -21,106 +35,137 @@ class SportteryProvider(BaseDataProvider):
         "Origin": "https://www.sporttery.cn",
     }
 
-    def __init__(self):
-        self._session = requests.Session()
-        self._session.headers.update(self.HEADERS)
+    @staticmethod
+    def _unwrap_response(data):
+        """检查接口返回的 success 标志并取出 value"""
+        if not data.get("success"):
+            raise RuntimeError(f"API错误: {data.get('errorMessage', '未知错误')}")
+        return data.get("value", {})
 
-    def _request(self, endpoint, params=None):
-        """发送API请求"""
-        url = f"{self.BASE_URL}{endpoint}"
+    def _decode_response(self, body):
+        """解码原始响应体并取出 value"""
         try:
-            resp = self._session.get(url, params=params, timeout=15)
-            resp.raise_for_status()
-            data = resp.json()
-            if not data.get("success"):
-                raise RuntimeError(f"API错误: {data.get('errorMessage', '未知错误')}")
-            return data.get("value", {})
-        except requests.RequestException as e:
-            raise RuntimeError(f"网络请求失败: {e}")
+            data = json_backend.loads(body)
+        except ValueError as e:
+            raise UpstreamError(f"响应解析失败: {e}")
+        return self._unwrap_response(data)
 
-    def get_today_matches(self, date=None):
-        """获取竞彩比赛列表
+    @staticmethod
+    def _copy_history(history):
+        """赔率历史的副本，避免调用方修改被指纹复用的解析结果"""
+        return {key: [dict(item) for item in items] for key, items in history.items()}
+
+    def _parse_fingerprinted(self, endpoint, params, resp, parse):
+        """解析响应；与上次响应相同（304 或响应体摘要一致）时直接返回上次的解析结果"""
+        return self._fingerprints.parse(
+            endpoint, params, resp, lambda r: parse(self._decode_response(r.content))
+        )
+
+    def _results_params(self, start_date, end_date, page_no=1):
+        """历史赛果查询参数"""
+        return {
+            "matchBeginDate": start_date,
+            "matchEndDate": end_date,
+            "leagueId": "",
+            "pageSize": str(config.RESULTS_PAGE_SIZE),
+            "pageNo": str(page_no),
+            "isFix": "0",
+            "matchPage": "1",
+            "pcOrWap": "1"
+        }
+
+    @staticmethod
+    def _page_count(result):
+        """从赛果首页数据中读取总页数"""
+        pages = result.get("pages")
+        if pages:
+            return int(pages)
+        total = int(result.get("total") or 0)
+        return max(1, math.ceil(total / config.RESULTS_PAGE_SIZE))
+
+    def _parse_match_list(self, result):
+        """解析 getMatchListV1 返回的可售比赛列表"""
+        matches = []
+        match_info_list = result.get("matchInfoList", [])
         
-        Args:
-            date: 可选，指定日期(YYYY-MM-DD)。为None时优先获取可售比赛，否则获取指定日期赛果
-        """
-        if date is None:
-            # 无指定日期：优先获取当前可售比赛
-            matches = self._get_selling_matches()
-            if matches:
-                return matches
-            return self._get_recent_results()
+        for date_group in match_info_list:
+            sub_matches = date_group.get("subMatchList", [])
+            for m in sub_matches:
+                match = self._parse_selling_match(m)
+                if match:
+                    matches.append(match)
         
-        # 指定日期：先尝试可售比赛中过滤，再查历史赛果
-        selling = self._get_selling_matches()
-        date_matches = [m for m in selling if m.get("match_time", "").startswith(date)]
-        if date_matches:
-            return date_matches
+        return matches
+
+    def _parse_result_list(self, result):
+        """解析 getUniformMatchResultV1 返回的历史赛果列表"""
+        matches = []
+        match_results = result.get("matchResult", [])
         
-        return self._get_results_by_date(date)
+        for m in match_results:
+            match = self._parse_result_match(m)
+            if match:
+                matches.append(match)
+        
+        return matches
 
-    def _get_selling_matches(self):
-        """获取当前正在销售的比赛"""
-        try:
-            result = self._request(
-                "/uniform/football/getMatchListV1.qry",
-                {"clientCode": "3001"}
-            )
-            
-            matches = []
-            match_info_list = result.get("matchInfoList", [])
-            
-            for date_group in match_info_list:
-                sub_matches = date_group.get("subMatchList", [])
-                for m in sub_matches:
-                    match = self._parse_selling_match(m)
-                    if match:
-                        matches.append(match)
-            
-            return matches
-        except Exception:
-            return []
+    def _parse_odds_history(self, result):
+        """解析 getFixedBonusV1 返回的赔率历史"""
+        odds_history = result.get("oddsHistory", {})
+        
+        # 解析胜平负历史
+        had_history = []
+        for item in odds_history.get("hadList", []):
+            had_history.append({
+                "update_date": item.get("updateDate", ""),
+                "update_time": item.get("updateTime", ""),
+                "win": self._safe_float(item.get("h")),
+                "draw": self._safe_float(item.get("d")),
+                "lose": self._safe_float(item.get("a")),
+            })
+        
+        # 解析让球胜平负历史
+        hhad_history = []
+        for item in odds_history.get("hhadList", []):
+            hhad_history.append({
+                "update_date": item.get("updateDate", ""),
+                "update_time": item.get("updateTime", ""),
+                "handicap": item.get("goalLine", ""),
+                "win": self._safe_float(item.get("h")),
+                "draw": self._safe_float(item.get("d")),
+                "lose": self._safe_float(item.get("a")),
+            })
+        
+        return {
+            "had_history": had_history,
+            "hhad_history": hhad_history,
+        }
 
-    def _get_recent_results(self):
-        """获取最近的历史赛果"""
-        today = datetime.now()
-        # 查询最近14天的赛果（扩大范围以获取更多历史数据）
-        end_date = today.strftime('%Y-%m-%d')
-        start_date = (today - timedelta(days=14)).strftime('%Y-%m-%d')
-        return self._query_results(start_date, end_date)
+    def _store_history(self, match_id, history, finished):
+        """将赔率历史增量写入本地存储
 
-    def _get_results_by_date(self, date):
-        """获取指定日期的历史赛果"""
-        return self._query_results(date, date)
+        Args:
+            finished: 请求赔率历史前比赛是否已结束，已结束时存储的历史是完整的
+        """
+        if self._odds_store is not None:
+            self._odds_store.sync(match_id, history, finished=finished)
 
-    def _query_results(self, start_date, end_date):
-        """查询指定日期范围内的历史赛果"""
-        try:
-            result = self._request(
-                "/uniform/football/getUniformMatchResultV1.qry",
-                {
-                    "matchBeginDate": start_date,
-                    "matchEndDate": end_date,
-                    "leagueId": "",
-                    "pageSize": "30",
-                    "pageNo": "1",
-                    "isFix": "0",
-                    "matchPage": "1",
-                    "pcOrWap": "1"
-                }
-            )
-            
-            matches = []
-            match_results = result.get("matchResult", [])
-            
-            for m in match_results:
-                match = self._parse_result_match(m)
-                if match:
-                    matches.append(match)
-            
-            return matches
-        except Exception:
-            return []
+    def _finished_history(self, match_id):
+        """已结束且本地存储完整的比赛返回存储的赔率历史，否则返回 None（记入缓存命中统计）"""
+        store = self._odds_store
+        if store is None:
+            return None
+        if store.is_finished(match_id):
+            metrics.CACHE_REQUESTS.inc(cache="odds_store", result="hit")
+            return store.load(match_id)
+        metrics.CACHE_REQUESTS.inc(cache="odds_store", result="miss")
+        return None
+
+    def _stored_history(self, match_id):
+        """读取本地已存储的赔率历史，未启用存储时返回空历史"""
+        if self._odds_store is None:
+            return {"had_history": [], "hhad_history": []}
+        return self._odds_store.load(match_id)
 
     def _parse_selling_match(self, m):
         """解析正在销售的比赛数据"""
@@ -201,22 +246,6 @@ class SportteryProvider(BaseDataProvider):
         
         return match
 
-    def get_match_odds(self, match_id):
-        """获取单场比赛的完整赔率信息"""
-        # 首先从可售比赛中查找
-        selling_matches = self._get_selling_matches()
-        for m in selling_matches:
-            if m.get("match_id") == match_id:
-                return self._enrich_match_odds(m)
-        
-        # 从历史赛果中查找
-        recent_results = self._get_recent_results()
-        for m in recent_results:
-            if m.get("match_id") == match_id:
-                return self._enrich_match_odds(m)
-        
-        return None
-
     def _enrich_match_odds(self, match):
         """补充完整的赔率数据"""
         # 如果是已完成的比赛，补充模拟的详细赔率
@@ -275,50 +304,472 @@ class SportteryProvider(BaseDataProvider):
         mapping = {"H": "主胜", "D": "平局", "A": "客胜"}
         return mapping.get(flag, flag)
 
-    def get_odds_history(self, match_id):
+
+class SportteryProvider(SportteryParser, BaseDataProvider):
+    """竞彩网官方API数据提供者
+
+    Args:
+        pool_size: 指定时使用独立的连接池，默认使用共享连接池（见 api.transport）
+        rate / burst: 指定时使用独立的限速、重试与熔断，默认与其他竞彩网提供者共用
+        odds_store_path: 赔率历史本地存储路径，默认 ODDS_STORE_PATH，空字符串表示不启用
+        record: 是否录制原始响应，默认 SPORTTERY_RECORD
+    """
+
+    def __init__(self, pool_size=None, rate=None, burst=None, odds_store_path=None, record=None):
+        self._transport = HTTPTransport(pool_size=pool_size) if pool_size else get_transport()
+        # 可售比赛列表缓存，并发请求共享同一次上游调用
+        self._selling_cache = SnapshotCache(
+            self._fetch_selling_matches,
+            ttl=config.SELLING_CACHE_TTL,
+            stale_ttl=config.SELLING_CACHE_STALE_TTL,
+            name="sporttery_selling",
+        )
+        # 最近14天赛果缓存，用于按ID查找已结束的比赛
+        self._recent_cache = SnapshotCache(
+            self._fetch_recent_results,
+            ttl=config.RESULTS_CACHE_TTL,
+            name="sporttery_results",
+        )
+        # match_id -> match 索引：可售比赛随列表刷新整体替换，已结束比赛永久保留
+        self._selling_index = {}
+        self._finished_index = {}
+        self._index_lock = threading.Lock()
+        # 赔率历史本地存储，已结束比赛直接读取本地数据
+        self._odds_store = open_odds_store(odds_store_path)
+        # 录制模式下保存原始响应，供 ReplayProvider 离线回放
+        record = config.SPORTTERY_RECORD if record is None else record
+        self._recorder = ResponseRecorder() if record else None
+        # 竞彩网请求的限速、重试与熔断，同步/异步提供者共用
+        if rate is None and burst is None:
+            self._guard = get_guard("sporttery")
+        else:
+            self._guard = UpstreamGuard("sporttery", rate=rate, burst=burst)
+        # 轮询接口的响应指纹，响应未变化时跳过解码和解析
+        self._fingerprints = ResponseFingerprints(name="sporttery_responses")
+
+    def _request(self, endpoint, params=None, parse=None):
+        """发送API请求（限速、失败重试、熔断）
+
+        Args:
+            parse: 可选，parse(value) 解析接口返回的 value；给出时返回解析结果，
+                响应与上次相同时直接复用上次的结果（只读）
+        """
+        return self._guard.call(partial(self._send, parse=parse), endpoint, params)
+
+    def _send(self, endpoint, params, parse=None):
+        """发送单次请求"""
+        headers = self.HEADERS
+        if parse is not None:
+            headers = {**headers, **self._fingerprints.conditional_headers(endpoint, params)}
+        resp = self._get(endpoint, params, headers)
+        if parse is None:
+            return self._decode_response(resp.content)
+        try:
+            return self._parse_fingerprinted(endpoint, params, resp, parse)
+        except FingerprintMissing:
+            # 条件请求发出后记录被淘汰，不带条件请求头重新请求
+            resp = self._get(endpoint, params, self.HEADERS)
+            return self._parse_fingerprinted(endpoint, params, resp, parse)
+
+    def _get(self, endpoint, params, headers):
+        resp = self._transport.get(f"{self.BASE_URL}{endpoint}", params=params, headers=headers)
+        if self._recorder is not None and resp.status_code != 304:
+            self._recorder.save(endpoint, params, resp.content)
+        return resp
+
+    def get_today_matches(self, date=None):
+        """获取竞彩比赛列表
+        
+        Args:
+            date: 可选，指定日期(YYYY-MM-DD)。为None时优先获取可售比赛，否则获取指定日期赛果
+
+        Raises:
+            UpstreamError: 上游请求失败且没有可返回的最近成功结果
+        """
+        if date is None:
+            # 无指定日期：优先获取当前可售比赛
+            matches = self._get_selling_matches()
+            if matches:
+                return matches
+            return self._get_recent_results()
+        
+        # 指定日期：先尝试可售比赛中过滤，再查历史赛果
+        selling = self._get_selling_matches()
+        date_matches = [m for m in selling if m.get("match_time", "").startswith(date)]
+        if date_matches:
+            return date_matches
+        
+        return self._get_results_by_date(date)
+
+    def _get_selling_matches(self):
+        """获取当前正在销售的比赛（带缓存），失败时抛出异常"""
+        matches = self._selling_cache.get()
+        # 返回副本，避免调用方修改缓存中的数据
+        return [dict(m) for m in matches]
+
+    def _fetch_selling_matches(self):
+        """从上游拉取当前正在销售的比赛"""
+        matches = self._request(
+            "/uniform/football/getMatchListV1.qry",
+            {"clientCode": "3001"},
+            parse=self._parse_match_list,
+        )
+        self._selling_index = {m["match_id"]: m for m in matches}
+        return matches
+
+    def _get_recent_results(self):
+        """获取最近的历史赛果（带缓存），失败时抛出异常"""
+        matches = self._recent_cache.get()
+        return [dict(m) for m in matches]
+
+    def _fetch_recent_results(self):
+        """从上游拉取最近的历史赛果"""
+        today = datetime.now()
+        # 查询最近14天的赛果（扩大范围以获取更多历史数据）
+        end_date = today.strftime('%Y-%m-%d')
+        start_date = (today - timedelta(days=14)).strftime('%Y-%m-%d')
+        return self._fetch_results(start_date, end_date)
+
+    def _get_results_by_date(self, date):
+        """获取指定日期的历史赛果"""
+        return self._query_results(date, date)
+
+    def _query_results(self, start_date, end_date):
+        """查询指定日期范围内的历史赛果，失败时抛出异常"""
+        matches = self._fetch_results(start_date, end_date)
+        # 比赛对象同时保存在索引中，返回副本
+        return [dict(m) for m in matches]
+
+    def iter_results(self, start_date, end_date):
+        """分页拉取指定日期范围内的历史赛果，每页到达即产出该页的比赛列表（副本）
+
+        页的产出顺序不固定，适合边拉取边处理的调用方（如回填脚本在列表拉取完之前就开始请求
+        赔率历史）。任一页失败时抛出异常。
+        """
+        for _, matches in self._iter_result_pages(start_date, end_date):
+            yield [dict(m) for m in matches]
+
+    def _fetch_results(self, start_date, end_date):
+        """从上游拉取指定日期范围内的全部历史赛果，按页码顺序返回"""
+        pages = dict(self._iter_result_pages(start_date, end_date))
+        return [m for page_no in sorted(pages) for m in pages[page_no]]
+
+    def _iter_result_pages(self, start_date, end_date):
+        """分页拉取历史赛果，逐页产出 (页码, 比赛列表)
+
+        先请求第1页获取总页数，其余页并发请求（并发数 RESULTS_PAGE_CONCURRENCY），
+        按到达顺序产出，每页到达时即记入比赛索引。任一页失败时抛出异常。
+        产出的比赛对象即索引中的对象，不应修改。
+        """
+        first = self._request(
+            "/uniform/football/getUniformMatchResultV1.qry",
+            self._results_params(start_date, end_date, 1)
+        )
+        yield 1, self._index_finished(self._parse_result_list(first))
+        
+        page_count = self._page_count(first)
+        if page_count <= 1:
+            return
+        
+        executor = ThreadPoolExecutor(
+            max_workers=min(config.RESULTS_PAGE_CONCURRENCY, page_count - 1)
+        )
+        try:
+            futures = {
+                executor.submit(self._request_result_page, start_date, end_date, page_no): page_no
+                for page_no in range(2, page_count + 1)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _request_result_page(self, start_date, end_date, page_no):
+        """请求单页历史赛果，解析并记入比赛索引"""
+        result = self._request(
+            "/uniform/football/getUniformMatchResultV1.qry",
+            self._results_params(start_date, end_date, page_no)
+        )
+        return self._index_finished(self._parse_result_list(result))
+
+    def _index_finished(self, matches):
+        """将已结束的比赛记入索引"""
+        with self._index_lock:
+            for m in matches:
+                self._finished_index[m["match_id"]] = m
+        return matches
+
+    def get_match_odds(self, match_id):
+        """获取单场比赛的完整赔率信息"""
+        match = self._lookup_match(match_id)
+        if match is None:
+            return None
+        return self._enrich_match_odds(dict(match))
+
+    def _lookup_match(self, match_id):
+        """按ID从索引中查找比赛，索引未命中时才刷新对应列表"""
+        # 首先从可售比赛中查找（缓存有效时不会发起请求）
+        self._warm_cache(self._selling_cache)
+        match = self._selling_index.get(match_id)
+        if match is not None:
+            return match
+        
+        # 已结束的比赛不再变化，直接命中
+        match = self._finished_index.get(match_id)
+        if match is not None:
+            return match
+        
+        # 从最近赛果中查找
+        self._warm_cache(self._recent_cache)
+        return self._finished_index.get(match_id)
+
+    def _is_finished_match(self, match_id):
+        """查找比赛后判断其是否已结束"""
+        self._lookup_match(match_id)
+        return match_id in self._finished_index
+
+    @staticmethod
+    def _warm_cache(cache):
+        """确保缓存已加载（索引随之更新），加载失败时沿用现有索引"""
+        try:
+            cache.get()
+        except Exception:
+            pass
+
+    def get_odds_history(self, match_id, as_series=False):
         """获取比赛赔率历史变化数据
         
         Args:
             match_id: 比赛ID
+            as_series: 为True时历史以 OddsSeries 列式序列返回
             
         Returns:
             dict: 包含胜平负和让球胜平负的历史赔率数据
         """
+        history = self._load_odds_history(match_id)
+        return history_to_series(history) if as_series else history
+
+    def fetch_odds_history(self, match_id):
+        """从竞彩网获取比赛赔率历史，不读写本地存储，失败时抛出异常"""
+        history = self._request(
+            "/uniform/football/getFixedBonusV1.qry",
+            {"clientCode": "3001", "matchId": match_id},
+            parse=self._parse_odds_history,
+        )
+        # 解析结果可能被后续请求复用，返回副本
+        return self._copy_history(history)
+
+    def _load_odds_history(self, match_id):
+        stored = self._finished_history(match_id)
+        if stored is not None:
+            return stored
+        # 请求赔率历史前确定比赛是否已结束；与 get_match_odds 并发时两者共享同一次列表加载
+        finished = self._odds_store is not None and self._is_finished_match(match_id)
+        
         try:
-            result = self._request(
-                "/uniform/football/getFixedBonusV1.qry",
-                {"clientCode": "3001", "matchId": match_id}
-            )
-            
-            odds_history = result.get("oddsHistory", {})
-            
-            # 解析胜平负历史
-            had_history = []
-            for item in odds_history.get("hadList", []):
-                had_history.append({
-                    "update_date": item.get("updateDate", ""),
-                    "update_time": item.get("updateTime", ""),
-                    "win": self._safe_float(item.get("h")),
-                    "draw": self._safe_float(item.get("d")),
-                    "lose": self._safe_float(item.get("a")),
-                })
-            
-            # 解析让球胜平负历史
-            hhad_history = []
-            for item in odds_history.get("hhadList", []):
-                hhad_history.append({
-                    "update_date": item.get("updateDate", ""),
-                    "update_time": item.get("updateTime", ""),
-                    "handicap": item.get("goalLine", ""),
-                    "win": self._safe_float(item.get("h")),
-                    "draw": self._safe_float(item.get("d")),
-                    "lose": self._safe_float(item.get("a")),
-                })
-            
-            return {
-                "had_history": had_history,
-                "hhad_history": hhad_history,
-            }
+            history = self.fetch_odds_history(match_id)
         except Exception as e:
             print(f"获取赔率历史失败: {e}")
-            return {"had_history": [], "hhad_history": []}
+            return self._stored_history(match_id)
+        
+        self._store_history(match_id, history, finished)
+        return history
+
+
+class AsyncSportteryProvider(SportteryParser, AsyncBaseDataProvider):
+    """竞彩网官方API异步数据提供者，基于 aiohttp 连接池
+
+    Args:
+        pool_size / odds_store_path / record: 同 SportteryProvider
+    """
+
+    def __init__(self, pool_size=None, odds_store_path=None, record=None):
+        from api.async_http import AsyncHTTPClient
+        self._client = AsyncHTTPClient(headers=self.HEADERS, pool_size=pool_size)
+        self._selling_cache = AsyncSnapshotCache(
+            self._fetch_selling_matches,
+            ttl=config.SELLING_CACHE_TTL,
+            stale_ttl=config.SELLING_CACHE_STALE_TTL,
+            name="sporttery_selling",
+        )
+        self._recent_cache = AsyncSnapshotCache(
+            self._fetch_recent_results, ttl=config.RESULTS_CACHE_TTL, name="sporttery_results"
+        )
+        # match_id -> match 索引，规则同 SportteryProvider
+        self._selling_index = {}
+        self._finished_index = {}
+        self._odds_store = open_odds_store(odds_store_path)
+        record = config.SPORTTERY_RECORD if record is None else record
+        self._recorder = ResponseRecorder() if record else None
+        self._guard = get_guard("sporttery")
+        self._fingerprints = ResponseFingerprints(name="sporttery_responses")
+
+    async def _request(self, endpoint, params=None, parse=None):
+        """发送API请求（限速、失败重试、熔断），参数同 SportteryProvider._request"""
+        return await self._guard.call_async(partial(self._send, parse=parse), endpoint, params)
+
+    async def _send(self, endpoint, params, parse=None):
+        """发送单次请求"""
+        headers = None
+        if parse is not None:
+            headers = self._fingerprints.conditional_headers(endpoint, params)
+        resp = await self._get(endpoint, params, headers)
+        if parse is None:
+            return self._decode_response(resp.content)
+        try:
+            return self._parse_fingerprinted(endpoint, params, resp, parse)
+        except FingerprintMissing:
+            # 条件请求发出后记录被淘汰，不带条件请求头重新请求
+            resp = await self._get(endpoint, params, None)
+            return self._parse_fingerprinted(endpoint, params, resp, parse)
+
+    async def _get(self, endpoint, params, headers):
+        resp = await self._client.get(f"{self.BASE_URL}{endpoint}", params=params, headers=headers)
+        if self._recorder is not None and resp.status_code != 304:
+            await asyncio.to_thread(self._recorder.save, endpoint, params, resp.content)
+        return resp
+
+    async def get_today_matches(self, date=None):
+        """获取竞彩比赛列表，规则同 SportteryProvider.get_today_matches"""
+        if date is None:
+            matches = await self._get_selling_matches()
+            if matches:
+                return matches
+            return await self._get_recent_results()
+        
+        selling = await self._get_selling_matches()
+        date_matches = [m for m in selling if m.get("match_time", "").startswith(date)]
+        if date_matches:
+            return date_matches
+        
+        return await self._query_results(date, date)
+
+    async def _get_selling_matches(self):
+        matches = await self._selling_cache.get()
+        return [dict(m) for m in matches]
+
+    async def _fetch_selling_matches(self):
+        matches = await self._request(
+            "/uniform/football/getMatchListV1.qry",
+            {"clientCode": "3001"},
+            parse=self._parse_match_list,
+        )
+        self._selling_index = {m["match_id"]: m for m in matches}
+        return matches
+
+    async def _get_recent_results(self):
+        matches = await self._recent_cache.get()
+        return [dict(m) for m in matches]
+
+    async def _fetch_recent_results(self):
+        today = datetime.now()
+        end_date = today.strftime('%Y-%m-%d')
+        start_date = (today - timedelta(days=14)).strftime('%Y-%m-%d')
+        return await self._fetch_results(start_date, end_date)
+
+    async def _query_results(self, start_date, end_date):
+        matches = await self._fetch_results(start_date, end_date)
+        return [dict(m) for m in matches]
+
+    async def _fetch_results(self, start_date, end_date):
+        pages = {}
+        async for page_no, matches in self._iter_result_pages(start_date, end_date):
+            pages[page_no] = matches
+        return [m for page_no in sorted(pages) for m in pages[page_no]]
+
+    async def _iter_result_pages(self, start_date, end_date):
+        """分页拉取历史赛果，逐页产出 (页码, 比赛列表)，规则同 SportteryProvider._iter_result_pages"""
+        first = await self._request(
+            "/uniform/football/getUniformMatchResultV1.qry",
+            self._results_params(start_date, end_date, 1)
+        )
+        yield 1, self._index_finished(self._parse_result_list(first))
+        
+        page_count = self._page_count(first)
+        if page_count <= 1:
+            return
+        
+        semaphore = asyncio.Semaphore(config.RESULTS_PAGE_CONCURRENCY)
+        
+        async def fetch_page(page_no):
+            async with semaphore:
+                result = await self._request(
+                    "/uniform/football/getUniformMatchResultV1.qry",
+                    self._results_params(start_date, end_date, page_no)
+                )
+            return page_no, self._index_finished(self._parse_result_list(result))
+        
+        tasks = [asyncio.ensure_future(fetch_page(n)) for n in range(2, page_count + 1)]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                yield await next_page
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _index_finished(self, matches):
+        for m in matches:
+            self._finished_index[m["match_id"]] = m
+        return matches
+
+    async def get_match_odds(self, match_id):
+        """获取单场比赛的完整赔率信息"""
+        match = await self._lookup_match(match_id)
+        if match is None:
+            return None
+        return self._enrich_match_odds(dict(match))
+
+    async def _lookup_match(self, match_id):
+        """按ID从索引中查找比赛，规则同 SportteryProvider._lookup_match"""
+        await self._warm_cache(self._selling_cache)
+        match = self._selling_index.get(match_id) or self._finished_index.get(match_id)
+        if match is None:
+            await self._warm_cache(self._recent_cache)
+            match = self._finished_index.get(match_id)
+        return match
+
+    @staticmethod
+    async def _warm_cache(cache):
+        """确保缓存已加载（索引随之更新），加载失败时沿用现有索引"""
+        try:
+            await cache.get()
+        except Exception:
+            pass
+
+    async def _is_finished_match(self, match_id):
+        """查找比赛后判断其是否已结束"""
+        await self._lookup_match(match_id)
+        return match_id in self._finished_index
+
+    async def get_odds_history(self, match_id, as_series=False):
+        """获取比赛赔率历史变化数据，参数同 SportteryProvider.get_odds_history"""
+        history = await self._load_odds_history(match_id)
+        return history_to_series(history) if as_series else history
+
+    async def fetch_odds_history(self, match_id):
+        """从竞彩网获取比赛赔率历史，参见 SportteryProvider.fetch_odds_history"""
+        history = await self._request(
+            "/uniform/football/getFixedBonusV1.qry",
+            {"clientCode": "3001", "matchId": match_id},
+            parse=self._parse_odds_history,
+        )
+        return self._copy_history(history)
+
+    async def _load_odds_history(self, match_id):
+        stored = self._finished_history(match_id)
+        if stored is not None:
+            return stored
+        # 请求赔率历史前确定比赛是否已结束；与 get_match_odds 并发时两者共享同一次列表加载
+        finished = self._odds_store is not None and await self._is_finished_match(match_id)
+        
+        try:
+            history = await self.fetch_odds_history(match_id)
+        except Exception as e:
+            print(f"获取赔率历史失败: {e}")
+            return self._stored_history(match_id)
+        
+        self._store_history(match_id, history, finished)
+        return history
+
+    async def aclose(self):
+        await self._client.close()
@@ -0,0 +1,149 @@
+"""
+上游HTTP传输层（同步，基于 requests 连接池）
+
+所有同步提供者及回填脚本共用一个 HTTPTransport：
+- 连接池大小按并发配置计算（HTTP_POOL_SIZE 为 0 时自动计算），避免线程数超过连接池后
+  多出的连接用完即丢弃
+- 声明支持 gzip/deflate，安装 brotli 时同时声明 br，响应由 urllib3 自动解压
+- 连接超时与读取超时分开设置，并开启 TCP keep-alive
+- 统计请求数、新建连接数及复用率；异步客户端（api.async_http）的统计也记在这里
+
+请求失败统一抛出 UpstreamError，由 api.resilience 判断是否重试。
+"""
+import socket
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.request import ACCEPT_ENCODING
+from api.resilience import UpstreamError, retryable_status
+import config
+import metrics
+
+
+def default_pool_size():
+    """按并发配置估算的连接池大小：导出任务及页面请求的批量拉取线程，加上赛果分页并发"""
+    return config.FETCH_CONCURRENCY * (config.EXPORT_WORKERS + 1) + config.RESULTS_PAGE_CONCURRENCY
+
+
+class TransportStats:
+    """请求数、新建连接数、复用连接数及压缩响应数，线程安全"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "connections": 0, "reused": 0, "compressed": 0}
+
+    def add(self, name, n=1):
+        with self._lock:
+            self._counts[name] += n
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self._counts)
+        stats["reuse_ratio"] = round(stats["reused"] / stats["requests"], 4) if stats["requests"] else 0.0
+        return stats
+
+
+class HTTPTransport:
+    """共享连接池的同步HTTP传输
+
+    Args:
+        pool_size: 每个主机的最大保留连接数，默认 HTTP_POOL_SIZE 或 default_pool_size()
+        connect_timeout / read_timeout: 连接超时、读取超时(秒)，默认取 config
+    """
+
+    def __init__(self, pool_size=None, connect_timeout=None, read_timeout=None):
+        self.pool_size = pool_size or config.HTTP_POOL_SIZE or default_pool_size()
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else config.HTTP_CONNECT_TIMEOUT,
+            read_timeout if read_timeout is not None else config.HTTP_READ_TIMEOUT,
+        )
+        self._adapter = _KeepAliveAdapter(pool_maxsize=self.pool_size)
+        self._session = requests.Session()
+        self._session.mount("https://", self._adapter)
+        self._session.mount("http://", self._adapter)
+        self._session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        self._counts = TransportStats()
+
+    def get(self, url, params=None, headers=None):
+        """发送GET请求，返回状态正常的响应；失败时抛出 UpstreamError"""
+        try:
+            resp = self._session.get(url, params=params, headers=headers, timeout=self.timeout)
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            status = e.response.status_code if e.response is not None else None
+            raise UpstreamError(f"网络请求失败: {e}", retryable=retryable_status(status))
+        if resp.headers.get("Content-Encoding"):
+            self._counts.add("compressed")
+        return resp
+
+    def stats(self):
+        """按连接池累计的请求数、新建连接数、复用数及复用率"""
+        requests_count = connections = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                requests_count += pool.num_requests
+                connections += pool.num_connections
+        compressed = self._counts.snapshot()["compressed"]
+        return {
+            "requests": requests_count,
+            "connections": connections,
+            "reused": requests_count - connections,
+            "compressed": compressed,
+            "reuse_ratio": round(1 - connections / requests_count, 4) if requests_count else 0.0,
+            "pool_size": self.pool_size,
+        }
+
+    def close(self):
+        self._session.close()
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """开启 TCP keep-alive 的连接池适配器"""
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault(
+            "socket_options",
+            HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)],
+        )
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+
+_transport = None
+_transport_lock = threading.Lock()
+# 异步客户端的统计，由 AsyncHTTPClient 的请求追踪回调更新
+async_stats = TransportStats()
+
+
+def get_transport():
+    """获取共享的同步HTTP传输，首次调用时按当前配置创建"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HTTPTransport()
+        return _transport
+
+
+def transport_stats():
+    """同步传输及异步客户端的连接复用统计"""
+    with _transport_lock:
+        transport = _transport
+    return {
+        "sync": transport.stats() if transport is not None else None,
+        "async": async_stats.snapshot(),
+    }
+
+
+@metrics.register_collector
+def _transport_metrics():
+    """同步传输及异步客户端的请求数和新建连接数"""
+    stats = transport_stats()
+    clients = [(client, s) for client, s in (("sync", stats["sync"]), ("async", stats["async"])) if s]
+    return [
+        ("upstream_http_requests_total", "counter", "发出的HTTP请求数",
+         [({"client": client}, s["requests"]) for client, s in clients]),
+        ("upstream_http_connections_total", "counter", "新建的HTTP连接数",
+         [({"client": client}, s["connections"]) for client, s in clients]),
+    ]
@@ -1,14 +1,96 @@
 import os
-from flask import Flask, render_template, jsonify, request, send_from_directory
-from api import get_data_provider
+import time
+from urllib.parse import quote
+from flask import Flask, Response, g, render_template, jsonify, request, send_file, send_from_directory
+from flask.json.provider import DefaultJSONProvider
+from api import get_data_provider, json_backend
+from api.resilience import CircuitOpenError, guard_stats
+from api.transport import transport_stats
 from services.match_service import MatchService
-from services.excel_service import generate_excel
+from services.excel_service import export_filename, generate_excel_buffer
+from services.export_jobs import ExportJobManager, ExportQueueFull
+from services.output_retention import OutputRetention
+from services.table_export import EXPORT_FORMATS, missing_dependency, stream_export
+from services.batch_analysis import compute_batch_odds_diffs
 import config
+import metrics
+import profiling
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify / request.get_json 使用 api.json_backend 编解码，响应始终为紧凑格式"""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return json_backend.dumps(obj, default=self.default).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return json_backend.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            json_backend.dumps(obj, default=self.default), mimetype=self.mimetype
+        )
+
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
 provider = get_data_provider()
 match_service = MatchService(provider)
+output_retention = OutputRetention()
+output_retention.start()
+metrics.register_collector(output_retention.collect_metrics)
+# 按需请求剖析，未配置 PROFILE_SECRET 时为 None，不注册剖析钩子
+profiles = profiling.ProfileStore() if config.PROFILE_SECRET else None
+export_jobs = ExportJobManager(match_service, retention=output_retention, profiles=profiles)
+
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _observe_request(response):
+    """按路由模板记录请求耗时，未匹配路由的请求统一记为 <unmatched>，避免标签数量随URL增长"""
+    started = g.pop("request_started", None)
+    if started is not None:
+        rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            route=rule, method=request.method, status=response.status_code,
+        )
+    return response
+
+
+# 剖析结果的查看接口本身不剖析
+_UNPROFILED_ENDPOINTS = ("api_profiles", "api_profile_download")
+
+if profiles is not None:
+    @app.before_request
+    def _start_profile():
+        if request.endpoint not in _UNPROFILED_ENDPOINTS and profiling.requested(request):
+            g.profiler = profiling.StackSampler().start()
+
+    @app.after_request
+    def _save_profile(response):
+        """保存本次请求的剖析结果，文件名通过 X-Profile-File 响应头返回"""
+        sampler = g.pop("profiler", None)
+        if sampler is not None:
+            rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            response.headers["X-Profile-File"] = profiles.save(f"{request.method}_{rule}", sampler)
+        return response
+
+    @app.teardown_request
+    def _stop_profile(exc):
+        sampler = g.pop("profiler", None)
+        if sampler is not None:
+            sampler.stop()
 
 
 @app.route('/')
@@ -22,6 +104,8 @@ def api_matches():
         date = request.args.get('date')  # 可选日期参数 YYYY-MM-DD
         matches = match_service.get_today_matches(date=date)
         return jsonify({"success": True, "count": len(matches), "matches": matches})
+    except CircuitOpenError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -45,23 +129,153 @@ def api_match_odds(match_id):
 
 @app.route('/api/export', methods=['POST'])
 def api_export():
+    """导出选中比赛
+
+    format=xlsx（默认）提交后台导出任务，立即返回任务ID；mode=inline 时在本次请求中
+    生成并直接返回 xlsx 内容，不写入磁盘；
+    format=csv|jsonl|parquet 直接以流式响应返回数据。
+    """
     try:
         data = request.get_json()
         if not data or not data.get('match_ids'):
             return jsonify({"success": False, "error": "请选择至少一场比赛"}), 400
 
-        match_ids = data['match_ids']
-        matches = match_service.get_matches_by_ids(match_ids)
+        fmt = (data.get('format') or request.args.get('format') or 'xlsx').lower()
+        if fmt != 'xlsx':
+            return _stream_table_export(data['match_ids'], fmt)
+        mode = (data.get('mode') or request.args.get('mode') or 'job').lower()
+        if mode == 'inline':
+            return _inline_excel_export(data['match_ids'])
+
+        job = export_jobs.submit(data['match_ids'], profile=profiling.requested(request))
+        return jsonify({
+            "success": True,
+            "job_id": job["job_id"],
+            "status_url": f"/api/export/{job['job_id']}",
+            "job": job,
+        }), 202
+    except ExportQueueFull as e:
+        return jsonify({"success": False, "error": str(e)}), 429
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def _inline_excel_export(match_ids):
+    with metrics.EXPORT_PHASE_SECONDS.time(phase="fetch"):
+        matches, failures = match_service.get_matches_with_errors(match_ids)
+    if not matches:
+        return jsonify({"success": False, "error": "未找到选中的比赛数据", "failed": failures}), 404
 
-        if not matches:
-            return jsonify({"success": False, "error": "未找到选中的比赛数据"}), 404
+    response = send_file(
+        generate_excel_buffer(matches),
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        as_attachment=True,
+        download_name=export_filename("xlsx"),
+    )
+    # 获取失败的比赛ID，逗号分隔
+    response.headers["X-Export-Failed"] = ",".join(str(f["match_id"]) for f in failures)
+    return response
+
+
+def _stream_table_export(match_ids, fmt):
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"success": False, "error": f"不支持的导出格式: {fmt}"}), 400
+    dependency = missing_dependency(fmt)
+    if dependency is not None:
+        # 在获取比赛数据之前检查，避免白白请求上游
+        return jsonify({"success": False, "error": f"{fmt} 导出需要安装 {dependency}"}), 501
+
+    with metrics.EXPORT_PHASE_SECONDS.time(phase="fetch"):
+        matches, failures = match_service.get_matches_with_errors(match_ids)
+    if not matches:
+        return jsonify({"success": False, "error": "未找到选中的比赛数据", "failed": failures}), 404
+
+    mimetype, ext = EXPORT_FORMATS[fmt]
+    body = stream_export(matches, fmt)
+    filename = export_filename(ext)
+    headers = {
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+        # 获取失败的比赛ID，逗号分隔
+        "X-Export-Failed": ",".join(str(f["match_id"]) for f in failures),
+    }
+    return Response(body, mimetype=mimetype, headers=headers)
+
+
+@app.route('/api/export/<job_id>')
+def api_export_status(job_id):
+    """查询导出任务阶段和进度"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "导出任务不存在或已过期"}), 404
+    return jsonify({"success": True, "job": job})
+
+
+@app.route('/api/export/<job_id>/download')
+def api_export_download(job_id):
+    """下载已完成导出任务的文件"""
+    result = export_jobs.get_file(job_id)
+    if result is None:
+        return jsonify({"success": False, "error": "导出任务未完成或不存在"}), 404
+    _, filename = result
+    output_retention.touch(filename)
+    return send_from_directory(config.OUTPUT_DIR, filename, as_attachment=True)
+
+
+@app.route('/api/output/stats')
+def api_output_stats():
+    """输出目录文件数、字节数及累计淘汰量"""
+    return jsonify({"success": True, "stats": output_retention.stats()})
+
+
+@app.route('/api/upstream/stats')
+def api_upstream_stats():
+    """各上游的请求、失败、重试、限速等待、熔断次数及熔断状态，以及HTTP连接复用统计"""
+    return jsonify({"success": True, "stats": guard_stats(), "transport": transport_stats()})
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus 文本格式的运行指标，见 metrics 模块"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route('/api/profiles')
+def api_profiles():
+    """最近的剖析文件列表，需带剖析密钥"""
+    if profiles is None or not profiling.requested(request):
+        return jsonify({"success": False, "error": "剖析未启用或密钥错误"}), 404
+    return jsonify({"success": True, "profiles": profiles.list()})
+
+
+@app.route('/api/profiles/<name>')
+def api_profile_download(name):
+    """下载剖析文件（折叠栈格式），需带剖析密钥"""
+    if profiles is None or not profiling.requested(request):
+        return jsonify({"success": False, "error": "剖析未启用或密钥错误"}), 404
+    if profiles.path(name) is None:
+        return jsonify({"success": False, "error": "剖析文件不存在"}), 404
+    return send_from_directory(profiles.directory, name, as_attachment=True, mimetype="text/plain")
+
+
+@app.route('/api/analysis/diffs', methods=['POST'])
+def api_analysis_diffs():
+    """批量赔率差值分析，请求体: {"match_ids": [...]} 或 {"date": "YYYY-MM-DD"}"""
+    try:
+        data = request.get_json() or {}
+        match_ids = data.get('match_ids')
+        if not match_ids and data.get('date'):
+            match_ids = [m["match_id"] for m in match_service.get_today_matches(date=data['date'])]
+        if not match_ids:
+            return jsonify({"success": False, "error": "请提供比赛ID列表或日期"}), 400
 
-        filepath, filename = generate_excel(matches)
+        matches, failures = match_service.get_matches_with_errors(match_ids, as_series=True)
+        table = compute_batch_odds_diffs(matches)
         return jsonify({
             "success": True,
-            "filename": filename,
-            "download_url": f"/download/{filename}",
             "match_count": len(matches),
+            "row_count": len(table),
+            "diffs": table.to_columns(),
+            "failed": failures,
         })
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -69,6 +283,7 @@ def api_export():
 
 @app.route('/download/<filename>')
 def download_file(filename):
+    output_retention.touch(filename)
     return send_from_directory(
         config.OUTPUT_DIR, filename, as_attachment=True
     )
@@ -0,0 +1,126 @@
+"""
+基准测试用的合成数据
+
+按固定随机种子生成，同一参数在不同提交之间得到相同的数据，保证结果可比。
+"""
+import json
+import random
+from datetime import datetime, timedelta
+
+LEAGUES = ["英超", "西甲", "意甲", "德甲", "法甲", "日职", "韩职", "澳超"]
+TEAMS = [
+    "曼城", "利物浦", "阿森纳", "切尔西", "皇家马德里", "巴塞罗那", "马德里竞技", "国际米兰",
+    "AC米兰", "尤文图斯", "拜仁慕尼黑", "多特蒙德", "巴黎圣日耳曼", "马赛", "横滨水手", "蔚山现代",
+]
+
+
+def _odds_triple(rng):
+    return round(rng.uniform(1.2, 6.0), 2), round(rng.uniform(2.8, 4.5), 2), round(rng.uniform(1.2, 8.0), 2)
+
+
+def make_history(ticks, seed=0, with_handicap=False):
+    """生成 ticks 条赔率变化记录（get_odds_history 格式）"""
+    rng = random.Random(seed)
+    ts = datetime(2026, 1, 1, 9, 0, 0)
+    win, draw, lose = _odds_triple(rng)
+    history = []
+    for _ in range(ticks):
+        ts += timedelta(seconds=rng.randint(30, 600))
+        item = {
+            "update_date": ts.strftime("%Y-%m-%d"),
+            "update_time": ts.strftime("%H:%M:%S"),
+        }
+        if with_handicap:
+            item["handicap"] = "-1"
+        win = round(max(1.01, win + rng.uniform(-0.05, 0.05)), 2)
+        draw = round(max(1.01, draw + rng.uniform(-0.05, 0.05)), 2)
+        lose = round(max(1.01, lose + rng.uniform(-0.05, 0.05)), 2)
+        item.update({"win": win, "draw": draw, "lose": lose})
+        history.append(item)
+    return history
+
+
+def make_matches(count, ticks, seed=0):
+    """生成 count 场带完整赔率和 ticks 条历史的比赛（MatchService.get_matches_by_ids 格式）"""
+    rng = random.Random(seed)
+    matches = []
+    for i in range(count):
+        home, away = rng.sample(TEAMS, 2)
+        win, draw, lose = _odds_triple(rng)
+        matches.append({
+            "match_id": f"{2026000000 + i}",
+            "match_time": f"2026-01-02 {18 + i % 5}:00",
+            "league": rng.choice(LEAGUES),
+            "home_team": home,
+            "away_team": away,
+            "had_odds": {"win": win, "draw": draw, "lose": lose},
+            "hhad_odds": {"handicap": -1, "win": lose, "draw": draw, "lose": win},
+            "crs_odds": {f"{h}:{a}": round(rng.uniform(6, 80), 2) for h in range(4) for a in range(4)},
+            "ttg_odds": {str(g): round(rng.uniform(3, 30), 2) for g in range(7)} | {"7+": 25.0},
+            "hafu_odds": {
+                f"{a}_{b}": round(rng.uniform(3, 30), 2)
+                for a in ("win", "draw", "lose") for b in ("win", "draw", "lose")
+            },
+            "had_history": make_history(ticks, seed=seed * 100003 + i * 2),
+            "hhad_history": make_history(ticks, seed=seed * 100003 + i * 2 + 1, with_handicap=True),
+        })
+    return matches
+
+
+def make_match_list_payload(count, seed=0):
+    """生成 getMatchListV1 响应的 JSON 文本，count 场比赛按每天 50 场分组"""
+    rng = random.Random(seed)
+    groups = []
+    for day in range(0, count, 50):
+        date = (datetime(2026, 1, 1) + timedelta(days=day // 50)).strftime("%Y-%m-%d")
+        sub_matches = []
+        for i in range(day, min(day + 50, count)):
+            home, away = rng.sample(TEAMS, 2)
+            win, draw, lose = _odds_triple(rng)
+            sub_matches.append({
+                "matchId": 2026000000 + i,
+                "matchDate": date,
+                "matchTime": f"{18 + i % 5}:00:00",
+                "matchNumStr": f"周{'一二三四五六日'[i % 7]}{i % 1000:03d}",
+                "leagueAbbName": rng.choice(LEAGUES),
+                "homeTeamAbbName": home,
+                "awayTeamAbbName": away,
+                "oddsList": [
+                    {"poolCode": "HAD", "h": f"{win:.2f}", "d": f"{draw:.2f}", "a": f"{lose:.2f}"},
+                    {"poolCode": "HHAD", "goalLine": "-1", "h": f"{lose:.2f}",
+                     "d": f"{draw:.2f}", "a": f"{win:.2f}"},
+                ],
+            })
+        groups.append({"businessDate": date, "subMatchList": sub_matches})
+    return json.dumps({
+        "success": True,
+        "errorCode": "0",
+        "value": {"matchInfoList": groups},
+    }, ensure_ascii=False)
+
+
+def make_fixed_bonus_payload(ticks, seed=0):
+    """生成 getFixedBonusV1 响应的 JSON 文本，HAD/HHAD 各 ticks 条记录"""
+    def to_upstream(history):
+        return [
+            {
+                "updateDate": item["update_date"],
+                "updateTime": item["update_time"],
+                "goalLine": item.get("handicap", ""),
+                "h": f"{item['win']:.2f}",
+                "d": f"{item['draw']:.2f}",
+                "a": f"{item['lose']:.2f}",
+            }
+            for item in history
+        ]
+
+    return json.dumps({
+        "success": True,
+        "errorCode": "0",
+        "value": {
+            "oddsHistory": {
+                "hadList": to_upstream(make_history(ticks, seed=seed)),
+                "hhadList": to_upstream(make_history(ticks, seed=seed + 1, with_handicap=True)),
+            },
+        },
+    }, ensure_ascii=False)
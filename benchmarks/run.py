@@ -0,0 +1,328 @@
+"""
+性能基准测试
+
+覆盖 Excel 导出、赔率差值分析、列宽计算、竞彩网响应解析及 JSON 编解码（标准库与 orjson 对比）。
+RECORDINGS_DIR 中有录制的竞彩网响应（SPORTTERY_RECORD=True 时录制）时，另外用全部录制数据测量
+解析与导出。结果保存为 JSON
+（默认 benchmarks/results/<时间>_<提交>.json），可与其他提交的结果对比。
+
+用法（在项目根目录执行）：
+    python -m benchmarks.run                     # 运行全部
+    python -m benchmarks.run --quick             # 跳过大规模用例
+    python -m benchmarks.run -k excel            # 只运行名称包含 excel 的用例
+    python -m benchmarks.run --compare benchmarks/results/xxx.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import config  # noqa: E402
+from benchmarks.payloads import (  # noqa: E402
+    make_fixed_bonus_payload, make_history, make_match_list_payload, make_matches,
+)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+class Case:
+    """一个基准用例：setup() 准备输入（不计时），run(data) 为被测代码"""
+
+    def __init__(self, name, group, params, setup, run, quick=True):
+        self.name = name
+        self.group = group
+        self.params = params
+        self.setup = setup
+        self.run = run
+        self.quick = quick
+
+
+def _excel_cases():
+    from services.excel_service import generate_excel
+    for count in (1, 10, 100):
+        for ticks in (10, 100, 1000):
+            yield Case(
+                f"generate_excel[{count}x{ticks}]", "excel",
+                {"matches": count, "ticks": ticks},
+                setup=lambda count=count, ticks=ticks: make_matches(count, ticks),
+                run=generate_excel,
+                quick=count * ticks <= 1000,
+            )
+
+
+def _diff_cases():
+    from services.odds_analysis import compute_odds_diffs
+    from services.batch_analysis import compute_batch_odds_diffs
+    for ticks in (100, 1000, 10000):
+        yield Case(
+            f"compute_odds_diffs[{ticks}]", "analysis", {"ticks": ticks},
+            setup=lambda ticks=ticks: (make_history(ticks, seed=1),
+                                       make_history(ticks, seed=2, with_handicap=True)),
+            run=lambda data: compute_odds_diffs(*data),
+            quick=ticks <= 1000,
+        )
+    for count, ticks in ((10, 1000), (100, 1000)):
+        yield Case(
+            f"compute_batch_odds_diffs[{count}x{ticks}]", "analysis",
+            {"matches": count, "ticks": ticks},
+            setup=lambda count=count, ticks=ticks: make_matches(count, ticks),
+            run=compute_batch_odds_diffs,
+            quick=count <= 10,
+        )
+
+
+def _column_width_cases():
+    from openpyxl import Workbook
+    from services.excel_service import _auto_column_width
+
+    def setup(rows):
+        ws = Workbook().active
+        for item in make_history(rows, with_handicap=True):
+            ws.append([item["update_date"], item["update_time"], item["handicap"],
+                       item["win"], item["draw"], item["lose"]])
+        return ws
+
+    for rows in (100, 1000, 10000):
+        yield Case(
+            f"auto_column_width[{rows}]", "excel", {"rows": rows},
+            setup=lambda rows=rows: setup(rows),
+            run=_auto_column_width,
+            quick=rows <= 1000,
+        )
+
+
+def _parse_cases():
+    from api import json_backend
+    from api.sporttery_provider import SportteryParser
+    parser = SportteryParser()
+    for count in (100, 1000, 10000):
+        yield Case(
+            f"parse_match_list[{count}]", "provider", {"matches": count},
+            setup=lambda count=count: make_match_list_payload(count),
+            run=lambda text: parser._parse_match_list(json_backend.loads(text).get("value", {})),
+            quick=count <= 1000,
+        )
+    for ticks in (1000, 10000):
+        yield Case(
+            f"parse_odds_history[{ticks}]", "provider", {"ticks": ticks},
+            setup=lambda ticks=ticks: make_fixed_bonus_payload(ticks),
+            run=lambda text: parser._parse_odds_history(json_backend.loads(text).get("value", {})),
+            quick=ticks <= 1000,
+        )
+
+
+def _json_cases():
+    from api.json_backend import get_backend
+    backends = [get_backend("json")]
+    try:
+        backends.append(get_backend("orjson"))
+    except RuntimeError:
+        print("未安装 orjson，JSON 用例只运行标准库后端")
+
+    for name, loads, dumps in backends:
+        for ticks in (1000, 10000):
+            yield Case(
+                f"json_loads_odds_history[{name}][{ticks}]", "json", {"backend": name, "ticks": ticks},
+                setup=lambda ticks=ticks: make_fixed_bonus_payload(ticks).encode("utf-8"),
+                run=loads,
+                quick=ticks <= 1000,
+            )
+        for count, ticks in ((10, 1000), (100, 1000)):
+            # 与 /api/matches 的响应结构相同，比赛带完整赔率历史
+            yield Case(
+                f"json_dumps_matches[{name}][{count}x{ticks}]", "json",
+                {"backend": name, "matches": count, "ticks": ticks},
+                setup=lambda count=count, ticks=ticks: {
+                    "success": True, "count": count, "matches": make_matches(count, ticks),
+                },
+                run=dumps,
+                quick=count <= 10,
+            )
+
+
+def _fingerprint_cases():
+    from api.fingerprint import ResponseFingerprints
+    from api.sporttery_provider import SportteryParser
+    parser = SportteryParser()
+
+    class Response:
+        status_code = 200
+        headers = {}
+
+        def __init__(self, content):
+            self.content = content
+
+    def setup(count):
+        # 先解析一次，计时部分为响应与上次相同时的路径（摘要比对后直接复用）
+        fingerprints = ResponseFingerprints()
+        resp = Response(make_match_list_payload(count).encode("utf-8"))
+        parse = lambda r: parser._parse_match_list(json.loads(r.content).get("value", {}))
+        fingerprints.parse("/list", None, resp, parse)
+        return fingerprints, resp, parse
+
+    for count in (100, 1000, 10000):
+        yield Case(
+            f"fingerprint_unchanged_match_list[{count}]", "provider", {"matches": count},
+            setup=lambda count=count: setup(count),
+            run=lambda data: data[0].parse("/list", None, data[1], data[2]),
+            quick=count <= 1000,
+        )
+
+
+def _replay_cases():
+    from api.recording import ResponseRecorder, recording_name
+    from api.replay_provider import ReplayProvider
+    from api.sporttery_provider import SportteryParser
+    from services.excel_service import generate_excel
+    recorder = ResponseRecorder()
+    parser = SportteryParser()
+
+    match_lists = list(recorder.iter_bodies("/uniform/football/getMatchListV1.qry"))
+    histories = list(recorder.iter_bodies("/uniform/football/getFixedBonusV1.qry"))
+    if match_lists:
+        yield Case(
+            "replay_parse_match_list", "replay", {"files": len(match_lists)},
+            setup=lambda: match_lists,
+            run=lambda bodies: [parser._parse_match_list(json.loads(b).get("value", {})) for b in bodies],
+        )
+    if histories:
+        yield Case(
+            "replay_parse_odds_history", "replay", {"files": len(histories)},
+            setup=lambda: histories,
+            run=lambda bodies: [parser._parse_odds_history(json.loads(b).get("value", {})) for b in bodies],
+        )
+
+    def setup_export():
+        # 回放提供者组装完整比赛数据（不计时），只测量导出；跳过未录制赔率历史的比赛
+        provider = ReplayProvider(latency_ms=0, jitter_ms=0)
+        matches = []
+        for m in provider.get_today_matches():
+            params = {"clientCode": "3001", "matchId": m["match_id"]}
+            name = recording_name("/uniform/football/getFixedBonusV1.qry", params)
+            if not os.path.exists(os.path.join(recorder.directory, name)):
+                continue
+            match = provider.get_match_odds(m["match_id"])
+            if match is not None:
+                match.update(provider.get_odds_history(m["match_id"]))
+                matches.append(match)
+        return matches
+
+    if match_lists:
+        yield Case("replay_generate_excel", "replay", {}, setup=setup_export, run=generate_excel)
+
+
+def all_cases():
+    for factory in (_excel_cases, _diff_cases, _column_width_cases, _parse_cases, _json_cases,
+                    _fingerprint_cases, _replay_cases):
+        yield from factory()
+
+
+def measure(case, repeat, budget):
+    """运行用例：先运行一次预热并估时，再在 budget 秒预算内最多重复 repeat 次"""
+    data = case.setup()
+    start = time.perf_counter()
+    case.run(data)
+    first = time.perf_counter() - start
+
+    rounds = max(1, min(repeat, int(budget / first) if first > 0 else repeat))
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        case.run(data)
+        timings.append(time.perf_counter() - start)
+    return {
+        "rounds": rounds,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def _git_revision():
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+        dirty = bool(subprocess.check_output(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, dirty
+
+
+def compare(results, baseline_path):
+    """打印与基线结果的中位数对比，比值 >1 表示变慢"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    print(f"\n与基线对比: {baseline_path}")
+    for r in results:
+        base = baseline.get(r["name"])
+        if base is None:
+            continue
+        ratio = r["stats"]["median"] / base["stats"]["median"]
+        print(f"  {r['name']:<40} {base['stats']['median'] * 1000:>10.2f}ms -> "
+              f"{r['stats']['median'] * 1000:>10.2f}ms  x{ratio:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="football-lottery 性能基准测试")
+    parser.add_argument("-k", dest="keyword", help="只运行名称包含该关键字的用例")
+    parser.add_argument("--quick", action="store_true", help="跳过大规模用例")
+    parser.add_argument("--repeat", type=int, default=5, help="每个用例最多重复次数")
+    parser.add_argument("--budget", type=float, default=10.0, help="每个用例的计时预算(秒)")
+    parser.add_argument("--output", help="结果 JSON 路径，默认写入 benchmarks/results/")
+    parser.add_argument("--compare", help="与之对比的基线结果 JSON")
+    args = parser.parse_args(argv)
+
+    # 导出文件写入临时目录，不污染 output/
+    config.OUTPUT_DIR = tempfile.mkdtemp(prefix="bench_output_")
+
+    results = []
+    for case in all_cases():
+        if args.keyword and args.keyword not in case.name:
+            continue
+        if args.quick and not case.quick:
+            continue
+        stats = measure(case, args.repeat, args.budget)
+        results.append({"name": case.name, "group": case.group, "params": case.params, "stats": stats})
+        print(f"{case.name:<40} median {stats['median'] * 1000:>10.2f}ms  "
+              f"min {stats['min'] * 1000:>10.2f}ms  ({stats['rounds']} rounds)")
+
+    commit, dirty = _git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'unknown'}.json"
+        output = os.path.join(RESULTS_DIR, name)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存: {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,104 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-# 数据提供者: 'mock', 'jisuapi', 或 'sporttery'
+# 数据提供者: 'mock', 'jisuapi', 'sporttery' 或 'replay'
 # sporttery - 竞彩网官方数据（推荐）
+# replay - 回放 RECORDINGS_DIR 中录制的竞彩网响应，不访问网络
 DATA_PROVIDER = os.getenv('DATA_PROVIDER', 'sporttery')
+# 是否使用异步数据提供者（aiohttp 连接池），经同步适配器接入 MatchService
+DATA_PROVIDER_ASYNC = os.getenv('DATA_PROVIDER_ASYNC', 'False').lower() == 'true'
+# 异步HTTP连接池大小
+ASYNC_HTTP_POOL_SIZE = int(os.getenv('ASYNC_HTTP_POOL_SIZE', '100'))
+
+# 模拟数据(DATA_PROVIDER=mock)：随机种子、每日比赛场数、联赛(逗号分隔)、
+# 每场胜平负/让球胜平负各自的赔率变化记录数、平均更新间隔(秒)、让球数调整次数
+MOCK_SEED = int(os.getenv('MOCK_SEED', '42'))
+MOCK_MATCHES = int(os.getenv('MOCK_MATCHES', '8'))
+MOCK_LEAGUES = [s for s in os.getenv('MOCK_LEAGUES', '英超,西甲,德甲,意甲,法甲').split(',') if s]
+MOCK_HISTORY_LENGTH = int(os.getenv('MOCK_HISTORY_LENGTH', '30'))
+MOCK_TICK_INTERVAL = int(os.getenv('MOCK_TICK_INTERVAL', '1800'))
+MOCK_HANDICAP_CHANGES = int(os.getenv('MOCK_HANDICAP_CHANGES', '1'))
 
 # 极速数据 API Key
 JISUAPI_KEY = os.getenv('JISUAPI_KEY', '')
+# 极速数据比赛列表缓存有效期(秒)
+JISUAPI_CACHE_TTL = int(os.getenv('JISUAPI_CACHE_TTL', '300'))
+
+# 竞彩网可售比赛列表缓存：有效期(秒)，过期后仍可返回旧值并后台刷新的时长(秒)
+SELLING_CACHE_TTL = int(os.getenv('SELLING_CACHE_TTL', '60'))
+SELLING_CACHE_STALE_TTL = int(os.getenv('SELLING_CACHE_STALE_TTL', '300'))
+# 竞彩网最近赛果缓存有效期(秒)
+RESULTS_CACHE_TTL = int(os.getenv('RESULTS_CACHE_TTL', '300'))
+# 竞彩网历史赛果分页大小及并发拉取页数
+RESULTS_PAGE_SIZE = int(os.getenv('RESULTS_PAGE_SIZE', '30'))
+RESULTS_PAGE_CONCURRENCY = int(os.getenv('RESULTS_PAGE_CONCURRENCY', '4'))
+
+# 赔率历史本地存储(SQLite)路径，设为空字符串则不启用
+ODDS_STORE_PATH = os.getenv(
+    'ODDS_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'odds_history.db'),
+)
+
+# 竞彩网原始响应录制目录，DATA_PROVIDER=replay 时从该目录回放
+RECORDINGS_DIR = os.getenv(
+    'RECORDINGS_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'recordings'),
+)
+# 是否将竞彩网原始响应(gzip压缩)录制到 RECORDINGS_DIR
+SPORTTERY_RECORD = os.getenv('SPORTTERY_RECORD', 'False').lower() == 'true'
+# 回放时模拟的网络延迟(毫秒)：固定延迟及随机抖动上限，均为 0 时不等待
+REPLAY_LATENCY_MS = float(os.getenv('REPLAY_LATENCY_MS', '0'))
+REPLAY_JITTER_MS = float(os.getenv('REPLAY_JITTER_MS', '0'))
+
+# JSON 编解码后端：auto（安装了 orjson 时使用 orjson）、orjson 或 json（标准库）
+JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto').lower()
+
+# 上游HTTP连接池大小(每个主机保留的连接数)，0 表示按并发配置自动计算
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '0'))
+# 上游HTTP连接超时及读取超时(秒)
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '15'))
+# 上游请求限速(令牌桶)：每个上游平均每秒请求数及突发容量，速率为 0 表示不限速
+UPSTREAM_RATE = float(os.getenv('UPSTREAM_RATE', '10'))
+UPSTREAM_BURST = int(os.getenv('UPSTREAM_BURST', '20'))
+# 上游GET请求失败重试：最多重试次数，指数退避基数及上限(秒)，实际等待时间带随机抖动
+UPSTREAM_RETRIES = int(os.getenv('UPSTREAM_RETRIES', '2'))
+UPSTREAM_BACKOFF_BASE = float(os.getenv('UPSTREAM_BACKOFF_BASE', '0.5'))
+UPSTREAM_BACKOFF_MAX = float(os.getenv('UPSTREAM_BACKOFF_MAX', '8'))
+# 上游熔断：连续失败的调用次数阈值(每次调用重试用尽后计一次，0 表示不熔断)，熔断后多少秒放行试探请求
+UPSTREAM_BREAKER_THRESHOLD = int(os.getenv('UPSTREAM_BREAKER_THRESHOLD', '5'))
+UPSTREAM_BREAKER_RESET = float(os.getenv('UPSTREAM_BREAKER_RESET', '30'))
+
+# 批量获取比赛详情/赔率历史时的最大并发数
+FETCH_CONCURRENCY = int(os.getenv('FETCH_CONCURRENCY', '8'))
 
 # Excel 输出目录
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
+# 输出目录保留策略：总大小上限(字节)、文件最长保留时间(秒)、后台清理间隔(秒)，0 表示不限制/不启动
+OUTPUT_MAX_BYTES = int(os.getenv('OUTPUT_MAX_BYTES', str(2 * 1024 * 1024 * 1024)))
+OUTPUT_MAX_AGE = int(os.getenv('OUTPUT_MAX_AGE', str(7 * 24 * 3600)))
+OUTPUT_RETENTION_INTERVAL = int(os.getenv('OUTPUT_RETENTION_INTERVAL', '600'))
+# 是否使用流式(只写模式)生成 Excel，内存占用与导出场次无关
+EXCEL_STREAMING = os.getenv('EXCEL_STREAMING', 'True').lower() == 'true'
+# 后台导出任务：执行线程数、排队+执行中任务上限、结束任务保留时长(秒)
+EXPORT_WORKERS = int(os.getenv('EXPORT_WORKERS', '2'))
+EXPORT_MAX_ACTIVE = int(os.getenv('EXPORT_MAX_ACTIVE', '10'))
+EXPORT_JOB_TTL = int(os.getenv('EXPORT_JOB_TTL', '3600'))
+# 导出文件缓存：赔率未变化的重复导出直接复用已生成文件；缓存总大小(字节)及文件数上限
+EXPORT_CACHE_ENABLED = os.getenv('EXPORT_CACHE_ENABLED', 'True').lower() == 'true'
+EXPORT_CACHE_MAX_BYTES = int(os.getenv('EXPORT_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+EXPORT_CACHE_MAX_FILES = int(os.getenv('EXPORT_CACHE_MAX_FILES', '200'))
+
+# 按需请求剖析的密钥，请求带 X-Profile 头或 profile 参数且值与之相同时剖析该请求；为空则不启用
+PROFILE_SECRET = os.getenv('PROFILE_SECRET', '')
+# 剖析结果(折叠栈格式，可生成火焰图)保存目录及保留文件数
+PROFILES_DIR = os.getenv(
+    'PROFILES_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'profiles'),
+)
+PROFILES_MAX_FILES = int(os.getenv('PROFILES_MAX_FILES', '50'))
+# 采样间隔(毫秒)
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
 
 # Flask 配置
 DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
@@ -1,201 +1,181 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """
-爬取竞彩网指定日期比赛的赔率历史变化数据
+批量回填竞彩网已结束比赛的赔率历史
+
+按天分页查询 getUniformMatchResultV1 获取比赛列表，每页到达即并发（限速）请求其中比赛的
+getFixedBonusV1，将胜平负/让球胜平负赔率变化记录写入赔率历史本地存储（SQLite，同
+ODDS_STORE_PATH），Web 应用读取已结束比赛的历史时直接命中该存储。
+
+断点续爬：
+- 赔率历史写入即标记为已完成，再次运行时跳过
+- 每天的比赛列表在查询后记入检查点文件（<数据库路径>.crawl.json），再次运行时不再查询；
+  今天及以后的日期赛果尚不完整，不记入检查点
+
+用法：
+    python crawl_odds_history.py --start 2026-02-01 --end 2026-02-12
+    python crawl_odds_history.py --start 2026-02-12 --concurrency 8 --rate 5
 """
 
-import requests
+import argparse
 import json
-from datetime import datetime
-
-# 请求头
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/145.0.0.0 Safari/537.36',
-    'Referer': 'https://www.sporttery.cn/',
-    'Accept': 'application/json, text/plain, */*',
-}
-
-def get_matches_by_date(start_date, end_date):
-    """获取指定日期范围的比赛列表"""
-    url = "https://webapi.sporttery.cn/gateway/uniform/football/getUniformMatchResultV1.qry"
-    params = {
-        'startDate': start_date,
-        'endDate': end_date
-    }
-    
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import config
+from api.odds_store import OddsHistoryStore
+
+# 检查点中每场比赛保留的字段
+MATCH_FIELDS = ("match_id", "match_time", "match_num", "league", "home_team", "away_team",
+                "half_score", "full_score", "result")
+
+
+class Checkpoint:
+    """已查询日期的比赛列表，每次更新后原子写入文件"""
+
+    def __init__(self, path):
+        self.path = path
+        self.days = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.days = json.load(f).get("days", {})
+
+    def save_day(self, day, matches):
+        self.days[day] = [{k: m.get(k, "") for k in MATCH_FIELDS} for m in matches]
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"days": self.days}, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+
+def _date(value):
+    """命令行日期参数，格式 YYYY-MM-DD"""
     try:
-        resp = requests.get(url, params=params, headers=HEADERS, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-        
-        if data.get('success') and data.get('value'):
-            matches = data['value'].get('matchResult', [])
-            return matches
-        return []
-    except Exception as e:
-        print(f"获取比赛列表失败: {e}")
-        return []
-
-
-def get_fixed_bonus(match_id):
-    """获取指定比赛的固定奖金（赔率）历史变化数据"""
-    url = "https://webapi.sporttery.cn/gateway/uniform/football/getFixedBonusV1.qry"
-    params = {
-        'clientCode': '3001',
-        'matchId': match_id
-    }
-    
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式应为 YYYY-MM-DD: {value}")
+
+
+def iter_days(start_date, end_date):
+    day = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    while day <= end:
+        yield day.strftime("%Y-%m-%d")
+        day += timedelta(days=1)
+
+
+def discover_matches(provider, checkpoint, days, on_matches):
+    """按天获取比赛列表，已记入检查点的日期直接读取
+
+    赛果按页拉取，每页到达即调用 on_matches(比赛列表)，调用方无需等待全部页面即可开始处理。
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+    for day in days:
+        if day in checkpoint.days:
+            on_matches(checkpoint.days[day])
+            continue
+        day_matches = []
+        try:
+            for page in provider.iter_results(day, day):
+                on_matches(page)
+                day_matches.extend(page)
+        except Exception as e:
+            print(f"{day}: 获取比赛列表失败: {e}")
+            continue
+        print(f"{day}: {len(day_matches)} 场比赛")
+        if day < today:
+            checkpoint.save_day(day, day_matches)
+
+
+def fetch_history(provider, store, match_id):
+    """请求单场比赛的赔率历史并写入存储，返回新写入的记录数"""
+    history = provider.fetch_odds_history(match_id)
+    return store.sync(match_id, history, finished=True, replace=True)
+
+
+def crawl(start_date, end_date, db_path, concurrency, rate, refresh=False):
+    """回填 [start_date, end_date] 内已结束比赛的赔率历史
+
+    Returns:
+        dict: 比赛数、跳过数、成功数、失败数、新写入记录数
+    """
+    # 提供者只用于请求和解析，不使用其本地存储；连接池容纳全部并发线程及赛果分页并发
+    from api.sporttery_provider import SportteryProvider
+    provider = SportteryProvider(
+        pool_size=max(1, concurrency) + config.RESULTS_PAGE_CONCURRENCY,
+        rate=rate,
+        burst=max(1, int(rate)),
+        odds_store_path="",
+    )
+    store = OddsHistoryStore(db_path)
+    checkpoint = Checkpoint(f"{db_path}.crawl.json")
+
+    stats = {"matches": 0, "skipped": 0, "fetched": 0, "failed": 0, "ticks": 0}
+    # 同一场比赛可能出现在相邻两天的赛果中
+    seen = set()
+    futures = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+
+    def submit(matches):
+        """赛果每页到达即提交尚未完成的比赛，比赛列表与赔率历史的请求并行"""
+        for m in matches:
+            mid = m["match_id"]
+            if mid in seen:
+                continue
+            seen.add(mid)
+            stats["matches"] += 1
+            if not refresh and store.is_finished(mid):
+                stats["skipped"] += 1
+                continue
+            futures[executor.submit(fetch_history, provider, store, mid)] = mid
+
     try:
-        resp = requests.get(url, params=params, headers=HEADERS, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-        
-        if data.get('success') and data.get('value'):
-            # 数据在 oddsHistory 下
-            return data['value'].get('oddsHistory', {})
-        return None
-    except Exception as e:
-        print(f"获取比赛 {match_id} 赔率数据失败: {e}")
-        return None
-
-
-def parse_had_odds(had_list):
-    """解析胜平负赔率历史"""
-    result = []
-    for item in had_list or []:
-        result.append({
-            '更新日期': item.get('updateDate', ''),
-            '更新时间': item.get('updateTime', ''),
-            '胜': item.get('h', ''),
-            '平': item.get('d', ''),
-            '负': item.get('a', ''),
-        })
-    return result
-
-
-def parse_hhad_odds(hhad_list):
-    """解析让球胜平负赔率历史"""
-    result = []
-    for item in hhad_list or []:
-        result.append({
-            '更新日期': item.get('updateDate', ''),
-            '更新时间': item.get('updateTime', ''),
-            '让球': item.get('goalLine', ''),
-            '让胜': item.get('h', ''),
-            '让平': item.get('d', ''),
-            '让负': item.get('a', ''),
-        })
-    return result
-
-
-def get_match_detail(match_id):
-    """获取比赛详情"""
-    url = "https://webapi.sporttery.cn/gateway/uniform/football/getMatchInfoV1.qry"
-    params = {
-        'clientCode': '3001',
-        'matchId': match_id
-    }
-    
+        discover_matches(provider, checkpoint, iter_days(start_date, end_date), submit)
+        print(f"共 {stats['matches']} 场比赛，已完成 {stats['skipped']} 场，待获取 {len(futures)} 场")
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                stats["ticks"] += future.result()
+                stats["fetched"] += 1
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"获取比赛 {futures[future]} 赔率历史失败: {e}")
+            if done % 50 == 0 or done == len(futures):
+                print(f"进度 {done}/{len(futures)}，新增 {stats['ticks']} 条记录")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        store.close()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="回填竞彩网已结束比赛的赔率历史")
+    parser.add_argument("--start", type=_date, required=True, help="开始日期 YYYY-MM-DD")
+    parser.add_argument("--end", type=_date, help="结束日期 YYYY-MM-DD，默认同开始日期")
+    parser.add_argument("--db", default=config.ODDS_STORE_PATH or None,
+                        help="赔率历史数据库路径，默认 ODDS_STORE_PATH")
+    parser.add_argument("--concurrency", type=int, default=config.FETCH_CONCURRENCY,
+                        help="并发请求数")
+    parser.add_argument("--rate", type=float, default=5.0, help="每秒最多请求数，0 表示不限速")
+    parser.add_argument("--refresh", action="store_true", help="重新获取已完成的比赛")
+    args = parser.parse_args(argv)
+
+    if not args.db:
+        parser.error("未配置 ODDS_STORE_PATH，请通过 --db 指定数据库路径")
+    end_date = args.end or args.start
+    if end_date < args.start:
+        parser.error("结束日期不能早于开始日期")
+
     try:
-        resp = requests.get(url, params=params, headers=HEADERS, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-        
-        if data.get('success') and data.get('value'):
-            return data['value']
-        return None
-    except Exception as e:
-        print(f"获取比赛 {match_id} 详情失败: {e}")
-        return None
-
-
-def main():
-    """主函数"""
-    target_date = "2026-02-12"
-    print(f"正在获取 {target_date} 的比赛赔率历史数据...\n")
-    
-    # 2026-02-12 的12场比赛ID列表（从竞彩网赛果页面获取）
-    matches_info = [
-        {'match_id': '2037761', 'match_num': '周四003', 'league': '沙职', 'home': '达马克', 'away': '布赖合作', 'goal': '+1'},
-        {'match_id': '2037760', 'match_num': '周四002', 'league': '亚冠乙', 'home': '曼谷联', 'away': '麦克阿瑟', 'goal': '-1'},
-        {'match_id': '2037759', 'match_num': '周四001', 'league': '亚冠乙', 'home': '浦项制铁', 'away': '大阪钢巴', 'goal': '+1'},
-        {'match_id': '2037758', 'match_num': '周三013', 'league': '英超', 'home': '桑德兰', 'away': '利物浦', 'goal': '+1'},
-        {'match_id': '2037757', 'match_num': '周三012', 'league': '荷甲', 'home': '奈梅亨', 'away': '乌德勒支', 'goal': '-1'},
-        {'match_id': '2037756', 'match_num': '周三011', 'league': '西国王杯', 'home': '毕尔巴鄂', 'away': '皇家社会', 'goal': '-1'},
-        {'match_id': '2037755', 'match_num': '周三010', 'league': '意大利杯', 'home': '博洛尼亚', 'away': '拉齐奥', 'goal': '-1'},
-        {'match_id': '2037754', 'match_num': '周三009', 'league': '德国杯', 'home': '拜仁', 'away': '莱红牛', 'goal': '-2'},
-        {'match_id': '2037753', 'match_num': '周三008', 'league': '英冠', 'home': '查尔顿', 'away': '斯托克城', 'goal': '-1'},
-        {'match_id': '2037752', 'match_num': '周三007', 'league': '英超', 'home': '水晶宫', 'away': '伯恩利', 'goal': '-1'},
-        {'match_id': '2037751', 'match_num': '周三006', 'league': '英超', 'home': '诺丁汉', 'away': '狼队', 'goal': '-1'},
-        {'match_id': '2037750', 'match_num': '周三005', 'league': '英超', 'home': '曼城', 'away': '富勒姆', 'goal': '-1'},
-    ]
-    
-    print(f"共 {len(matches_info)} 场比赛\n")
-    print("=" * 80)
-    
-    all_results = []
-    
-    for idx, match in enumerate(matches_info, 1):
-        match_id = match['match_id']
-        home_team = match['home']
-        away_team = match['away']
-        league = match['league']
-        match_num = match['match_num']
-        goal_line = match['goal']
-        
-        print(f"\n[{idx}/{len(matches_info)}] 比赛: {match_num} {league} {home_team}({goal_line}) vs {away_team}")
-        print(f"比赛日期: {target_date}")
-        print(f"比赛ID: {match_id}")
-        print("-" * 60)
-        
-        # 获取赔率历史
-        bonus_data = get_fixed_bonus(match_id)
-        
-        if bonus_data:
-            match_result = {
-                '比赛编号': match_num,
-                '联赛': league,
-                '主队': home_team,
-                '客队': away_team,
-                '让球': goal_line,
-                '比赛日期': target_date,
-                '比赛ID': match_id,
-            }
-            
-            # 胜平负赔率历史
-            had_list = bonus_data.get('hadList', [])
-            if had_list:
-                print(f"\n【胜平负固定奖金历史】共 {len(had_list)} 条记录")
-                print(f"{'更新日期':<12} {'更新时间':<12} {'胜':>8} {'平':>8} {'负':>8}")
-                for item in had_list:
-                    update_dt = f"{item.get('updateDate', '')} {item.get('updateTime', '')}"
-                    print(f"{item.get('updateDate', ''):<12} {item.get('updateTime', ''):<12} {item.get('h', ''):>8} {item.get('d', ''):>8} {item.get('a', ''):>8}")
-                match_result['胜平负历史'] = parse_had_odds(had_list)
-            
-            # 让球胜平负赔率历史
-            hhad_list = bonus_data.get('hhadList', [])
-            if hhad_list:
-                first_goal = hhad_list[0].get('goalLine', goal_line) if hhad_list else goal_line
-                print(f"\n【让球胜平负固定奖金历史】让球: {first_goal}，共 {len(hhad_list)} 条记录")
-                print(f"{'更新日期':<12} {'更新时间':<12} {'让胜':>8} {'让平':>8} {'让负':>8}")
-                for item in hhad_list:
-                    print(f"{item.get('updateDate', ''):<12} {item.get('updateTime', ''):<12} {item.get('h', ''):>8} {item.get('d', ''):>8} {item.get('a', ''):>8}")
-                match_result['让球胜平负历史'] = parse_hhad_odds(hhad_list)
-            
-            all_results.append(match_result)
-        else:
-            print("未获取到赔率数据")
-        
-        print("\n" + "=" * 80)
-    
-    # 保存结果到JSON文件
-    output_file = f'/Users/shenan/Desktop/bonus/output/odds_history_{target_date.replace("-", "")}.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_results, f, ensure_ascii=False, indent=2)
-    print(f"\n数据已保存到: {output_file}")
-    
-    return all_results
+        stats = crawl(args.start, end_date, args.db, args.concurrency, args.rate, args.refresh)
+    except KeyboardInterrupt:
+        print("\n已中断，再次运行相同命令即可从断点继续")
+        return 130
+    print(f"完成：成功 {stats['fetched']} 场，失败 {stats['failed']} 场，"
+          f"跳过 {stats['skipped']} 场，新增 {stats['ticks']} 条记录")
+    return 1 if stats["failed"] else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+运行指标（Prometheus 文本格式）
+
+计数器和直方图保存在进程内存中，由 GET /metrics 以 Prometheus 文本格式 0.0.4 输出：
+- http_request_duration_seconds: 各路由的请求耗时
+- upstream_request_duration_seconds / upstream_errors_total: 各上游接口每次请求的耗时及失败次数
+- cache_requests_total / cache_hit_ratio: 各缓存的命中、旧值命中及未命中次数
+- export_phase_duration_seconds: 导出各阶段耗时（fetch 获取数据、analyse 差值分析、
+  write 生成工作表、save 序列化保存）
+
+其余已有的统计通过 register_collector 注册的回调在输出时读取：
+- api/resilience.py: 上游重试、限速等待、旧值兜底及熔断状态
+- api/transport.py: 上游 HTTP 请求数及新建连接数
+- app.py 注册 OutputRetention.collect_metrics: 输出目录文件数、字节数及累计淘汰量
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# 默认直方图分桶(秒)，覆盖从本地缓存命中到大批量导出的耗时范围
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Counter:
+    """带标签的计数器，线程安全"""
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_values(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def values(self):
+        """{标签值元组: 计数}"""
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self):
+        return [
+            (self.name, dict(zip(self.labelnames, key)), value)
+            for key, value in sorted(self.values().items())
+        ]
+
+
+class Histogram:
+    """带标签的直方图，线程安全"""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # 标签值元组 -> [各分桶计数..., 总和, 总数]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_values(self.labelnames, labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """记录 with 块的耗时；块内抛出异常时不记录"""
+        start = time.perf_counter()
+        yield
+        self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            values = sorted((key, list(state)) for key, state in self._values.items())
+        samples = []
+        for key, state in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, state[-1]))
+            samples.append((f"{self.name}_sum", labels, state[-2]))
+            samples.append((f"{self.name}_count", labels, state[-1]))
+        return samples
+
+
+class Registry:
+    """指标及采集回调的集合
+
+    register_collector(collect) 注册的 collect() 在每次输出时调用，返回
+    [(指标名, 类型, 说明, [(标签字典, 值), ...]), ...]，用于输出已在别处统计的数值。
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"指标已存在: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collect):
+        with self._lock:
+            self._collectors.append(collect)
+        return collect
+
+    def render(self):
+        """以 Prometheus 文本格式输出全部指标"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            _write_family(lines, metric.name, metric.type, metric.documentation, metric.samples())
+        for collect in collectors:
+            try:
+                families = collect()
+            except Exception as e:
+                print(f"指标采集失败: {e}")
+                continue
+            for name, metric_type, documentation, values in families:
+                samples = [(name, labels, value) for labels, value in values]
+                _write_family(lines, name, metric_type, documentation, samples)
+        return "\n".join(lines) + "\n"
+
+
+def _label_values(labelnames, labels):
+    if len(labels) != len(labelnames):
+        raise ValueError(f"标签应为 {labelnames}，实际为 {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _write_family(lines, name, metric_type, documentation, samples):
+    lines.append(f"# HELP {name} {_escape(documentation, quote=False)}")
+    lines.append(f"# TYPE {name} {metric_type}")
+    for sample_name, labels, value in samples:
+        if labels:
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}")
+        else:
+            lines.append(f"{sample_name} {_format_value(value)}")
+
+
+def _escape(text, quote=True):
+    text = str(text).replace("\\", "\\\\").replace("\n", "\\n")
+    return text.replace('"', '\\"') if quote else text
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+REGISTRY = Registry()
+register_collector = REGISTRY.register_collector
+render = REGISTRY.render
+
+# Prometheus 抓取接口的内容类型
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "路由处理耗时（流式响应只计到开始发送响应体）",
+    ("route", "method", "status"),
+))
+UPSTREAM_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "upstream_request_duration_seconds",
+    "上游接口单次请求耗时（含解码解析，不含限速等待和重试退避）",
+    ("upstream", "endpoint"),
+))
+UPSTREAM_ERRORS = REGISTRY.register(Counter(
+    "upstream_errors_total",
+    "上游接口请求失败次数，kind 为 retryable / non_retryable / circuit_open / other",
+    ("upstream", "endpoint", "kind"),
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "cache_requests_total",
+    "缓存查询次数，result 为 hit / stale / miss",
+    ("cache", "result"),
+))
+EXPORT_PHASE_SECONDS = REGISTRY.register(Histogram(
+    "export_phase_duration_seconds",
+    "单次导出各阶段耗时",
+    ("phase",),
+))
+
+
+@REGISTRY.register_collector
+def _cache_hit_ratio():
+    """各缓存的命中率，旧值命中计为命中"""
+    totals = {}
+    for (cache, result), count in CACHE_REQUESTS.values().items():
+        hits, total = totals.get(cache, (0, 0))
+        totals[cache] = (hits + (count if result != "miss" else 0), total + count)
+    values = [({"cache": cache}, hits / total) for cache, (hits, total) in sorted(totals.items()) if total]
+    return [("cache_hit_ratio", "gauge", "缓存命中率", values)]
+
+
+_local = threading.local()
+
+
+@contextmanager
+def phase_timer(histogram, rest_phase):
+    """在当前线程中按阶段累计 with 块内的耗时，正常结束时每个阶段记录一次
+
+    块内用 timed_phase(name) 标记的时间计入对应阶段，其余时间计入 rest_phase。
+    """
+    phases = {}
+    outer = getattr(_local, "phases", None)
+    _local.phases = phases
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _local.phases = outer
+    phases[rest_phase] = max(0.0, time.perf_counter() - start - sum(phases.values()))
+    for phase, seconds in phases.items():
+        histogram.observe(seconds, phase=phase)
+
+
+@contextmanager
+def timed_phase(name):
+    """把 with 块的耗时计入当前线程 phase_timer 的 name 阶段，不在 phase_timer 内时不计时"""
+    phases = getattr(_local, "phases", None)
+    if phases is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
@@ -0,0 +1,165 @@
+"""
+按需请求剖析
+
+PROFILE_SECRET 非空时启用：请求带 X-Profile 头或 profile 查询参数、且值与 PROFILE_SECRET 相同时，
+以采样方式（每 PROFILE_INTERVAL_MS 毫秒记录一次处理线程的调用栈）剖析该请求。结果以折叠栈格式
+（每行 "根帧;...;叶帧 采样数"）保存到 PROFILES_DIR，可直接用 flamegraph.pl、inferno 或
+speedscope 生成火焰图。
+
+- 剖析覆盖视图函数的执行；流式响应的响应体在视图返回后才生成，不在剖析范围内
+- 后台导出任务在导出线程中单独剖析，结果文件名见任务状态中的 profile 字段
+- 未启用时不注册任何请求钩子，没有额外开销
+"""
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+import config
+
+# 剖析文件扩展名
+PROFILE_EXT = ".folded"
+
+_NAME_RE = re.compile(r"^[\w.-]+\.folded$")
+# 项目目录，帧标签中的文件路径相对于该目录
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def requested(req):
+    """请求是否带有正确的剖析密钥，未启用时始终为 False"""
+    secret = config.PROFILE_SECRET
+    if not secret:
+        return False
+    token = req.headers.get("X-Profile") or req.args.get("profile")
+    return token is not None and hmac.compare_digest(token.encode("utf-8"), secret.encode("utf-8"))
+
+
+class StackSampler:
+    """在后台线程中定时采样目标线程的调用栈
+
+    Args:
+        thread_id: 目标线程ID，默认为调用 start() 的线程
+        interval_ms: 采样间隔(毫秒)，默认 config.PROFILE_INTERVAL_MS
+    """
+
+    def __init__(self, thread_id=None, interval_ms=None):
+        self.thread_id = thread_id
+        self.interval = (interval_ms if interval_ms is not None else config.PROFILE_INTERVAL_MS) / 1000
+        self.stacks = Counter()
+        self.started_at = None
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止采样，返回 {调用栈元组: 采样数}；可重复调用"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.elapsed = time.perf_counter() - self.started_at
+        return self.stacks
+
+    def _run(self):
+        labels = {}  # code 对象 -> 帧标签
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+
+
+def _frame_label(code):
+    name = getattr(code, "co_qualname", code.co_name)
+    filename = code.co_filename
+    if filename.startswith(_ROOT + os.sep):
+        filename = filename[len(_ROOT) + 1:]
+    else:
+        # 第三方库及标准库只保留所在目录名和文件名，如 flask/app.py
+        filename = os.path.join(os.path.basename(os.path.dirname(filename)), os.path.basename(filename))
+    # 折叠栈格式以 ; 分隔帧
+    return f"{name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class ProfileStore:
+    """剖析结果目录，只保留最近的 max_files 个文件，线程安全"""
+
+    def __init__(self, directory=None, max_files=None):
+        self.directory = directory or config.PROFILES_DIR
+        self.max_files = max_files if max_files is not None else config.PROFILES_MAX_FILES
+        self._lock = threading.Lock()
+
+    def save(self, label, sampler):
+        """停止采样并写入折叠栈文件，返回文件名
+
+        Args:
+            label: 文件名中的说明，如请求方法和路由
+            sampler: StackSampler
+        """
+        stacks = sampler.stop()
+        slug = re.sub(r"[^\w-]+", "_", label).strip("_")[:60] or "request"
+        filename = (
+            f"{time.strftime('%Y%m%d_%H%M%S')}_{slug}_{int(sampler.elapsed * 1000)}ms_"
+            f"{uuid.uuid4().hex[:6]}{PROFILE_EXT}"
+        )
+        lines = [f"{';'.join(stack)} {count}" for stack, count in stacks.most_common()]
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, filename), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + ("\n" if lines else ""))
+        self._prune()
+        return filename
+
+    def list(self):
+        """剖析文件列表，按修改时间从新到旧，每项为 {"name", "size", "modified"}"""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not _NAME_RE.match(name):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append({"name": name, "size": st.st_size, "modified": st.st_mtime})
+        entries.sort(key=lambda e: e["modified"], reverse=True)
+        return entries
+
+    def path(self, name):
+        """剖析文件的完整路径，文件名不合法或文件不存在时返回 None"""
+        if not _NAME_RE.match(name):
+            return None
+        filepath = os.path.join(self.directory, name)
+        return filepath if os.path.isfile(filepath) else None
+
+    def _prune(self):
+        if self.max_files <= 0:
+            return
+        with self._lock:
+            for entry in self.list()[self.max_files:]:
+                try:
+                    os.remove(os.path.join(self.directory, entry["name"]))
+                except FileNotFoundError:
+                    pass
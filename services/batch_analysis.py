@@ -0,0 +1,354 @@
+"""
+批量赔率差值分析
+
+对多场比赛一次性计算与 odds_analysis.compute_odds_diffs 相同的胜差、负差、双平差：
+所有比赛的 HAD/HHAD 记录（api.odds_series.OddsSeries）拼接为一组数组，时间匹配、去重、
+前向填充均以 NumPy 向量运算完成，不生成 Excel，结果为列式表格。
+"""
+import numpy as np
+from api.odds_series import OddsSeries
+from services.odds_analysis import MATCH_TOLERANCE, _parse_datetime, _parse_time_of_day
+
+SECONDS_PER_DAY = 86400
+
+# 时间戳基准，保证解析出的秒数非负（-1 表示无法解析）
+_EPOCH = np.datetime64("0001-01-01T00:00:00", "s").astype(np.int64)
+
+
+class DiffTable:
+    """批量差值分析结果（列式）
+
+    Attributes:
+        match_ids: 比赛ID列表，match_index 为其下标
+        match_index: int64，每行所属比赛
+        time: 每行的排序时间（更新日期 + 更新时间）
+        win_diff / lose_diff / double_draw_diff: float64，无数据("-")为 NaN
+    """
+
+    COLUMNS = ("match_id", "time", "win_diff", "lose_diff", "double_draw_diff")
+
+    def __init__(self, match_ids, match_index, time, win_diff, lose_diff, double_draw_diff):
+        self.match_ids = list(match_ids)
+        self.match_index = match_index
+        self.time = time
+        self.win_diff = win_diff
+        self.lose_diff = lose_diff
+        self.double_draw_diff = double_draw_diff
+
+    def __len__(self):
+        return len(self.match_index)
+
+    def to_columns(self):
+        """转换为可 JSON 序列化的列式字典，NaN 转为 None"""
+        return {
+            "match_id": [self.match_ids[i] for i in self.match_index.tolist()],
+            "time": list(self.time),
+            "win_diff": _nan_to_none(self.win_diff),
+            "lose_diff": _nan_to_none(self.lose_diff),
+            "double_draw_diff": _nan_to_none(self.double_draw_diff),
+        }
+
+    def to_records(self):
+        """转换为与 compute_odds_diffs 相同格式的行（附带 match_id）"""
+        columns = self.to_columns()
+        records = []
+        for i in range(len(self)):
+            win_diff = columns["win_diff"][i]
+            lose_diff = columns["lose_diff"][i]
+            double_draw_diff = columns["double_draw_diff"][i]
+            records.append({
+                "match_id": columns["match_id"][i],
+                "time": columns["time"][i],
+                "win_diff": _dash(win_diff),
+                "lose_diff": _dash(lose_diff),
+                "double_draw_diff": _dash(double_draw_diff),
+                "win_sign": _sign(win_diff),
+                "lose_sign": _sign(lose_diff),
+                "double_draw_sign": _sign(double_draw_diff),
+            })
+        return records
+
+
+def compute_batch_odds_diffs(matches):
+    """批量计算多场比赛的赔率差值
+
+    Args:
+        matches: 比赛列表，每项包含 match_id、had_history、hhad_history；
+            历史为 OddsSeries（get_odds_history(as_series=True)）或字典列表
+
+    Returns:
+        DiffTable: 所有比赛的差值行，按比赛顺序、比赛内按时间排序
+    """
+    match_ids = [m.get("match_id", "") for m in matches]
+    had = _TickArrays([_series(m.get("had_history", [])) for m in matches])
+    hhad = _TickArrays([_series(m.get("hhad_history", []), with_handicap=True) for m in matches])
+
+    # 有胜平负数据的比赛按完整规则计算，否则仅用让球数据做差
+    with_had = (had.counts >= 1) & (hhad.counts >= 1)
+    hhad_only = (had.counts == 0) & (hhad.counts >= 2)
+
+    parts = [
+        _diffs_with_had(had, hhad, with_had),
+        _diffs_hhad_only(hhad, hhad_only),
+    ]
+    group = np.concatenate([p["group"] for p in parts])
+    order = np.concatenate([p["order"] for p in parts])
+    sort_key = np.concatenate([p["sort_key"] for p in parts])
+    # 比赛内按时间稳定排序
+    perm = np.lexsort((order, sort_key, group))
+
+    return DiffTable(
+        match_ids,
+        group[perm],
+        np.concatenate([p["time"] for p in parts])[perm],
+        np.concatenate([p["win_diff"] for p in parts])[perm],
+        np.concatenate([p["lose_diff"] for p in parts])[perm],
+        np.concatenate([p["double_draw_diff"] for p in parts])[perm],
+    )
+
+
+def _series(history, with_handicap=False):
+    if isinstance(history, OddsSeries):
+        return history
+    return OddsSeries.from_records(history, with_handicap=with_handicap)
+
+
+class _TickArrays:
+    """多场比赛的同一玩法序列拼接后的列式数组"""
+
+    def __init__(self, series):
+        self.counts = np.array([len(s) for s in series], dtype=np.int64)
+        self.starts = np.concatenate([[0], np.cumsum(self.counts)[:-1]]).astype(np.int64)
+        self.group = np.repeat(np.arange(len(series), dtype=np.int64), self.counts)
+        self.local = np.arange(int(self.counts.sum()), dtype=np.int64) - self.starts[self.group]
+        self.win = _concat([s.win for s in series], np.float64)
+        self.draw = _concat([s.draw for s in series], np.float64)
+        self.lose = _concat([s.lose for s in series], np.float64)
+
+        dates = []
+        times = []
+        for s in series:
+            d, t = s.update_times()
+            dates.extend(d)
+            times.extend(t)
+        self.date = np.array(dates, dtype=object)
+        self.time = np.array([d + " " + t for d, t in zip(dates, times)], dtype=str)
+        # 完整时间（自 0001-01-01 起的秒数）及一天内秒数，无法解析记为 -1
+        self.dt, self.tod = _parse_times(_concat([s.timestamps for s in series], np.int64), dates, times)
+
+
+def _concat(arrays, dtype):
+    if not arrays:
+        return np.zeros(0, dtype=dtype)
+    return np.concatenate(arrays).astype(dtype)
+
+
+def _parse_times(timestamps, dates, times):
+    """序列中已解析的时间戳直接换算，其余逐条按 strptime 规则解析"""
+    dt = np.full(len(timestamps), -1, dtype=np.int64)
+    tod = np.full(len(timestamps), -1, dtype=np.int64)
+    parsed = timestamps >= _EPOCH
+    dt[parsed] = timestamps[parsed] - _EPOCH
+    tod[parsed] = dt[parsed] % SECONDS_PER_DAY
+
+    for i in np.flatnonzero(~parsed).tolist():
+        value = _parse_datetime(dates[i], times[i])
+        if value is not None:
+            dt[i] = np.datetime64(value, "s").astype(np.int64) - _EPOCH
+        t = _parse_time_of_day(times[i])
+        if t is not None:
+            tod[i] = t
+    return dt, tod
+
+
+def _diffs_with_had(had, hhad, groups_mask):
+    rows = groups_mask[hhad.group]
+    if not rows.any():
+        return _empty_part()
+    had_rows = groups_mask[had.group]
+    n_had = had.counts[hhad.group]
+    # 无HAD数据的比赛不参与计算，下标截断仅为避免越界
+    base = np.minimum(had.starts[hhad.group], len(had.group) - 1)
+    is_first = hhad.local == 0
+
+    # 同日期、容差范围内时间最接近的HAD（全局下标，无匹配为 -1）
+    matched = _nearest_same_date(had, hhad)
+    matched[is_first | ~rows] = -1
+
+    # 每个HAD仅在首次被匹配时用于胜/负差；HAD[1] 已被第1行占用
+    preset = (had.local == 1) & (had.counts[had.group] >= 2)
+    accepted = np.zeros(len(matched), dtype=bool)
+    candidates = np.flatnonzero(matched >= 0)
+    if len(candidates):
+        _, first_pos = np.unique(matched[candidates], return_index=True)
+        first_rows = candidates[first_pos]
+        accepted[first_rows] = ~preset[matched[first_rows]]
+
+    # 胜/负差来源：第1行取 HAD[1]，之后取首次匹配到的HAD
+    wl_src = np.full(len(matched), -1, dtype=np.int64)
+    first_with_second = is_first & (n_had >= 2)
+    wl_src[first_with_second] = base[first_with_second] + 1
+    wl_src[accepted] = matched[accepted]
+
+    # 双平差中HAD平赔来源：第1行取 HAD[0]，匹配成功取匹配的HAD，
+    # 否则取时间不晚于当前HHAD的最近HAD，都没有时沿用上一行的值
+    earlier_had = _latest_not_after(had, hhad.group, hhad.dt)
+    draw_src = np.full(len(matched), -1, dtype=np.int64)
+    fallback = ~is_first & ~accepted & (earlier_had >= 0)
+    draw_src[fallback] = earlier_had[fallback]
+    draw_src[accepted] = matched[accepted]
+    draw_src[is_first] = base[is_first]
+    sets = draw_src >= 0
+    last_set = np.maximum.accumulate(np.where(sets, np.arange(len(sets)), 0))
+    cur_had_draw = had.draw[np.maximum(draw_src[last_set], 0)]
+
+    double_draw = np.where(
+        (hhad.draw != 0) & (cur_had_draw != 0),
+        np.round(hhad.draw - cur_had_draw, 2),
+        0.0,
+    )
+    hhad_part = {
+        "group": hhad.group[rows],
+        "order": hhad.local[rows],
+        "sort_key": hhad.time[rows],
+        "time": hhad.time[rows],
+        "win_diff": _diff(had.win, wl_src, had.win[base])[rows],
+        "lose_diff": _diff(had.lose, wl_src, had.lose[base])[rows],
+        "double_draw_diff": double_draw[rows],
+    }
+
+    # 补充未完整覆盖的HAD记录
+    used_for_wl = preset.copy()
+    used_for_wl[matched[accepted]] = True
+    dd_covered = had.local == 0
+    dd_covered[matched[matched >= 0]] = True
+    extra = had_rows & (had.local >= 1) & ~(used_for_wl & dd_covered)
+
+    extra_idx = np.flatnonzero(extra)
+    had_base = had.starts[had.group[extra_idx]]
+    wl_src = np.where(used_for_wl[extra_idx], -1, extra_idx)
+    earlier_hhad = _latest_not_after(hhad, had.group[extra_idx], had.dt[extra_idx])
+    found = earlier_hhad >= 0
+    double_draw = np.full(len(extra_idx), np.nan)
+    double_draw[found] = np.round(hhad.draw[earlier_hhad[found]] - had.draw[extra_idx[found]], 2)
+    extra_part = {
+        "group": had.group[extra_idx],
+        # 补充行排在同一时间的HHAD行之后
+        "order": had.local[extra_idx] + hhad.counts.max(initial=0),
+        "sort_key": had.time[extra_idx],
+        "time": had.time[extra_idx],
+        "win_diff": _diff(had.win, wl_src, had.win[had_base]),
+        "lose_diff": _diff(had.lose, wl_src, had.lose[had_base]),
+        "double_draw_diff": double_draw,
+    }
+    return {key: np.concatenate([hhad_part[key], extra_part[key]]) for key in hhad_part}
+
+
+def _empty_part():
+    return {
+        "group": np.zeros(0, dtype=np.int64),
+        "order": np.zeros(0, dtype=np.int64),
+        "sort_key": np.zeros(0, dtype=str),
+        "time": np.zeros(0, dtype=str),
+        "win_diff": np.zeros(0),
+        "lose_diff": np.zeros(0),
+        "double_draw_diff": np.zeros(0),
+    }
+
+
+def _diffs_hhad_only(hhad, groups_mask):
+    rows = groups_mask[hhad.group] & (hhad.local >= 1)
+    base_draw = hhad.draw[hhad.starts[hhad.group]]
+    n = int(rows.sum())
+    return {
+        "group": hhad.group[rows],
+        "order": hhad.local[rows],
+        # 仅让球数据的行保持原始顺序，不按时间排序
+        "sort_key": np.full(n, ""),
+        "time": hhad.time[rows],
+        "win_diff": np.full(n, np.nan),
+        "lose_diff": np.full(n, np.nan),
+        "double_draw_diff": np.round(hhad.draw - base_draw, 2)[rows],
+    }
+
+
+def _diff(values, src, base_values):
+    """values[src] - base，src 为 -1 的行为 NaN"""
+    result = np.full(len(src), np.nan)
+    ok = src >= 0
+    result[ok] = np.round(values[src[ok]] - base_values[ok], 2)
+    return result
+
+
+def _nearest_same_date(had, hhad):
+    """为每条HHAD查找同日期、时间差不超过容差的最近HAD，差值相同取下标最小者"""
+    result = np.full(len(hhad.group), -1, dtype=np.int64)
+    had_ok = had.tod >= 0
+    if not had_ok.any() or not len(result):
+        return result
+
+    dates, date_codes = np.unique(np.concatenate([had.date, hhad.date]).astype(str), return_inverse=True)
+    had_date = date_codes[:len(had.date)]
+    hhad_date = date_codes[len(had.date):]
+
+    # 组合键：(比赛, 日期) 内按一天内秒数排序；相同键保留下标最小的HAD
+    had_idx = np.flatnonzero(had_ok)
+    had_day = had.group[had_idx] * len(dates) + had_date[had_idx]
+    keys = had_day * SECONDS_PER_DAY + had.tod[had_idx]
+    order = np.lexsort((had_idx, keys))
+    unique_keys, first = np.unique(keys[order], return_index=True)
+    unique_idx = had_idx[order][first]
+
+    query_ok = hhad.tod >= 0
+    query_day = hhad.group * len(dates) + hhad_date
+    query = query_day * SECONDS_PER_DAY + hhad.tod
+    pos = np.searchsorted(unique_keys, query, side="left")
+
+    best_diff = np.full(len(query), np.iinfo(np.int64).max)
+    for candidate in (pos - 1, pos):
+        valid = query_ok & (candidate >= 0) & (candidate < len(unique_keys))
+        c = np.clip(candidate, 0, len(unique_keys) - 1)
+        valid &= unique_keys[c] // SECONDS_PER_DAY == query_day
+        diff = np.abs(unique_keys[c] - query)
+        valid &= diff <= MATCH_TOLERANCE
+        better = valid & ((diff < best_diff) | ((diff == best_diff) & (unique_idx[c] < result)))
+        best_diff = np.where(better, diff, best_diff)
+        result = np.where(better, unique_idx[c], result)
+    return result
+
+
+def _latest_not_after(ticks, query_group, query_dt):
+    """在 ticks 中为每个查询查找同一比赛内时间 <= query_dt 的最近记录，时间相同取下标最小者"""
+    result = np.full(len(query_group), -1, dtype=np.int64)
+    tick_ok = ticks.dt >= 0
+    if not tick_ok.any() or not len(result):
+        return result
+
+    span = max(int(ticks.dt.max()), int(query_dt.max())) + 1
+    idx = np.flatnonzero(tick_ok)
+    keys = ticks.group[idx] * span + ticks.dt[idx]
+    order = np.lexsort((idx, keys))
+    unique_keys, first = np.unique(keys[order], return_index=True)
+    unique_idx = idx[order][first]
+
+    query_ok = query_dt >= 0
+    pos = np.searchsorted(unique_keys, query_group * span + query_dt, side="right") - 1
+    c = np.clip(pos, 0, len(unique_keys) - 1)
+    valid = query_ok & (pos >= 0) & (unique_keys[c] // span == query_group)
+    result[valid] = unique_idx[c[valid]]
+    return result
+
+
+def _nan_to_none(values):
+    return [None if v != v else v for v in values.tolist()]
+
+
+def _dash(value):
+    return "-" if value is None else value
+
+
+def _sign(value):
+    if value is None:
+        return "-"
+    return "正" if value >= 0 else "负"
+
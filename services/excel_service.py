@@ -1,9 +1,13 @@
+import io
 import os
+import uuid
 from datetime import datetime
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
+from services.odds_analysis import compute_odds_diffs, DIFF_COLUMNS, DIFF_HEADERS
 import config
+import metrics
 
 
 # 样式常量
@@ -274,274 +278,94 @@ def _write_detail_sheet(wb, match, index):
         row += 1
 
     # === 赔率差值分析 ===
-    had_history = match.get("had_history", [])
-    hhad_history = match.get("hhad_history", [])
-    
-    # 判断是否有胜平负指数更新：HAD历史非空即有更新
-    has_had_update = len(had_history) >= 1
-    
-    # 需要有让球更新(>=1条)和胜平负数据才能计算赔率差
-    if len(hhad_history) >= 1 and has_had_update:
-        ws.cell(row=row, column=1, value="赔率差值分析").font = SECTION_FONT
-        ws.cell(row=row, column=1).fill = SECTION_FILL
-        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=6)
-        row += 1
-        
-        # 表头
-        headers = ["胜的赔率的差", "负的赔率的差", "双平赔率的差", "胜差正负", "负差正负", "双平差正负"]
-        for col, h in enumerate(headers, 1):
-            ws.cell(row=row, column=col, value=h)
-        _apply_header_style(ws, row, 1, 6)
-        row += 1
-        
-        # 获取第一条数据作为基准（用于胜差、负差）
-        base_win = had_history[0].get("win", 0) or 0
-        base_lose = had_history[0].get("lose", 0) or 0
-        
-        # 构建HAD时间戳索引，用于时间匹配
-        def parse_timestamp(item):
-            return item.get("update_date", "") + " " + item.get("update_time", "")
-        
-        def parse_full_datetime(item):
-            """将HAD/HHAD记录的日期+时间解析为datetime对象"""
-            try:
-                from datetime import datetime as dt_cls
-                date_str = item.get("update_date", "")
-                time_str = item.get("update_time", "")
-                return dt_cls.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S")
-            except:
-                return None
-        
-        def time_diff_seconds(t1, t2):
-            """计算两个时间字符串的秒数差（仅比较时间部分HH:MM:SS）"""
-            try:
-                from datetime import datetime
-                fmt = "%H:%M:%S"
-                dt1 = datetime.strptime(t1.split()[-1] if " " in t1 else t1, fmt)
-                dt2 = datetime.strptime(t2.split()[-1] if " " in t2 else t2, fmt)
-                return abs((dt1 - dt2).total_seconds())
-            except:
-                return float('inf')
-        
-        def find_matching_had(hhad_item, had_list, tolerance=300):
-            """在HAD列表中查找与HHAD时间戳最接近的记录（同日期，容差5分钟）"""
-            hhad_date = hhad_item.get("update_date", "")
-            hhad_time = hhad_item.get("update_time", "")
-            best_match = None
-            best_diff = float('inf')
-            for idx, had in enumerate(had_list):
-                if had.get("update_date", "") != hhad_date:
-                    continue
-                diff = time_diff_seconds(had.get("update_time", ""), hhad_time)
-                if diff < best_diff and diff <= tolerance:
-                    best_diff = diff
-                    best_match = idx
-            return best_match
-        
-        # 对齐规则：
-        # 第1行(r=0): 胜/负差取 HAD[1]，双平差取 HAD[0]/HHAD[0]（保持特殊对齐）
-        # 后续行: 按时间戳匹配HAD和HHAD，无匹配时使用最近的HAD平数据
-        # 所有结果行最终按时间排序输出
-        used_had_for_wl = set()  # 记录已用于胜/负差的HAD索引
-        had_dd_covered = set()   # 记录已在HHAD循环中计算了双平差的HAD索引
-        last_used_had_draw = had_history[0].get("draw", 0) or 0  # 记录最近使用的HAD平数据
-        
-        # 收集所有差值行，最后按时间排序写入Excel
-        diff_rows = []  # 每项: (sort_time, {col1, col2, col3, col4, col5, col6})
-        
-        total_rows = len(hhad_history)
-        
-        for r in range(total_rows):
-            row_data = {}
-            sort_time = parse_timestamp(hhad_history[r])
-            
-            if r == 0:
-                # 第1行特殊对齐：胜/负差取 HAD[1]，双平差取 HAD[0]/HHAD[0]
-                if len(had_history) >= 2:
-                    current_win = had_history[1].get("win", 0) or 0
-                    current_lose = had_history[1].get("lose", 0) or 0
-                    win_diff = round(current_win - base_win, 2)
-                    lose_diff = round(current_lose - base_lose, 2)
-                    row_data[1] = win_diff
-                    row_data[2] = lose_diff
-                    row_data[4] = "正" if win_diff >= 0 else "负"
-                    row_data[5] = "正" if lose_diff >= 0 else "负"
-                    used_had_for_wl.add(1)
-                else:
-                    row_data[1] = "-"
-                    row_data[2] = "-"
-                    row_data[4] = "-"
-                    row_data[5] = "-"
-                
-                cur_had_draw = had_history[0].get("draw", 0) or 0
-                cur_hhad_draw = hhad_history[0].get("draw", 0) or 0
-                had_dd_covered.add(0)  # HAD[0]的draw已用于双平差
-                last_used_had_draw = cur_had_draw
-            else:
-                # 后续行：按时间戳匹配，匹配不到则使用向前查找最近的HAD
-                matched_had_idx = find_matching_had(hhad_history[r], had_history)
-                
-                if matched_had_idx is not None and matched_had_idx not in used_had_for_wl:
-                    # 找到匹配且未使用过
-                    current_win = had_history[matched_had_idx].get("win", 0) or 0
-                    current_lose = had_history[matched_had_idx].get("lose", 0) or 0
-                    win_diff = round(current_win - base_win, 2)
-                    lose_diff = round(current_lose - base_lose, 2)
-                    row_data[1] = win_diff
-                    row_data[2] = lose_diff
-                    row_data[4] = "正" if win_diff >= 0 else "负"
-                    row_data[5] = "正" if lose_diff >= 0 else "负"
-                    used_had_for_wl.add(matched_had_idx)
-                    cur_had_draw = had_history[matched_had_idx].get("draw", 0) or 0
-                    had_dd_covered.add(matched_had_idx)
-                    last_used_had_draw = cur_had_draw
-                else:
-                    # 无匹配或已使用，胜/负差显示"-"
-                    row_data[1] = "-"
-                    row_data[2] = "-"
-                    row_data[4] = "-"
-                    row_data[5] = "-"
-                    # 时间匹配到的HAD已用于胜/负差，标记其双平差也已覆盖
-                    if matched_had_idx is not None:
-                        had_dd_covered.add(matched_had_idx)
-                    # 双平差：向前查找时间戳<=当前HHAD的最近HAD
-                    hhad_dt = parse_full_datetime(hhad_history[r])
-                    cur_had_draw = last_used_had_draw  # 默认使用最近一次的
-                    if hhad_dt:
-                        best_candidate = None
-                        best_dt = None
-                        for had_item in had_history:
-                            had_dt = parse_full_datetime(had_item)
-                            if had_dt and had_dt <= hhad_dt:
-                                if best_dt is None or had_dt > best_dt:
-                                    best_dt = had_dt
-                                    best_candidate = had_item
-                        if best_candidate:
-                            cur_had_draw = best_candidate.get("draw", 0) or 0
-                            last_used_had_draw = cur_had_draw
-                
-                cur_hhad_draw = hhad_history[r].get("draw", 0) or 0
-            
-            double_draw_diff = round(cur_hhad_draw - cur_had_draw, 2) if cur_hhad_draw and cur_had_draw else 0
-            row_data[3] = double_draw_diff
-            row_data[6] = "正" if double_draw_diff >= 0 else "负"
-            
-            diff_rows.append((sort_time, row_data))
-        
-        # 补充未完整覆盖的HAD记录
-        for had_idx in range(1, len(had_history)):
-            # 已在HHAD循环中同时覆盖了胜/负差和双平差的，跳过
-            if had_idx in used_had_for_wl and had_idx in had_dd_covered:
-                continue
-            
-            row_data = {}
-            sort_time = parse_timestamp(had_history[had_idx])
-            
-            if had_idx in used_had_for_wl:
-                # 胜/负差已在HHAD循环显示，仅需双平差独占一行
-                row_data[1] = "-"
-                row_data[2] = "-"
-                row_data[4] = "-"
-                row_data[5] = "-"
-            else:
-                # 完整行：胜/负差 + 双平差
-                current_win = had_history[had_idx].get("win", 0) or 0
-                current_lose = had_history[had_idx].get("lose", 0) or 0
-                win_diff = round(current_win - base_win, 2)
-                lose_diff = round(current_lose - base_lose, 2)
-                row_data[1] = win_diff
-                row_data[2] = lose_diff
-                row_data[4] = "正" if win_diff >= 0 else "负"
-                row_data[5] = "正" if lose_diff >= 0 else "负"
-            
-            # 双平差：向前查找最近的HHAD让平赔率
-            had_dt = parse_full_datetime(had_history[had_idx])
-            nearest_hhad_draw = None
-            if had_dt:
-                best_candidate = None
-                best_dt = None
-                for hhad_item in hhad_history:
-                    hhad_dt = parse_full_datetime(hhad_item)
-                    if hhad_dt and hhad_dt <= had_dt:
-                        if best_dt is None or hhad_dt > best_dt:
-                            best_dt = hhad_dt
-                            best_candidate = hhad_item
-                if best_candidate:
-                    nearest_hhad_draw = best_candidate.get("draw", 0) or 0
-            
-            if nearest_hhad_draw is not None:
-                cur_had_draw = had_history[had_idx].get("draw", 0) or 0
-                double_draw_diff = round(nearest_hhad_draw - cur_had_draw, 2)
-                row_data[3] = double_draw_diff
-                row_data[6] = "正" if double_draw_diff >= 0 else "负"
-            else:
-                row_data[3] = "-"
-                row_data[6] = "-"
-            
-            diff_rows.append((sort_time, row_data))
-        
-        # 按时间排序，确保补充行插入到正确的时间位置
-        diff_rows.sort(key=lambda x: x[0])
-        
-        # 写入排序后的差值行到Excel
-        for idx, (sort_time, row_data) in enumerate(diff_rows):
-            for col, val in row_data.items():
-                ws.cell(row=row, column=col, value=val)
-            _apply_data_style(ws, row, 1, 6, is_alt=(idx % 2 == 0))
-            row += 1
-
-    elif len(hhad_history) >= 2:
-        # 无胜平负指数更新，仅用HHAD让平数据做差：HHAD[i].draw - HHAD[0].draw
+    with metrics.timed_phase("analyse"):
+        diff_rows = compute_odds_diffs(had_history, hhad_history)
+    if diff_rows is not None:
         ws.cell(row=row, column=1, value="赔率差值分析").font = SECTION_FONT
         ws.cell(row=row, column=1).fill = SECTION_FILL
         ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=6)
         row += 1
         
-        headers = ["胜的赔率的差", "负的赔率的差", "双平赔率的差", "胜差正负", "负差正负", "双平差正负"]
-        for col, h in enumerate(headers, 1):
+        for col, h in enumerate(DIFF_HEADERS, 1):
             ws.cell(row=row, column=col, value=h)
         _apply_header_style(ws, row, 1, 6)
         row += 1
         
-        base_hhad_draw = hhad_history[0].get("draw", 0) or 0
-        
-        for i in range(1, len(hhad_history)):
-            ws.cell(row=row, column=1, value="-")
-            ws.cell(row=row, column=2, value="-")
-            ws.cell(row=row, column=4, value="-")
-            ws.cell(row=row, column=5, value="-")
-            
-            cur_hhad_draw = hhad_history[i].get("draw", 0) or 0
-            draw_diff = round(cur_hhad_draw - base_hhad_draw, 2)
-            ws.cell(row=row, column=3, value=draw_diff)
-            ws.cell(row=row, column=6, value="正" if draw_diff >= 0 else "负")
-            
-            _apply_data_style(ws, row, 1, 6, is_alt=(i % 2 == 0))
+        # 仅有让球数据时差值从HHAD第2条开始，斑马纹与之对齐
+        alt_offset = 0 if had_history else 1
+        for idx, diff_row in enumerate(diff_rows):
+            for col, key in enumerate(DIFF_COLUMNS, 1):
+                ws.cell(row=row, column=col, value=diff_row[key])
+            _apply_data_style(ws, row, 1, 6, is_alt=((idx + alt_offset) % 2 == 0))
             row += 1
 
     _auto_column_width(ws)
 
 
-def generate_excel(matches):
+def _save_workbook(matches, target, streaming=None):
+    """生成工作簿并保存到 target（文件路径或可写的二进制文件对象）
+
+    analyse（差值分析）、save（序列化保存）及其余的 write 阶段耗时记入 metrics.EXPORT_PHASE_SECONDS。
+    """
+    if streaming is None:
+        streaming = config.EXCEL_STREAMING
+    with metrics.phase_timer(metrics.EXPORT_PHASE_SECONDS, "write"):
+        if streaming:
+            from services.excel_stream import write_workbook
+            write_workbook(matches, target)
+            return
+
+        wb = Workbook()
+        ws_summary = wb.active
+        _write_summary_sheet(ws_summary, matches)
+
+        for idx, match in enumerate(matches, 1):
+            _write_detail_sheet(wb, match, idx)
+
+        with metrics.timed_phase("save"):
+            wb.save(target)
+
+
+def export_filename(ext="xlsx", unique=False):
+    """按当前时间生成导出文件名
+
+    Args:
+        unique: 为True时追加随机后缀，同一秒内并发导出的文件不会互相覆盖
+    """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if unique:
+        timestamp = f"{timestamp}_{uuid.uuid4().hex[:6]}"
+    return f"竞彩足球_{timestamp}.{ext}"
+
+
+def generate_excel(matches, streaming=None, filename=None):
     """生成竞彩足球数据Excel文件
 
     Args:
         matches: 包含完整赔率的比赛数据列表
+        streaming: 是否使用只写模式流式生成，默认取 config.EXCEL_STREAMING
+        filename: 输出文件名（位于 OUTPUT_DIR 下），默认为 export_filename(unique=True)
 
     Returns:
-        str: 生成的Excel文件完整路径
+        tuple: (filepath, filename)，生成的Excel文件完整路径及文件名
     """
     os.makedirs(config.OUTPUT_DIR, exist_ok=True)
 
-    wb = Workbook()
-    ws_summary = wb.active
-    _write_summary_sheet(ws_summary, matches)
-
-    for idx, match in enumerate(matches, 1):
-        _write_detail_sheet(wb, match, idx)
-
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"竞彩足球_{timestamp}.xlsx"
+    if filename is None:
+        # 后台任务可能在同一秒内并发导出，追加随机后缀避免文件互相覆盖
+        filename = export_filename("xlsx", unique=True)
     filepath = os.path.join(config.OUTPUT_DIR, filename)
-    wb.save(filepath)
+    _save_workbook(matches, filepath, streaming)
     return filepath, filename
+
+
+def generate_excel_buffer(matches, streaming=None):
+    """生成竞彩足球数据Excel并序列化到内存，不写入 OUTPUT_DIR
+
+    Returns:
+        io.BytesIO: 已定位到开头的 xlsx 内容
+    """
+    buffer = io.BytesIO()
+    _save_workbook(matches, buffer, streaming)
+    buffer.seek(0)
+    return buffer
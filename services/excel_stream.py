@@ -0,0 +1,288 @@
+"""
+流式 Excel 导出
+
+使用 openpyxl 只写(write_only)工作簿逐行写出，单元格引用工作簿级共享的命名样式，
+不再逐个设置 Font/Fill/Border/Alignment。xlsx 中列宽定义位于行数据之前，因此每个 Sheet
+的行先以 (值, 样式名) 缓存，追加时同步统计列宽，写出后即释放；同一时刻只缓存一个 Sheet，
+内存占用与导出场次无关。版式与 excel_service 中的常规导出一致。
+"""
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+from services.excel_service import (
+    HEADER_FONT, HEADER_FILL, HEADER_ALIGN, DATA_ALIGN_CENTER, THIN_BORDER,
+    ALT_ROW_FILL, SECTION_FONT, SECTION_FILL, HAFU_LABELS,
+)
+from services.odds_analysis import compute_odds_diffs, DIFF_COLUMNS, DIFF_HEADERS
+import metrics
+
+# 命名样式
+STYLE_HEADER = "表头"
+STYLE_DATA = "数据"
+STYLE_DATA_ALT = "数据-斑马纹"
+STYLE_SECTION = "分区标题"
+STYLE_LABEL = "信息标签"
+STYLE_VALUE = "信息值"
+STYLE_GROUP = "分组标题"
+
+# 列宽上限及留白，与 _auto_column_width 一致
+MAX_COLUMN_WIDTH = 30
+COLUMN_PADDING = 4
+
+
+def _named_styles():
+    """命名样式只能注册到一个工作簿，每次导出重新创建；未指定字体的沿用工作簿默认字体"""
+    return [
+        NamedStyle(name=STYLE_HEADER, font=HEADER_FONT, fill=HEADER_FILL,
+                   alignment=HEADER_ALIGN, border=THIN_BORDER),
+        NamedStyle(name=STYLE_DATA, font=DEFAULT_FONT, alignment=DATA_ALIGN_CENTER,
+                   border=THIN_BORDER),
+        NamedStyle(name=STYLE_DATA_ALT, font=DEFAULT_FONT, alignment=DATA_ALIGN_CENTER,
+                   border=THIN_BORDER, fill=ALT_ROW_FILL),
+        NamedStyle(name=STYLE_SECTION, font=SECTION_FONT, fill=SECTION_FILL),
+        NamedStyle(name=STYLE_LABEL, font=Font(bold=True), border=THIN_BORDER),
+        NamedStyle(name=STYLE_VALUE, font=DEFAULT_FONT, border=THIN_BORDER),
+        NamedStyle(name=STYLE_GROUP, font=Font(bold=True, italic=True)),
+    ]
+
+
+def _text_width(value):
+    # 中文字符按2个宽度计算
+    text = str(value)
+    if text.isascii():
+        return len(text)
+    return sum(2 if ord(c) > 127 else 1 for c in text)
+
+
+class _SheetRows:
+    """单个 Sheet 的行缓存，追加行时同步统计列宽"""
+
+    def __init__(self):
+        self.rows = []
+        self.merges = []
+        self._widths = {}
+        self._max_col = 0
+
+    def append(self, values, style=None):
+        """追加一行
+
+        Args:
+            values: 单元格值列表
+            style: 整行统一的样式名，或与 values 等长的样式名列表
+        """
+        styles = style if isinstance(style, (list, tuple)) else [style] * len(values)
+        widths = self._widths
+        for col, value in enumerate(values, 1):
+            if value is not None:
+                width = _text_width(value)
+                if width > widths.get(col, 0):
+                    widths[col] = width
+        self._max_col = max(self._max_col, len(values))
+        self.rows.append((values, styles))
+
+    def blank(self):
+        self.rows.append(((), ()))
+
+    def section(self, title, span):
+        """分区标题行，合并前 span 列"""
+        row = len(self.rows) + 1
+        self.merges.append(f"A{row}:{get_column_letter(span)}{row}")
+        self._max_col = max(self._max_col, span)
+        self.append([title], STYLE_SECTION)
+
+    def header(self, titles):
+        self.append(titles, STYLE_HEADER)
+
+    def data(self, values, is_alt=False):
+        self.append(values, STYLE_DATA_ALT if is_alt else STYLE_DATA)
+
+    def write_to(self, ws):
+        """设置列宽和合并区域后逐行写入只写工作表"""
+        for col in range(1, self._max_col + 1):
+            width = min(self._widths.get(col, 0) + COLUMN_PADDING, MAX_COLUMN_WIDTH)
+            ws.column_dimensions[get_column_letter(col)].width = width
+        for ref in self.merges:
+            ws.merged_cells.add(ref)
+        for values, styles in self.rows:
+            ws.append([_styled_cell(ws, value, style) for value, style in zip(values, styles)])
+
+
+def _styled_cell(ws, value, style):
+    cell = WriteOnlyCell(ws, value=value)
+    if style is not None:
+        cell.style = style
+    return cell
+
+
+def _summary_rows(matches):
+    sheet = _SheetRows()
+    sheet.header([
+        "序号", "比赛时间", "联赛", "主队", "客队",
+        "胜", "平", "负", "让球", "让胜", "让平", "让负"
+    ])
+    for idx, m in enumerate(matches, 1):
+        had = m.get("had_odds", {})
+        hhad = m.get("hhad_odds", {})
+        sheet.data([
+            idx,
+            m.get("match_time", ""),
+            m.get("league", ""),
+            m.get("home_team", ""),
+            m.get("away_team", ""),
+            had.get("win", ""),
+            had.get("draw", ""),
+            had.get("lose", ""),
+            hhad.get("handicap", ""),
+            hhad.get("win", ""),
+            hhad.get("draw", ""),
+            hhad.get("lose", ""),
+        ], is_alt=(idx % 2 == 0))
+    return sheet
+
+
+def _detail_rows(match):
+    sheet = _SheetRows()
+
+    # === 基本信息 ===
+    sheet.section("基本信息", 4)
+    info_items = [
+        ("比赛ID", match.get("match_id", "")),
+        ("比赛时间", match.get("match_time", "")),
+        ("联赛", match.get("league", "")),
+        ("主队", match.get("home_team", "")),
+        ("客队", match.get("away_team", "")),
+    ]
+    for label, val in info_items:
+        sheet.append([label, val], [STYLE_LABEL, STYLE_VALUE])
+    sheet.blank()
+
+    # === 胜平负赔率 ===
+    sheet.section("胜平负赔率", 3)
+    had = match.get("had_odds", {})
+    sheet.header(["胜", "平", "负"])
+    sheet.data([had.get(key, "") for key in ("win", "draw", "lose")])
+    sheet.blank()
+
+    # === 让球胜平负 ===
+    sheet.section("让球胜平负", 4)
+    hhad = match.get("hhad_odds", {})
+    sheet.header(["让球数", "胜", "平", "负"])
+    sheet.data([hhad.get(key, "") for key in ("handicap", "win", "draw", "lose")])
+    sheet.blank()
+
+    # === 比分赔率 ===
+    crs = match.get("crs_odds", {})
+    if crs:
+        sheet.section("比分赔率", 4)
+        groups = {"主胜": {}, "平局": {}, "客胜": {}}
+        for score, odds in crs.items():
+            parts = score.split(":")
+            if len(parts) != 2:
+                continue
+            home, away = int(parts[0]), int(parts[1])
+            key = "主胜" if home > away else "平局" if home == away else "客胜"
+            groups[key][score] = odds
+
+        for group_name, group_data in groups.items():
+            if not group_data:
+                continue
+            sheet.append([group_name], STYLE_GROUP)
+            sheet.header(["比分", "赔率"])
+            for i, (score, odds) in enumerate(sorted(group_data.items())):
+                sheet.data([score, odds], is_alt=(i % 2 == 0))
+            sheet.blank()
+
+    # === 总进球赔率 ===
+    ttg = match.get("ttg_odds", {})
+    if ttg:
+        sheet.section("总进球赔率", 4)
+        sheet.header(["总进球数", "赔率"])
+        for i, (goals, odds) in enumerate(sorted(ttg.items(), key=lambda x: x[0])):
+            label = f"{goals}球" if goals != "7+" else "7+球"
+            sheet.data([label, odds], is_alt=(i % 2 == 0))
+        sheet.blank()
+
+    # === 半全场赔率 ===
+    hafu = match.get("hafu_odds", {})
+    if hafu:
+        sheet.section("半全场赔率", 4)
+        sheet.header(["半场-全场", "赔率"])
+        for i, (key, odds) in enumerate(hafu.items()):
+            sheet.data([HAFU_LABELS.get(key, key), odds], is_alt=(i % 2 == 0))
+        sheet.blank()
+
+    # === 胜平负赔率变化历史 ===
+    had_history = match.get("had_history", [])
+    if had_history:
+        sheet.section(f"胜平负赔率变化历史（共{len(had_history)}条）", 5)
+        sheet.header(["更新日期", "更新时间", "胜", "平", "负"])
+        for i, item in enumerate(had_history):
+            sheet.data([
+                item.get("update_date", ""),
+                item.get("update_time", ""),
+                item.get("win", ""),
+                item.get("draw", ""),
+                item.get("lose", ""),
+            ], is_alt=(i % 2 == 0))
+        sheet.blank()
+
+    # === 让球胜平负赔率变化历史 ===
+    hhad_history = match.get("hhad_history", [])
+    if hhad_history:
+        first_handicap = hhad_history[0].get("handicap", "")
+        sheet.section(f"让球胜平负赔率变化历史（让{first_handicap}球，共{len(hhad_history)}条）", 6)
+        sheet.header(["更新日期", "更新时间", "让球", "让胜", "让平", "让负"])
+        for i, item in enumerate(hhad_history):
+            sheet.data([
+                item.get("update_date", ""),
+                item.get("update_time", ""),
+                item.get("handicap", ""),
+                item.get("win", ""),
+                item.get("draw", ""),
+                item.get("lose", ""),
+            ], is_alt=(i % 2 == 0))
+        sheet.blank()
+
+    # === 赔率差值分析 ===
+    with metrics.timed_phase("analyse"):
+        diff_rows = compute_odds_diffs(had_history, hhad_history)
+    if diff_rows is not None:
+        sheet.section("赔率差值分析", 6)
+        sheet.header(DIFF_HEADERS)
+        # 仅有让球数据时差值从HHAD第2条开始，斑马纹与之对齐
+        alt_offset = 0 if had_history else 1
+        for idx, diff_row in enumerate(diff_rows):
+            sheet.data([diff_row[key] for key in DIFF_COLUMNS], is_alt=((idx + alt_offset) % 2 == 0))
+
+    return sheet
+
+
+def _detail_title(match, index):
+    title = f"{index}-{match.get('home_team', '')}vs{match.get('away_team', '')}"
+    # Sheet名最长31字符
+    return title[:31]
+
+
+def write_workbook(matches, filepath):
+    """以只写模式生成与 generate_excel 版式一致的工作簿并保存到 filepath
+
+    Args:
+        matches: 包含完整赔率的比赛数据列表
+        filepath: 保存路径，也可以是可写的文件对象
+    """
+    wb = Workbook(write_only=True)
+    for style in _named_styles():
+        wb.add_named_style(style)
+
+    ws = wb.create_sheet(title="比赛汇总")
+    ws.freeze_panes = "A2"
+    _summary_rows(matches).write_to(ws)
+
+    for idx, match in enumerate(matches, 1):
+        ws = wb.create_sheet(title=_detail_title(match, idx))
+        _detail_rows(match).write_to(ws)
+
+    with metrics.timed_phase("save"):
+        wb.save(filepath)
@@ -0,0 +1,142 @@
+"""
+导出文件缓存
+
+以内容寻址的方式缓存生成的导出文件：键为按导出顺序排列的每场比赛除赔率历史外的全部字段
+（当前赔率、状态、比分等），以及赔率历史最新一条记录的时间（附带记录条数）的哈希，文件保存为
+OUTPUT_DIR/竞彩足球_<键>.<扩展名>。赔率未变化的重复
+导出直接返回已有文件，跳过生成。缓存文件按最近使用时间(mtime)淘汰，总大小和文件数受配置限制。
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+import config
+import metrics
+
+# 导出版式变化时递增，使旧缓存失效
+CACHE_VERSION = 2
+
+FILE_PREFIX = "竞彩足球_"
+KEY_LENGTH = 32
+_CACHE_FILE_RE = re.compile(rf"^{FILE_PREFIX}[0-9a-f]{{{KEY_LENGTH}}}\.\w+$")
+
+
+# 只按版本参与缓存键的字段，其余字段按完整内容参与
+_HISTORY_FIELDS = ("had_history", "hhad_history")
+
+
+def export_cache_key(matches, ext="xlsx"):
+    """计算一组比赛导出结果的缓存键，比赛顺序不同视为不同导出"""
+    versions = [
+        (
+            {k: v for k, v in m.items() if k not in _HISTORY_FIELDS},
+            _history_version(m.get("had_history", [])),
+            _history_version(m.get("hhad_history", [])),
+        )
+        for m in matches
+    ]
+    payload = json.dumps([CACHE_VERSION, ext, versions], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:KEY_LENGTH]
+
+
+def _history_version(history):
+    """赔率历史的版本：最新一条记录的时间及记录条数"""
+    latest = max(
+        (f"{item.get('update_date', '')} {item.get('update_time', '')}" for item in history),
+        default="",
+    )
+    return [latest, len(history)]
+
+
+class ExportCache:
+    """导出文件缓存，线程安全"""
+
+    def __init__(self, directory=None, max_bytes=None, max_files=None):
+        self.directory = directory or config.OUTPUT_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else config.EXPORT_CACHE_MAX_BYTES
+        self.max_files = max_files if max_files is not None else config.EXPORT_CACHE_MAX_FILES
+        self._lock = threading.Lock()
+
+    def filename_for(self, key, ext="xlsx"):
+        return f"{FILE_PREFIX}{key}.{ext}"
+
+    def get(self, key, ext="xlsx"):
+        """命中时返回 (文件路径, 文件名) 并刷新其最近使用时间，未命中返回 None"""
+        filename = self.filename_for(key, ext)
+        filepath = os.path.join(self.directory, filename)
+        with self._lock:
+            try:
+                os.utime(filepath)
+            except FileNotFoundError:
+                return None
+        return filepath, filename
+
+    def get_or_create(self, key, build, ext="xlsx"):
+        """返回缓存文件，未命中时调用 build(filename) 生成
+
+        build 在 OUTPUT_DIR 下写入给定的临时文件名并返回其完整路径；生成完成后原子地
+        重命名为缓存文件，并发生成同一键时不会读到写了一半的文件。
+
+        Returns:
+            tuple: (文件路径, 文件名, 是否命中缓存)
+        """
+        cached = self.get(key, ext)
+        metrics.CACHE_REQUESTS.inc(cache="export_file", result="hit" if cached is not None else "miss")
+        if cached is not None:
+            return cached[0], cached[1], True
+
+        filename = self.filename_for(key, ext)
+        filepath = os.path.join(self.directory, filename)
+        tmp_name = f".{filename}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            tmp_path = build(tmp_name)
+            os.replace(tmp_path, filepath)
+        except Exception:
+            try:
+                os.remove(os.path.join(self.directory, tmp_name))
+            except FileNotFoundError:
+                pass
+            raise
+        self.evict(keep=filename)
+        return filepath, filename, False
+
+    def evict(self, keep=None):
+        """按最近使用时间淘汰缓存文件，直到总大小和文件数均不超过上限
+
+        Returns:
+            int: 删除的文件数
+        """
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if name == keep or not _CACHE_FILE_RE.match(name):
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name))
+
+            total_bytes = sum(size for _, size, _ in entries)
+            total_files = len(entries)
+            if keep is not None:
+                try:
+                    total_bytes += os.path.getsize(os.path.join(self.directory, keep))
+                    total_files += 1
+                except FileNotFoundError:
+                    pass
+
+            removed = 0
+            for _, size, name in sorted(entries):
+                if total_bytes <= self.max_bytes and total_files <= self.max_files:
+                    break
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+                total_bytes -= size
+                total_files -= 1
+                removed += 1
+            return removed
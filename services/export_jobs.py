@@ -0,0 +1,190 @@
+"""
+后台导出任务队列
+
+POST /api/export 只登记任务并立即返回任务ID，获取比赛数据和生成 Excel 在有界线程池中执行。
+任务状态保存在内存中，供 GET /api/export/<job_id> 查询阶段和进度；结束的任务保留
+EXPORT_JOB_TTL 秒后清理。启用导出缓存时，赔率未变化的重复导出直接复用已生成的文件。
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from services.excel_service import generate_excel
+from services.export_cache import ExportCache, export_cache_key
+from profiling import StackSampler
+import config
+import metrics
+
+# 任务阶段
+PHASE_QUEUED = "queued"        # 排队中
+PHASE_FETCHING = "fetching"    # 获取比赛数据
+PHASE_WRITING = "writing"      # 生成Excel
+PHASE_DONE = "done"            # 完成
+PHASE_FAILED = "failed"        # 失败
+
+FINISHED_PHASES = (PHASE_DONE, PHASE_FAILED)
+
+
+class ExportQueueFull(RuntimeError):
+    """进行中的导出任务数已达上限"""
+
+
+class ExportJob:
+    """单个导出任务的状态"""
+
+    def __init__(self, match_ids, profile=False):
+        self.job_id = uuid.uuid4().hex
+        self.match_ids = list(match_ids)
+        self.profile = profile
+        self.profile_file = None
+        self.phase = PHASE_QUEUED
+        self.done = 0
+        self.total = len(self.match_ids)
+        self.match_count = 0
+        self.cached = False
+        self.failures = []
+        self.filename = None
+        self.filepath = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.phase in FINISHED_PHASES
+
+    def to_dict(self):
+        data = {
+            "job_id": self.job_id,
+            "phase": self.phase,
+            "done": self.done,
+            "total": self.total,
+            "failed": list(self.failures),
+        }
+        if self.phase == PHASE_DONE:
+            data.update({
+                "filename": self.filename,
+                "download_url": f"/api/export/{self.job_id}/download",
+                "match_count": self.match_count,
+                "cached": self.cached,
+            })
+        elif self.phase == PHASE_FAILED:
+            data["error"] = self.error
+        if self.profile_file is not None:
+            data["profile"] = self.profile_file
+        return data
+
+
+class ExportJobManager:
+    """导出任务管理器
+
+    - 任务在最多 max_workers 个线程中执行
+    - 排队和执行中的任务合计不超过 max_active 个，超出时 submit 抛出 ExportQueueFull
+    """
+
+    def __init__(self, match_service, max_workers=None, max_active=None, job_ttl=None,
+                 cache=None, retention=None, profiles=None):
+        self.match_service = match_service
+        # 输出目录保留管理器，每个任务完成后执行一次清理
+        self.retention = retention
+        # 剖析结果目录(profiling.ProfileStore)，为 None 时忽略任务的剖析请求
+        self.profiles = profiles
+        if cache is None and config.EXPORT_CACHE_ENABLED:
+            cache = ExportCache()
+        self.cache = cache
+        self.max_active = max_active or config.EXPORT_MAX_ACTIVE
+        self.job_ttl = job_ttl if job_ttl is not None else config.EXPORT_JOB_TTL
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.EXPORT_WORKERS,
+            thread_name_prefix="export",
+        )
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, match_ids, profile=False):
+        """登记导出任务并放入线程池，返回任务状态字典
+
+        profile 为 True 且设置了 profiles 时剖析任务的执行过程；剖析文件在任务结束后写入，
+        写入后任务状态中的 profile 为其文件名。
+        """
+        job = ExportJob(match_ids, profile=profile and self.profiles is not None)
+        with self._lock:
+            self._prune()
+            active = sum(1 for j in self._jobs.values() if not j.finished)
+            if active >= self.max_active:
+                raise ExportQueueFull(f"导出任务过多（进行中 {active} 个），请稍后再试")
+            self._jobs[job.job_id] = job
+            snapshot = job.to_dict()
+        self._executor.submit(self._run, job)
+        return snapshot
+
+    def get(self, job_id):
+        """查询任务状态，任务不存在或已清理时返回 None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return None if job is None else job.to_dict()
+
+    def get_file(self, job_id):
+        """已完成任务的 (文件路径, 文件名)，未完成或不存在时返回 None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.phase != PHASE_DONE:
+                return None
+            return job.filepath, job.filename
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job):
+        if not job.profile:
+            self._export(job)
+            return
+        sampler = StackSampler().start()
+        try:
+            self._export(job)
+        finally:
+            self._update(job, profile_file=self.profiles.save(f"export_job_{job.job_id}", sampler))
+
+    def _export(self, job):
+        try:
+            self._update(job, phase=PHASE_FETCHING)
+            with metrics.EXPORT_PHASE_SECONDS.time(phase="fetch"):
+                matches, failures = self.match_service.get_matches_with_errors(
+                    job.match_ids,
+                    on_progress=lambda done, total: self._update(job, done=done),
+                )
+            if not matches:
+                self._update(job, phase=PHASE_FAILED, failures=failures,
+                             error="未找到选中的比赛数据", finished_at=time.time())
+                return
+
+            self._update(job, phase=PHASE_WRITING, failures=failures, match_count=len(matches))
+            cached = False
+            if self.cache is not None:
+                filepath, filename, cached = self.cache.get_or_create(
+                    export_cache_key(matches),
+                    lambda tmp_name: generate_excel(matches, filename=tmp_name)[0],
+                )
+            else:
+                filepath, filename = generate_excel(matches)
+            self._update(job, phase=PHASE_DONE, filepath=filepath, filename=filename,
+                         cached=cached, finished_at=time.time())
+            if self.retention is not None:
+                self.retention.enforce(keep=filename)
+        except Exception as e:
+            self._update(job, phase=PHASE_FAILED, error=str(e), finished_at=time.time())
+
+    def _update(self, job, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(job, name, value)
+
+    def _prune(self):
+        """清理结束超过 job_ttl 秒的任务（调用方需持有锁）"""
+        expire_before = time.time() - self.job_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < expire_before
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
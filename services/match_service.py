@@ -1,8 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import config
+
+
 class MatchService:
     """比赛数据处理服务"""
 
-    def __init__(self, data_provider):
+    def __init__(self, data_provider, max_workers=None):
         self.provider = data_provider
+        self.max_workers = max_workers or config.FETCH_CONCURRENCY
 
     def get_today_matches(self, date=None):
         """获取竞彩比赛列表，按时间排序"""
@@ -16,13 +21,58 @@ class MatchService:
 
     def get_matches_by_ids(self, match_ids):
         """批量获取多场比赛完整信息（包含赔率历史）"""
-        results = []
-        for mid in match_ids:
-            detail = self.provider.get_match_odds(mid)
-            if detail:
-                # 获取赔率历史数据
-                odds_history = self.provider.get_odds_history(mid)
-                detail["had_history"] = odds_history.get("had_history", [])
-                detail["hhad_history"] = odds_history.get("hhad_history", [])
-                results.append(detail)
-        return results
+        matches, _ = self.get_matches_with_errors(match_ids)
+        return matches
+
+    def get_matches_with_errors(self, match_ids, on_progress=None, as_series=False):
+        """并发批量获取多场比赛完整信息（包含赔率历史）
+
+        比赛详情和赔率历史在线程池中并行获取，并发数受 max_workers 限制。每场比赛的详情获取成功后
+        才请求其赔率历史，无效ID不会发起历史请求、占用上游限速令牌。
+
+        Args:
+            match_ids: 比赛ID列表
+            on_progress: 可选回调 on_progress(done, total)，每处理完一场比赛（成功或失败）调用一次
+            as_series: 为True时赔率历史以 OddsSeries 列式序列返回，供批量分析使用
+
+        Returns:
+            tuple: (matches, failures)
+                - matches: 成功获取的比赛列表，保持 match_ids 的顺序
+                - failures: 失败列表，每项为 {"match_id": ..., "error": ...}
+        """
+        if not match_ids:
+            return [], []
+
+        workers = min(self.max_workers, len(match_ids) * 2)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            detail_futures = [executor.submit(self.provider.get_match_odds, mid) for mid in match_ids]
+            # 详情到达即提交该场比赛的赔率历史请求，与其余比赛的详情请求并行
+            positions = {future: i for i, future in enumerate(detail_futures)}
+            history_futures = {}
+            for future in as_completed(detail_futures):
+                if future.exception() is None and future.result():
+                    i = positions[future]
+                    history_futures[i] = executor.submit(
+                        self.provider.get_odds_history, match_ids[i], as_series=as_series
+                    )
+
+            matches = []
+            failures = []
+            for i, (mid, detail_future) in enumerate(zip(match_ids, detail_futures)):
+                try:
+                    detail = detail_future.result()
+                    if not detail:
+                        failures.append({"match_id": mid, "error": "比赛未找到"})
+                        continue
+                    # 获取赔率历史数据
+                    odds_history = history_futures[i].result()
+                    detail["had_history"] = odds_history.get("had_history", [])
+                    detail["hhad_history"] = odds_history.get("hhad_history", [])
+                    matches.append(detail)
+                except Exception as e:
+                    failures.append({"match_id": mid, "error": str(e)})
+                finally:
+                    if on_progress is not None:
+                        on_progress(len(matches) + len(failures), len(match_ids))
+
+        return matches, failures
@@ -0,0 +1,240 @@
+"""
+赔率差值分析
+
+根据胜平负(HAD)与让球胜平负(HHAD)赔率变化历史计算胜差、负差、双平差。
+每条记录的时间只解析一次，时间匹配使用排序 + 二分查找，整体复杂度 O((n+m) log n)。
+不依赖 openpyxl，可供 Excel 导出和 API 共用。
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+# 差值行字段，顺序与 Excel 中的列一致
+DIFF_COLUMNS = (
+    "win_diff", "lose_diff", "double_draw_diff",
+    "win_sign", "lose_sign", "double_draw_sign",
+)
+DIFF_HEADERS = ["胜的赔率的差", "负的赔率的差", "双平赔率的差", "胜差正负", "负差正负", "双平差正负"]
+
+# HHAD 与 HAD 记录按时间匹配的容差（秒，同日期）
+MATCH_TOLERANCE = 300
+
+
+def compute_odds_diffs(had_history, hhad_history):
+    """计算赔率差值分析行
+
+    对齐规则：
+    - 第1行：胜/负差取 HAD[1]，双平差取 HAD[0]/HHAD[0]
+    - 后续行：按时间戳匹配 HAD 和 HHAD（同日期、容差5分钟），无匹配时双平差使用
+      时间不晚于当前 HHAD 的最近 HAD
+    - 未被完整覆盖的 HAD 记录补充为单独的行，双平差使用时间不晚于它的最近 HHAD
+    - 所有行按时间排序
+    无胜平负数据时，仅用 HHAD 让平数据做差：HHAD[i].draw - HHAD[0].draw
+
+    Returns:
+        list[dict] | None: 差值行列表，每行包含 time 及 DIFF_COLUMNS 各字段；
+            数据不足以计算时返回 None
+    """
+    if len(hhad_history) >= 1 and len(had_history) >= 1:
+        return _diffs_with_had(had_history, hhad_history)
+    if len(hhad_history) >= 2:
+        return _diffs_hhad_only(hhad_history)
+    return None
+
+
+def _diffs_with_had(had_history, hhad_history):
+    had = [_Tick(item) for item in had_history]
+    hhad = [_Tick(item) for item in hhad_history]
+    had_by_date = _TimeOfDayIndex(had)
+    had_by_time = _EarlierIndex(had)
+    hhad_by_time = _EarlierIndex(hhad)
+
+    # 获取第一条数据作为基准（用于胜差、负差）
+    base_win = had[0].win
+    base_lose = had[0].lose
+
+    used_had_for_wl = set()  # 已用于胜/负差的HAD索引
+    had_dd_covered = set()   # 已在HHAD循环中计算了双平差的HAD索引
+    last_used_had_draw = had[0].draw  # 最近使用的HAD平数据
+
+    diff_rows = []
+    for r, tick in enumerate(hhad):
+        if r == 0:
+            if len(had) >= 2:
+                row = _win_lose_row(had[1], base_win, base_lose)
+                used_had_for_wl.add(1)
+            else:
+                row = _empty_win_lose_row()
+            cur_had_draw = had[0].draw
+            had_dd_covered.add(0)
+            last_used_had_draw = cur_had_draw
+        else:
+            matched = had_by_date.nearest(tick)
+            if matched is not None and matched not in used_had_for_wl:
+                row = _win_lose_row(had[matched], base_win, base_lose)
+                used_had_for_wl.add(matched)
+                cur_had_draw = had[matched].draw
+                had_dd_covered.add(matched)
+                last_used_had_draw = cur_had_draw
+            else:
+                row = _empty_win_lose_row()
+                if matched is not None:
+                    had_dd_covered.add(matched)
+                # 双平差：向前查找时间戳<=当前HHAD的最近HAD
+                cur_had_draw = last_used_had_draw
+                earlier = had_by_time.latest_not_after(tick.dt)
+                if earlier is not None:
+                    cur_had_draw = had[earlier].draw
+                    last_used_had_draw = cur_had_draw
+
+        cur_hhad_draw = tick.draw
+        double_draw_diff = round(cur_hhad_draw - cur_had_draw, 2) if cur_hhad_draw and cur_had_draw else 0
+        row["double_draw_diff"] = double_draw_diff
+        row["double_draw_sign"] = _sign(double_draw_diff)
+        row["time"] = tick.sort_key
+        diff_rows.append(row)
+
+    # 补充未完整覆盖的HAD记录
+    for had_idx in range(1, len(had)):
+        if had_idx in used_had_for_wl and had_idx in had_dd_covered:
+            continue
+
+        tick = had[had_idx]
+        if had_idx in used_had_for_wl:
+            # 胜/负差已在HHAD循环显示，仅需双平差独占一行
+            row = _empty_win_lose_row()
+        else:
+            row = _win_lose_row(tick, base_win, base_lose)
+
+        # 双平差：向前查找最近的HHAD让平赔率
+        earlier = hhad_by_time.latest_not_after(tick.dt)
+        if earlier is not None:
+            double_draw_diff = round(hhad[earlier].draw - tick.draw, 2)
+            row["double_draw_diff"] = double_draw_diff
+            row["double_draw_sign"] = _sign(double_draw_diff)
+        else:
+            row["double_draw_diff"] = "-"
+            row["double_draw_sign"] = "-"
+        row["time"] = tick.sort_key
+        diff_rows.append(row)
+
+    # 按时间排序（稳定排序），确保补充行插入到正确的时间位置
+    diff_rows.sort(key=lambda row: row["time"])
+    return diff_rows
+
+
+def _diffs_hhad_only(hhad_history):
+    base_hhad_draw = hhad_history[0].get("draw", 0) or 0
+    rows = []
+    for item in hhad_history[1:]:
+        draw_diff = round((item.get("draw", 0) or 0) - base_hhad_draw, 2)
+        row = _empty_win_lose_row()
+        row["double_draw_diff"] = draw_diff
+        row["double_draw_sign"] = _sign(draw_diff)
+        row["time"] = item.get("update_date", "") + " " + item.get("update_time", "")
+        rows.append(row)
+    return rows
+
+
+def _sign(value):
+    return "正" if value >= 0 else "负"
+
+
+def _win_lose_row(tick, base_win, base_lose):
+    win_diff = round(tick.win - base_win, 2)
+    lose_diff = round(tick.lose - base_lose, 2)
+    return {
+        "win_diff": win_diff,
+        "lose_diff": lose_diff,
+        "win_sign": _sign(win_diff),
+        "lose_sign": _sign(lose_diff),
+    }
+
+
+def _empty_win_lose_row():
+    return {"win_diff": "-", "lose_diff": "-", "win_sign": "-", "lose_sign": "-"}
+
+
+class _Tick:
+    """一条赔率记录，时间字段预先解析"""
+
+    __slots__ = ("date", "sort_key", "dt", "tod", "win", "draw", "lose")
+
+    def __init__(self, item):
+        date_str = item.get("update_date", "")
+        time_str = item.get("update_time", "")
+        self.date = date_str
+        self.sort_key = date_str + " " + time_str
+        self.dt = _parse_datetime(date_str, time_str)
+        self.tod = _parse_time_of_day(time_str)
+        self.win = item.get("win", 0) or 0
+        self.draw = item.get("draw", 0) or 0
+        self.lose = item.get("lose", 0) or 0
+
+
+class _TimeOfDayIndex:
+    """按日期分组、按一天内秒数排序的索引，用于同日期容差匹配"""
+
+    def __init__(self, ticks):
+        groups = {}
+        for idx, tick in enumerate(ticks):
+            if tick.tod is None:
+                continue
+            first_idx = groups.setdefault(tick.date, {})
+            # 同一时间有多条记录时取最早出现的一条
+            first_idx.setdefault(tick.tod, idx)
+        self._groups = {
+            date: (sorted(first_idx), first_idx)
+            for date, first_idx in groups.items()
+        }
+
+    def nearest(self, tick, tolerance=MATCH_TOLERANCE):
+        """同日期内时间最接近且差值不超过容差的记录索引；差值相同时取索引最小者"""
+        group = self._groups.get(tick.date)
+        if group is None or tick.tod is None:
+            return None
+        tods, first_idx = group
+        pos = bisect_left(tods, tick.tod)
+        best = None
+        for p in (pos - 1, pos):
+            if 0 <= p < len(tods):
+                diff = abs(tods[p] - tick.tod)
+                if diff <= tolerance:
+                    candidate = (diff, first_idx[tods[p]])
+                    if best is None or candidate < best:
+                        best = candidate
+        return None if best is None else best[1]
+
+
+class _EarlierIndex:
+    """按完整时间排序的索引，用于查找时间不晚于给定时间的最近记录"""
+
+    def __init__(self, ticks):
+        entries = sorted((tick.dt, idx) for idx, tick in enumerate(ticks) if tick.dt is not None)
+        self._dts = [dt for dt, _ in entries]
+        self._indexes = [idx for _, idx in entries]
+
+    def latest_not_after(self, dt):
+        """时间 <= dt 的最近记录索引；时间相同时取索引最小者"""
+        if dt is None:
+            return None
+        pos = bisect_right(self._dts, dt)
+        if pos == 0:
+            return None
+        first = bisect_left(self._dts, self._dts[pos - 1])
+        return self._indexes[first]
+
+
+def _parse_datetime(date_str, time_str):
+    try:
+        return datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S")
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_time_of_day(time_str):
+    """解析时间部分(HH:MM:SS)为一天内的秒数"""
+    try:
+        t = datetime.strptime(time_str.split()[-1] if " " in time_str else time_str, "%H:%M:%S")
+    except (ValueError, TypeError, AttributeError, IndexError):
+        return None
+    return t.hour * 3600 + t.minute * 60 + t.second
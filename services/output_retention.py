@@ -0,0 +1,163 @@
+"""
+输出目录保留策略
+
+定期（或每次导出后）清理 config.OUTPUT_DIR：
+- 超过 max_age 秒未使用的文件直接删除
+- 剩余文件总大小超过 max_bytes 时，按最近使用时间(mtime)从旧到新淘汰
+下载导出文件时会刷新其 mtime，因此 mtime 即最近使用时间。每次清理后更新目录的文件数、
+字节数及累计淘汰量，可通过 stats() 读取。
+
+只管理导出生成的文件（文件名以 竞彩足球_ 开头）及导出缓存的临时文件，目录中的其他文件
+（如 .gitkeep、运维放入的文件）不统计也不删除。
+"""
+import os
+import threading
+import time
+from services.export_cache import FILE_PREFIX
+import config
+
+# 正在写入的临时文件（导出缓存先写入 .<文件名>.<随机>.tmp 再重命名），仅按 max_age 清理
+_TMP_SUFFIX = ".tmp"
+
+
+def is_export_artifact(name):
+    """是否为导出生成的文件或导出缓存的临时文件"""
+    if name.startswith(FILE_PREFIX):
+        return True
+    return name.startswith("." + FILE_PREFIX) and name.endswith(_TMP_SUFFIX)
+
+
+class OutputRetention:
+    """输出目录保留管理器，线程安全"""
+
+    def __init__(self, directory=None, max_bytes=None, max_age=None, interval=None):
+        self.directory = directory or config.OUTPUT_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else config.OUTPUT_MAX_BYTES
+        self.max_age = max_age if max_age is not None else config.OUTPUT_MAX_AGE
+        self.interval = interval if interval is not None else config.OUTPUT_RETENTION_INTERVAL
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+        self._stats = {
+            "files": 0,
+            "bytes": 0,
+            "evicted_files": 0,
+            "evicted_bytes": 0,
+            "runs": 0,
+            "last_run": None,
+        }
+
+    def enforce(self, keep=None):
+        """执行一次清理
+
+        Args:
+            keep: 不参与淘汰的文件名（如刚生成、即将下载的文件）
+
+        Returns:
+            dict: 本次清理后的统计，同 stats()
+        """
+        with self._lock:
+            now = time.time()
+            entries = self._scan()
+            evicted_files = 0
+            evicted_bytes = 0
+
+            remaining = []
+            for mtime, size, name in entries:
+                if name != keep and self.max_age and now - mtime > self.max_age:
+                    if self._remove(name):
+                        evicted_files += 1
+                        evicted_bytes += size
+                    continue
+                remaining.append((mtime, size, name))
+
+            total_bytes = sum(size for _, size, _ in remaining)
+            if self.max_bytes and total_bytes > self.max_bytes:
+                # 最近最少使用的先淘汰；临时文件可能仍在写入，不按大小淘汰
+                kept = []
+                for mtime, size, name in sorted(remaining):
+                    if (total_bytes > self.max_bytes and name != keep
+                            and not name.endswith(_TMP_SUFFIX)):
+                        if self._remove(name):
+                            evicted_files += 1
+                            evicted_bytes += size
+                        total_bytes -= size
+                        continue
+                    kept.append((mtime, size, name))
+                remaining = kept
+
+            self._stats.update({
+                "files": len(remaining),
+                "bytes": sum(size for _, size, _ in remaining),
+                "evicted_files": self._stats["evicted_files"] + evicted_files,
+                "evicted_bytes": self._stats["evicted_bytes"] + evicted_bytes,
+                "runs": self._stats["runs"] + 1,
+                "last_run": now,
+            })
+            return dict(self._stats)
+
+    def touch(self, filename):
+        """标记文件刚被使用（下载时调用）"""
+        if os.path.basename(filename) != filename or filename in (".", ".."):
+            return
+        try:
+            os.utime(os.path.join(self.directory, filename))
+        except OSError:
+            pass
+
+    def stats(self):
+        """目录文件数、字节数，以及累计淘汰的文件数、字节数和清理次数"""
+        with self._lock:
+            return dict(self._stats)
+
+    def collect_metrics(self):
+        """metrics.register_collector 使用的采集回调：目录文件数、字节数及累计淘汰量"""
+        stats = self.stats()
+        return [
+            ("output_dir_files", "gauge", "输出目录中导出文件数", [({}, stats["files"])]),
+            ("output_dir_bytes", "gauge", "输出目录中导出文件总字节数", [({}, stats["bytes"])]),
+            ("output_evicted_files_total", "counter", "累计淘汰的导出文件数", [({}, stats["evicted_files"])]),
+            ("output_evicted_bytes_total", "counter", "累计淘汰的导出文件字节数", [({}, stats["evicted_bytes"])]),
+        ]
+
+    def start(self):
+        """启动后台定期清理线程，interval 为 0 时不启动"""
+        if not self.interval or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="output-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            try:
+                self.enforce()
+            except Exception as e:
+                print(f"清理输出目录失败: {e}")
+            self._stopped.wait(self.interval)
+
+    def _scan(self):
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not is_export_artifact(entry.name):
+                        continue
+                    try:
+                        if entry.is_file():
+                            st = entry.stat()
+                            entries.append((st.st_mtime, st.st_size, entry.name))
+                    except FileNotFoundError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _remove(self, name):
+        try:
+            os.remove(os.path.join(self.directory, name))
+            return True
+        except FileNotFoundError:
+            return False
@@ -0,0 +1,202 @@
+"""
+机器可读格式导出（CSV / JSON Lines / Parquet）
+
+与 generate_excel 导出相同的数据，但不做排版：每场比赛输出当前赔率汇总行及胜平负(HAD)/
+让球胜平负(HHAD)的全部变化记录，所有格式共用同一组列。导出以生成器的形式逐场产出字节块，
+可直接作为 Flask 流式响应返回，不经过 openpyxl 的单元格对象。
+
+列说明：
+- record: "summary"（当前赔率）或 "tick"（赔率变化记录）
+- pool: "had" 或 "hhad"
+- 胜平负的 handicap 为空；summary 行的 update_date/update_time 为空
+"""
+import csv
+import importlib.util
+import io
+import json
+
+EXPORT_COLUMNS = (
+    "record", "match_id", "match_time", "league", "home_team", "away_team",
+    "pool", "handicap", "update_date", "update_time", "win", "draw", "lose",
+)
+
+# 格式 -> (Content-Type, 扩展名)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# 格式 -> 需要额外安装的可选依赖
+_OPTIONAL_DEPENDENCIES = {"parquet": "pyarrow"}
+
+# Parquet 每个行组累积的最少行数
+PARQUET_ROW_GROUP_SIZE = 50000
+
+
+def iter_match_rows(match):
+    """单场比赛的导出行（字典，键为 EXPORT_COLUMNS）"""
+    info = {
+        "match_id": match.get("match_id", ""),
+        "match_time": match.get("match_time", ""),
+        "league": match.get("league", ""),
+        "home_team": match.get("home_team", ""),
+        "away_team": match.get("away_team", ""),
+    }
+    for pool in ("had", "hhad"):
+        odds = match.get(f"{pool}_odds", {})
+        yield _row("summary", info, pool, odds.get("handicap") if pool == "hhad" else None,
+                   "", "", odds)
+    for pool in ("had", "hhad"):
+        for item in match.get(f"{pool}_history", []):
+            yield _row("tick", info, pool, item.get("handicap") if pool == "hhad" else None,
+                       item.get("update_date", ""), item.get("update_time", ""), item)
+
+
+def _row(record, info, pool, handicap, update_date, update_time, odds):
+    row = {"record": record}
+    row.update(info)
+    row.update({
+        "pool": pool,
+        "handicap": None if handicap in (None, "") else str(handicap),
+        "update_date": update_date,
+        "update_time": update_time,
+        "win": _odds_value(odds.get("win")),
+        "draw": _odds_value(odds.get("draw")),
+        "lose": _odds_value(odds.get("lose")),
+    })
+    return row
+
+
+def _odds_value(value):
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def missing_dependency(fmt):
+    """格式所需但未安装的可选依赖名，无需额外依赖或已安装时返回 None"""
+    module = _OPTIONAL_DEPENDENCIES.get(fmt)
+    if module is not None and importlib.util.find_spec(module) is None:
+        return module
+    return None
+
+
+def stream_export(matches, fmt):
+    """按格式逐场生成导出内容
+
+    Args:
+        matches: 包含完整赔率的比赛数据列表（或按顺序产出比赛的可迭代对象）
+        fmt: "csv" / "jsonl" / "parquet"
+
+    Returns:
+        generator: 产出 bytes 块
+    """
+    if fmt == "csv":
+        return _stream_csv(matches)
+    if fmt == "jsonl":
+        return _stream_jsonl(matches)
+    if fmt == "parquet":
+        # 在返回生成器前检查依赖，缺少 pyarrow 时调用方可以直接返回错误而不是中断响应
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet 导出需要安装 pyarrow")
+        return _stream_parquet(matches, pa, pq)
+    raise ValueError(f"不支持的导出格式: {fmt}")
+
+
+def _stream_csv(matches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for match in matches:
+        for row in iter_match_rows(match):
+            writer.writerow(["" if row[col] is None else row[col] for col in EXPORT_COLUMNS])
+        yield _drain(buffer).encode("utf-8")
+    tail = _drain(buffer)
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def _drain(buffer):
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+
+def _stream_jsonl(matches):
+    for match in matches:
+        lines = [json.dumps(row, ensure_ascii=False) for row in iter_match_rows(match)]
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _stream_parquet(matches, pa, pq):
+    schema = pa.schema(
+        [(col, pa.string()) for col in EXPORT_COLUMNS[:-3]]
+        + [(col, pa.float64()) for col in EXPORT_COLUMNS[-3:]]
+    )
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    columns = {col: [] for col in EXPORT_COLUMNS}
+    pending = 0
+
+    def flush():
+        writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+        for values in columns.values():
+            values.clear()
+
+    try:
+        for match in matches:
+            for row in iter_match_rows(match):
+                for col in EXPORT_COLUMNS:
+                    columns[col].append(row[col])
+                pending += 1
+            if pending >= PARQUET_ROW_GROUP_SIZE:
+                flush()
+                pending = 0
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        if pending:
+            flush()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+class _ChunkSink:
+    """只追加的输出流，Parquet 写入的字节按块取出后即释放"""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return b"".join(chunks)
@@ -455,7 +455,7 @@ document.addEventListener('DOMContentLoaded', function () {
         return html;
     }
 
-    // 导出Excel
+    // 导出Excel（后台任务，轮询进度）
     function exportExcel() {
         const btn = document.getElementById('btn-export');
         btn.disabled = true;
@@ -468,33 +468,70 @@ document.addEventListener('DOMContentLoaded', function () {
         })
             .then(r => r.json())
             .then(data => {
-                btn.disabled = false;
-                updateExportButton();
                 if (!data.success) {
+                    finishExport();
+                    showError(data.error || '导出失败');
+                    return;
+                }
+                pollExportJob(data.status_url);
+            })
+            .catch(err => {
+                finishExport();
+                showError('导出请求失败: ' + err.message);
+            });
+    }
+
+    function pollExportJob(statusUrl) {
+        fetch(statusUrl)
+            .then(r => r.json())
+            .then(data => {
+                if (!data.success) {
+                    finishExport();
                     showError(data.error || '导出失败');
                     return;
                 }
+                const job = data.job;
+                if (job.phase === 'failed') {
+                    finishExport();
+                    showError(job.error || '导出失败');
+                    return;
+                }
+                if (job.phase !== 'done') {
+                    const btn = document.getElementById('btn-export');
+                    const progress = job.phase === 'writing'
+                        ? '生成文件...'
+                        : '导出中 ' + job.done + '/' + job.total;
+                    btn.innerHTML = '<span class="spinner-border spinner-border-sm"></span> ' + progress;
+                    setTimeout(function () { pollExportJob(statusUrl); }, 1000);
+                    return;
+                }
+
+                finishExport();
                 // 触发下载
                 const a = document.createElement('a');
-                a.href = data.download_url;
-                a.download = data.filename;
+                a.href = job.download_url;
+                a.download = job.filename;
                 document.body.appendChild(a);
                 a.click();
                 document.body.removeChild(a);
 
                 // 显示成功提示
                 document.getElementById('toast-message').textContent =
-                    '已导出 ' + data.match_count + ' 场比赛数据: ' + data.filename;
+                    '已导出 ' + job.match_count + ' 场比赛数据: ' + job.filename;
                 const toast = new bootstrap.Toast(document.getElementById('export-toast'));
                 toast.show();
             })
             .catch(err => {
-                btn.disabled = false;
-                updateExportButton();
-                showError('导出请求失败: ' + err.message);
+                finishExport();
+                showError('查询导出进度失败: ' + err.message);
             });
     }
 
+    function finishExport() {
+        document.getElementById('btn-export').disabled = false;
+        updateExportButton();
+    }
+
     function updateExportButton() {
         const btn = document.getElementById('btn-export');
         const count = selectedIds.size;
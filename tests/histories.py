@@ -0,0 +1,48 @@
+"""
+测试用赔率历史生成
+
+时间间隔覆盖同一时间、容差边界(300秒)附近、跨天及乱序，少量记录混入无法解析的日期或时间，
+赔率保留两位小数，与竞彩网返回的数据一致。
+"""
+import random
+from datetime import datetime, timedelta
+
+_STEPS = (0, 30, 60, 200, 290, 300, 301, 310, 900, 86400, -120)
+_BAD_DATES = ("", "2026/02/01", "2026-02-30")
+_BAD_TIMES = ("", "12:00", "25:00:00")
+
+
+def random_history(rng, ticks, with_handicap=False, bad_rate=0.05):
+    """生成 ticks 条 get_odds_history 格式的记录"""
+    ts = datetime(2026, 2, 1, 9) + timedelta(seconds=rng.randint(0, 3000))
+    history = []
+    for _ in range(ticks):
+        ts += timedelta(seconds=rng.choice(_STEPS))
+        date_str, time_str = ts.strftime("%Y-%m-%d"), ts.strftime("%H:%M:%S")
+        if rng.random() < bad_rate:
+            if rng.random() < 0.5:
+                date_str = rng.choice(_BAD_DATES)
+            else:
+                time_str = rng.choice(_BAD_TIMES)
+        item = {"update_date": date_str, "update_time": time_str}
+        if with_handicap:
+            item["handicap"] = rng.choice(["-1", "+1", "-2"])
+        item["win"] = round(rng.uniform(1.01, 15), 2)
+        item["draw"] = round(rng.uniform(1.5, 9), 2) if rng.random() > 0.03 else 0
+        item["lose"] = round(rng.uniform(1.01, 15), 2)
+        history.append(item)
+    return history
+
+
+def random_matches(seed, count):
+    """生成 count 场比赛，HAD/HHAD 条数覆盖 0、1、2 条等边界情况"""
+    rng = random.Random(seed)
+    sizes = (0, 1, 2, 5, 20, 60)
+    return [
+        {
+            "match_id": str(i),
+            "had_history": random_history(rng, rng.choice(sizes)),
+            "hhad_history": random_history(rng, rng.choice(sizes), with_handicap=True),
+        }
+        for i in range(count)
+    ]
@@ -0,0 +1,52 @@
+"""
+compute_batch_odds_diffs 与逐场 compute_odds_diffs 的一致性
+"""
+import pytest
+
+from api.odds_series import OddsSeries, history_to_series
+from services.batch_analysis import compute_batch_odds_diffs
+from services.odds_analysis import DIFF_COLUMNS, compute_odds_diffs
+from tests.histories import random_matches
+
+
+def _sequential(matches):
+    rows = []
+    for match in matches:
+        for row in compute_odds_diffs(match["had_history"], match["hhad_history"]) or []:
+            rows.append((match["match_id"], row["time"]) + tuple(row[key] for key in DIFF_COLUMNS))
+    return rows
+
+
+def _batch(matches):
+    return [
+        (row["match_id"], row["time"]) + tuple(row[key] for key in DIFF_COLUMNS)
+        for row in compute_batch_odds_diffs(matches).to_records()
+    ]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_batch_matches_sequential(seed):
+    matches = random_matches(seed, 120)
+    assert _batch(matches) == _sequential(matches)
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_series_input_matches_dict_input(seed):
+    matches = random_matches(seed, 120)
+    series = [{**m, **history_to_series(m)} for m in matches]
+    assert _batch(series) == _sequential(matches)
+
+
+def test_series_round_trip_keeps_unparsed_times():
+    records = [
+        {"update_date": "2026-02-01", "update_time": "12:00", "win": 1.85, "draw": 3.1, "lose": 4.25},
+        {"update_date": "2026-02-30", "update_time": "10:00:00", "win": 2.0, "draw": 0, "lose": 1.01},
+        {"update_date": "2026-02-01", "update_time": "10:00:00", "win": 2.0, "draw": 3.2, "lose": 1.01},
+    ]
+    assert OddsSeries.from_records(records).to_records() == records
+
+
+def test_empty_batch():
+    table = compute_batch_odds_diffs([])
+    assert len(table) == 0
+    assert table.to_columns()["match_id"] == []
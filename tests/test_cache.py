@@ -0,0 +1,187 @@
+"""
+SnapshotCache / AsyncSnapshotCache 的单飞加载及旧值刷新
+"""
+import asyncio
+import threading
+import time
+import types
+
+import pytest
+
+import api.cache
+from api.cache import AsyncSnapshotCache, SnapshotCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的 time.monotonic"""
+    now = [1000.0]
+    monkeypatch.setattr(api.cache, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+class Loader:
+    """计数的加载函数；gate 未放行时阻塞，fail 为 True 时抛出异常"""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.gate = threading.Event()
+        self.gate.set()
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+        self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return calls
+
+
+def test_concurrent_misses_share_one_load(clock):
+    loader = Loader()
+    loader.gate.clear()
+    cache = SnapshotCache(loader, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    loader.gate.set()
+    for t in threads:
+        t.join(5)
+    assert loader.calls == 1
+    assert results == [1] * 8
+
+
+def test_fresh_value_is_not_reloaded(clock):
+    loader = Loader()
+    cache = SnapshotCache(loader, ttl=60)
+    assert cache.get() == 1
+    clock[0] += 59
+    assert cache.get() == 1
+    assert loader.calls == 1
+
+
+def test_expired_without_stale_ttl_reloads(clock):
+    loader = Loader()
+    cache = SnapshotCache(loader, ttl=60)
+    cache.get()
+    clock[0] += 61
+    assert cache.get() == 2
+
+
+def test_stale_value_returned_while_refreshing_in_background(clock):
+    loader = Loader()
+    cache = SnapshotCache(loader, ttl=60, stale_ttl=300)
+    cache.get()
+    clock[0] += 61
+    loader.gate.clear()
+    # 后台刷新被阻塞时调用方仍立即拿到旧值，且只发起一次刷新
+    assert cache.get() == 1
+    assert cache.get() == 1
+    loader.gate.set()
+    for _ in range(100):
+        if cache.get() == 2:
+            break
+        time.sleep(0.01)
+    assert cache.get() == 2
+    assert loader.calls == 2
+
+
+def test_failed_refresh_keeps_stale_value(clock):
+    loader = Loader()
+    cache = SnapshotCache(loader, ttl=60, stale_ttl=300)
+    cache.get()
+    clock[0] += 61
+    loader.fail = True
+    assert cache.get() == 1
+    clock[0] += 300
+    with pytest.raises(RuntimeError):
+        cache.get()
+
+
+def test_load_error_without_value_is_raised(clock):
+    loader = Loader()
+    loader.fail = True
+    cache = SnapshotCache(loader, ttl=60)
+    with pytest.raises(RuntimeError):
+        cache.get()
+    loader.fail = False
+    assert cache.get() == 2
+
+
+def test_invalidate_forces_reload(clock):
+    loader = Loader()
+    cache = SnapshotCache(loader, ttl=60, stale_ttl=300)
+    cache.get()
+    cache.invalidate()
+    assert cache.get() == 2
+
+
+def test_async_concurrent_misses_share_one_load(clock):
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def main():
+        cache = AsyncSnapshotCache(loader, ttl=60)
+        return await asyncio.gather(*(cache.get() for _ in range(8)))
+
+    assert asyncio.run(main()) == [1] * 8
+    assert len(calls) == 1
+
+
+def test_async_stale_value_returned_while_refreshing(clock):
+    calls = []
+    release = None
+
+    async def loader():
+        calls.append(1)
+        if len(calls) > 1:
+            await release.wait()
+        return len(calls)
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        cache = AsyncSnapshotCache(loader, ttl=60, stale_ttl=300)
+        assert await cache.get() == 1
+        clock[0] += 61
+        assert await cache.get() == 1
+        assert await cache.get() == 1
+        release.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        return await cache.get()
+
+    assert asyncio.run(main()) == 2
+    assert len(calls) == 2
+
+
+def test_async_failed_refresh_keeps_stale_value(clock):
+    state = {"calls": 0, "fail": False}
+
+    async def loader():
+        state["calls"] += 1
+        if state["fail"]:
+            raise RuntimeError("upstream down")
+        return state["calls"]
+
+    async def main():
+        cache = AsyncSnapshotCache(loader, ttl=60, stale_ttl=300)
+        await cache.get()
+        clock[0] += 61
+        state["fail"] = True
+        assert await cache.get() == 1
+        await asyncio.sleep(0)
+        assert await cache.get() == 1
+        clock[0] += 300
+        with pytest.raises(RuntimeError):
+            await cache.get()
+
+    asyncio.run(main())
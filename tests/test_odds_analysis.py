@@ -0,0 +1,170 @@
+"""
+compute_odds_diffs 与原 _write_detail_sheet 中逐条扫描实现的一致性
+"""
+import random
+from datetime import datetime
+
+import pytest
+
+from services.odds_analysis import DIFF_COLUMNS, compute_odds_diffs
+from tests.histories import random_history, random_matches
+
+
+def _full_datetime(item):
+    try:
+        return datetime.strptime(f"{item.get('update_date', '')} {item.get('update_time', '')}", "%Y-%m-%d %H:%M:%S")
+    except (ValueError, TypeError):
+        return None
+
+
+def _time_diff_seconds(t1, t2):
+    try:
+        dt1 = datetime.strptime(t1.split()[-1] if " " in t1 else t1, "%H:%M:%S")
+        dt2 = datetime.strptime(t2.split()[-1] if " " in t2 else t2, "%H:%M:%S")
+        return abs((dt1 - dt2).total_seconds())
+    except (ValueError, TypeError, AttributeError, IndexError):
+        return float("inf")
+
+
+def _find_matching_had(hhad_item, had_list, tolerance=300):
+    best_match = None
+    best_diff = float("inf")
+    for idx, had in enumerate(had_list):
+        if had.get("update_date", "") != hhad_item.get("update_date", ""):
+            continue
+        diff = _time_diff_seconds(had.get("update_time", ""), hhad_item.get("update_time", ""))
+        if diff < best_diff and diff <= tolerance:
+            best_diff = diff
+            best_match = idx
+    return best_match
+
+
+def _latest_not_after(items, dt):
+    best, best_dt = None, None
+    for item in items:
+        item_dt = _full_datetime(item)
+        if item_dt and item_dt <= dt and (best_dt is None or item_dt > best_dt):
+            best, best_dt = item, item_dt
+    return best
+
+
+def _wl(row, current, base_win, base_lose):
+    win_diff = round((current.get("win", 0) or 0) - base_win, 2)
+    lose_diff = round((current.get("lose", 0) or 0) - base_lose, 2)
+    row.update(win_diff=win_diff, lose_diff=lose_diff,
+               win_sign="正" if win_diff >= 0 else "负", lose_sign="正" if lose_diff >= 0 else "负")
+
+
+def _no_wl(row):
+    row.update(win_diff="-", lose_diff="-", win_sign="-", lose_sign="-")
+
+
+def baseline_diffs(had_history, hhad_history):
+    """原 excel_service._write_detail_sheet 的赔率差值算法（逐条扫描），输出格式同 compute_odds_diffs"""
+    if not (len(hhad_history) >= 1 and len(had_history) >= 1):
+        if len(hhad_history) < 2:
+            return None
+        base = hhad_history[0].get("draw", 0) or 0
+        rows = []
+        for item in hhad_history[1:]:
+            diff = round((item.get("draw", 0) or 0) - base, 2)
+            row = {"time": item.get("update_date", "") + " " + item.get("update_time", "")}
+            _no_wl(row)
+            row.update(double_draw_diff=diff, double_draw_sign="正" if diff >= 0 else "负")
+            rows.append(row)
+        return rows
+
+    base_win = had_history[0].get("win", 0) or 0
+    base_lose = had_history[0].get("lose", 0) or 0
+    used_for_wl = set()
+    dd_covered = set()
+    last_had_draw = had_history[0].get("draw", 0) or 0
+    rows = []
+
+    for r, hhad in enumerate(hhad_history):
+        row = {"time": hhad.get("update_date", "") + " " + hhad.get("update_time", "")}
+        if r == 0:
+            if len(had_history) >= 2:
+                _wl(row, had_history[1], base_win, base_lose)
+                used_for_wl.add(1)
+            else:
+                _no_wl(row)
+            cur_had_draw = had_history[0].get("draw", 0) or 0
+            dd_covered.add(0)
+            last_had_draw = cur_had_draw
+        else:
+            matched = _find_matching_had(hhad, had_history)
+            if matched is not None and matched not in used_for_wl:
+                _wl(row, had_history[matched], base_win, base_lose)
+                used_for_wl.add(matched)
+                cur_had_draw = had_history[matched].get("draw", 0) or 0
+                dd_covered.add(matched)
+                last_had_draw = cur_had_draw
+            else:
+                _no_wl(row)
+                if matched is not None:
+                    dd_covered.add(matched)
+                hhad_dt = _full_datetime(hhad)
+                cur_had_draw = last_had_draw
+                if hhad_dt:
+                    candidate = _latest_not_after(had_history, hhad_dt)
+                    if candidate:
+                        cur_had_draw = candidate.get("draw", 0) or 0
+                        last_had_draw = cur_had_draw
+        cur_hhad_draw = hhad.get("draw", 0) or 0
+        diff = round(cur_hhad_draw - cur_had_draw, 2) if cur_hhad_draw and cur_had_draw else 0
+        row.update(double_draw_diff=diff, double_draw_sign="正" if diff >= 0 else "负")
+        rows.append(row)
+
+    for had_idx in range(1, len(had_history)):
+        if had_idx in used_for_wl and had_idx in dd_covered:
+            continue
+        had = had_history[had_idx]
+        row = {"time": had.get("update_date", "") + " " + had.get("update_time", "")}
+        if had_idx in used_for_wl:
+            _no_wl(row)
+        else:
+            _wl(row, had, base_win, base_lose)
+        had_dt = _full_datetime(had)
+        candidate = _latest_not_after(hhad_history, had_dt) if had_dt else None
+        if candidate:
+            diff = round((candidate.get("draw", 0) or 0) - (had.get("draw", 0) or 0), 2)
+            row.update(double_draw_diff=diff, double_draw_sign="正" if diff >= 0 else "负")
+        else:
+            row.update(double_draw_diff="-", double_draw_sign="-")
+        rows.append(row)
+
+    rows.sort(key=lambda row: row["time"])
+    return rows
+
+
+def _columns(rows):
+    if rows is None:
+        return None
+    return [tuple(row[key] for key in ("time",) + DIFF_COLUMNS) for row in rows]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_matches_baseline_on_random_histories(seed):
+    for match in random_matches(seed, 80):
+        had, hhad = match["had_history"], match["hhad_history"]
+        assert _columns(compute_odds_diffs(had, hhad)) == _columns(baseline_diffs(had, hhad))
+
+
+def test_insufficient_data_returns_none():
+    assert compute_odds_diffs([], []) is None
+    assert compute_odds_diffs([], random_history(random.Random(0), 1, with_handicap=True)) is None
+
+
+def test_first_row_uses_second_had_for_win_lose():
+    had = [
+        {"update_date": "2026-02-01", "update_time": "10:00:00", "win": 2.0, "draw": 3.0, "lose": 3.5},
+        {"update_date": "2026-02-01", "update_time": "10:10:00", "win": 2.1, "draw": 3.1, "lose": 3.3},
+    ]
+    hhad = [{"update_date": "2026-02-01", "update_time": "10:00:00", "handicap": "-1",
+             "win": 3.8, "draw": 3.6, "lose": 1.7}]
+    rows = compute_odds_diffs(had, hhad)
+    assert rows[0]["win_diff"] == 0.1
+    assert rows[0]["lose_diff"] == -0.2
+    assert rows[0]["double_draw_diff"] == 0.6
+    assert _columns(rows) == _columns(baseline_diffs(had, hhad))
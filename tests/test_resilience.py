@@ -0,0 +1,136 @@
+"""
+UpstreamGuard 的重试、熔断及最近成功结果兜底
+"""
+import asyncio
+
+import pytest
+
+from api.resilience import CircuitOpenError, UpstreamError, UpstreamGuard
+
+
+def make_guard(threshold=2, retries=2, reset=60):
+    return UpstreamGuard(
+        "test", rate=0, burst=1, retries=retries, backoff_base=0, backoff_max=0,
+        breaker_threshold=threshold, breaker_reset=reset,
+    )
+
+
+class Send:
+    """按 outcomes 依次返回结果或抛出异常，之后重复最后一项"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def _next(self):
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def __call__(self, endpoint, params):
+        return self._next()
+
+    async def call_async(self, endpoint, params):
+        return self._next()
+
+
+def _expire(guard):
+    guard._breaker._opened_at -= guard._breaker.reset_timeout + 1
+
+
+def test_retries_then_succeeds():
+    guard = make_guard()
+    send = Send(UpstreamError("timeout"), UpstreamError("timeout"), "ok")
+    assert guard.call(send, "/list") == "ok"
+    assert send.calls == 3
+    assert guard.stats()["retries"] == 2
+    assert guard.stats()["breaker_state"] == "closed"
+
+
+def test_breaker_counts_one_failure_per_call():
+    guard = make_guard(threshold=2, retries=2)
+    send = Send(UpstreamError("down"))
+    with pytest.raises(UpstreamError):
+        guard.call(send, "/list")
+    # 一次调用重试 3 次只计一次失败
+    assert send.calls == 3
+    assert guard.stats()["breaker_state"] == "closed"
+    with pytest.raises(UpstreamError):
+        guard.call(send, "/list")
+    assert guard.stats()["breaker_state"] == "open"
+    assert guard.stats()["trips"] == 1
+
+
+def test_open_breaker_short_circuits():
+    guard = make_guard(threshold=1, retries=0)
+    send = Send(UpstreamError("down"))
+    with pytest.raises(UpstreamError):
+        guard.call(send, "/list")
+    with pytest.raises(CircuitOpenError):
+        guard.call(send, "/list")
+    assert send.calls == 1
+    assert guard.stats()["short_circuits"] == 1
+
+
+def test_failed_probe_reopens_without_retry():
+    guard = make_guard(threshold=1, retries=2)
+    send = Send(UpstreamError("down"))
+    with pytest.raises(UpstreamError):
+        guard.call(send, "/list")
+    _expire(guard)
+    calls = send.calls
+    with pytest.raises(UpstreamError):
+        guard.call(send, "/list")
+    assert send.calls == calls + 1
+    assert guard.stats()["breaker_state"] == "open"
+    with pytest.raises(CircuitOpenError):
+        guard.call(send, "/list")
+
+
+def test_successful_probe_closes_breaker():
+    guard = make_guard(threshold=1, retries=0)
+    with pytest.raises(UpstreamError):
+        guard.call(Send(UpstreamError("down")), "/list")
+    _expire(guard)
+    assert guard.call(Send("ok"), "/list") == "ok"
+    assert guard.stats()["breaker_state"] == "closed"
+
+
+def test_non_retryable_error_is_not_retried_or_counted():
+    guard = make_guard(threshold=1, retries=2)
+    send = Send(UpstreamError("404", retryable=False))
+    for _ in range(3):
+        with pytest.raises(UpstreamError):
+            guard.call(send, "/list")
+    assert send.calls == 3
+    assert guard.stats()["breaker_state"] == "closed"
+
+
+def test_last_good_value_served_on_failure():
+    guard = make_guard(threshold=1, retries=0)
+    assert guard.call(Send("v1"), "/list", {"page": 1}) == "v1"
+    send = Send(UpstreamError("down"))
+    assert guard.call(send, "/list", {"page": 1}) == "v1"
+    # 熔断期间同样返回最近成功结果，不发出请求
+    assert guard.call(send, "/list", {"page": 1}) == "v1"
+    assert send.calls == 1
+    assert guard.stats()["stale_served"] == 2
+    # 其他参数没有成功结果，抛出原异常
+    with pytest.raises(CircuitOpenError):
+        guard.call(send, "/list", {"page": 2})
+
+
+def test_async_breaker_counts_one_failure_per_call():
+    guard = make_guard(threshold=2, retries=1)
+    send = Send(UpstreamError("down"))
+
+    async def main():
+        for _ in range(2):
+            with pytest.raises(UpstreamError):
+                await guard.call_async(send.call_async, "/list")
+
+    asyncio.run(main())
+    assert send.calls == 4
+    assert guard.stats()["breaker_state"] == "open"